@@ -8,9 +8,11 @@ from dp_optimization.dp_scheduler import schedule_buses, schedule_metro_lines
 from dp_optimization.dp_maintenance import allocate_maintenance
 from shared.data_loader import load_data
 
-from shortest_path.dijkstra import dijkstra
-from shortest_path.dijkstra_traffic import dijkstra_with_traffic
-from shortest_path.astar_emergency import astar
+from shortest_path.bidirectional import bidirectional_dijkstra
+from shortest_path.time_dependent import route
+from shortest_path.route_cache import route_cache
+from shortest_path.nearest import nearest_target
+from shortest_path.road_network import get_period_weights, get_road_graph
 
 from greedy_signals.greedy import main as run_greedy_signal_timing
 import os
@@ -180,12 +182,6 @@ elif action == "Find best route between two locations":
     name_to_id = {str(row["name"]).strip().lower(): str(row["id"]) for _, row in locations.iterrows()}
     id_to_name = {str(row["id"]): str(row["name"]).strip() for _, row in locations.iterrows()}
 
-    graph = {}
-    for _, row in roads.iterrows():
-        f, t, d = row["from_id"], row["to_id"], row["distance_km"]
-        graph.setdefault(f, []).append((t, d))
-        graph.setdefault(t, []).append((f, d))
-
     start_id = name_to_id[start.strip().lower()]
     end_id = name_to_id[end.strip().lower()]
 
@@ -205,19 +201,14 @@ elif action == "Find best route between two locations":
 
     if st.button("Calculate Best Route"):
         if algo_choice == "Dijkstra":
-            path, cost = dijkstra(graph, start_id, end_id)
+            # Fetch the graph inside the callback: the cache may reload the network first
+            path, cost = route_cache.route(
+                start_id, end_id, None, lambda: bidirectional_dijkstra(get_road_graph(), start_id, end_id)
+            )
         else:
-            traffic = load_data("traffic")
-            traffic_data = {
-                row["roadid"]: {
-                    "morning": row["morning_peakveh/h"],
-                    "afternoon": row["afternoonveh/h"],
-                    "evening": row["evening_peakveh/h"],
-                    "night": row["nightveh/h"]
-                }
-                for _, row in traffic.iterrows()
-            }
-            path, cost = dijkstra_with_traffic(graph, traffic_data, start_id, end_id, period)
+            path, cost = route_cache.route(
+                start_id, end_id, period, lambda: route(get_period_weights(), start_id, end_id, period)
+            )
 
         st.session_state["best_path"] = path
         st.session_state["best_cost"] = cost
@@ -246,13 +237,8 @@ elif action == "Simulate emergency response":
     # تحويل الأسماء إلى ID والعكس
     name_to_id = {str(row["name"]).strip().lower(): str(row["id"]) for _, row in locations.iterrows()}
     id_to_name = {str(row["id"]): str(row["name"]).strip() for _, row in locations.iterrows()}
-    coords = {str(row["id"]): (row["y"], row["x"]) for _, row in locations.iterrows()}
 
-    graph = {}
-    for _, row in roads.iterrows():
-        f, t, d = row["from_id"], row["to_id"], row["distance_km"]
-        graph.setdefault(f, []).append((t, d))
-        graph.setdefault(t, []).append((f, d))
+    graph = get_road_graph()
 
     start_id = name_to_id[start.strip().lower()]
     hospitals = locations[locations["type"].str.contains("medical", case=False)]["id"].astype(str).tolist()
@@ -260,22 +246,14 @@ elif action == "Simulate emergency response":
         # 📌 Legend
     st.markdown("""
     #### 🗺️ Map Legend
-    - 🟥 **Red line** = Shortest emergency route (A* algorithm)
+    - 🟥 **Red line** = Shortest emergency route to the nearest hospital
     - ⚪ **Gray line** = Base road network
     """)
 
 
     if st.button("Simulate Emergency Route"):
-        best_path = []
-        best_distance = float("inf")
-        nearest = None
-
-        for hid in hospitals:
-            path, dist = astar(graph, coords, start_id, hid)
-            if path and dist < best_distance:
-                best_path = path
-                best_distance = dist
-                nearest = hid
+        # One search that stops at the first hospital it settles
+        nearest, best_path, best_distance = nearest_target(graph, start_id, hospitals)
 
         # خزن البيانات في session_state
         st.session_state["emergency_path"] = best_path
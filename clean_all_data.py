@@ -1,21 +1,145 @@
-from shared.data_loader import DATA_PATHS
-from shared.preprocessing import clean_csv
+from shared.data_loader import DATA_PATHS, DATA_SCHEMAS
+from shared.preprocessing import clean_csv, stream_clean_csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
 import os
+import sys
+import time
+import pandas as pd
 
-def clean_all_data():
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _empty_report(data_type: str, file_path: str) -> dict:
+    return {
+        "dataset": data_type,
+        "path": file_path,
+        "input_bytes": None,
+        "rows": None,
+        "columns": None,
+        "wall_time_s": None,
+        "rows_per_s": None,
+        "peak_memory_bytes": None,
+        "error": None,
+    }
+
+def clean_dataset(data_type: str, file_path: str, chunksize: int = None, use_cache: bool = True) -> dict:
+    """
+    Clean one dataset and report wall time, throughput, input size and peak memory.
+    Peak memory is the peak resident set size of the calling process (ru_maxrss);
+    iter_clean_events runs each dataset in a fresh process so it is that dataset's own.
+    """
+    report = _empty_report(data_type, file_path)
+    start = time.perf_counter()
+    try:
+        report["input_bytes"] = os.path.getsize(file_path)
+        if chunksize:
+            cleaned_path, report["rows"] = stream_clean_csv(file_path, chunksize=chunksize,
+                                                            schema=DATA_SCHEMAS.get(data_type))
+            report["columns"] = pd.read_csv(cleaned_path, nrows=0).shape[1]
+        else:
+            df = clean_csv(file_path, use_cache=use_cache, schema=DATA_SCHEMAS.get(data_type))
+            report["rows"], report["columns"] = df.shape
+    except Exception as e:
+        report["error"] = str(e)
+    finally:
+        elapsed = time.perf_counter() - start
+        report["peak_memory_bytes"] = _peak_rss_bytes()
+
+    report["wall_time_s"] = elapsed
+    if report["rows"] is not None and elapsed > 0:
+        report["rows_per_s"] = report["rows"] / elapsed
+    return report
+
+def _result(future, data_type: str, file_path: str) -> dict:
+    try:
+        return future.result()
+    except Exception as e:
+        # The worker itself died (e.g. killed for running out of memory)
+        report = _empty_report(data_type, file_path)
+        report["error"] = str(e) or type(e).__name__
+        return report
+
+def iter_clean_events(workers: int = 1, chunksize: int = None, use_cache: bool = True, paths: dict = None):
+    """
+    Clean every dataset in DATA_PATHS (or `paths`) and yield each report as soon
+    as it finishes. Every dataset is cleaned in a fresh process, so its peak
+    memory is not mixed with the others'. With one worker the reports follow
+    the order of the paths; with more (0 = one per CPU) they come as they finish.
+    """
+    paths = DATA_PATHS if paths is None else paths
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(paths))), max_tasks_per_child=1) as pool:
+        if workers == 1:
+            for data_type, file_path in paths.items():
+                future = pool.submit(clean_dataset, data_type, file_path, chunksize, use_cache)
+                yield _result(future, data_type, file_path)
+            return
+
+        futures = {
+            pool.submit(clean_dataset, data_type, file_path, chunksize, use_cache): (data_type, file_path)
+            for data_type, file_path in paths.items()
+        }
+        for future in as_completed(futures):
+            yield _result(future, *futures[future])
+
+def clean_all_data(workers: int = 1, chunksize: int = None, use_cache: bool = True, report_path: str = None):
     print("Starting data cleaning process...")
-    
-    for data_type, file_path in DATA_PATHS.items():
-        print(f"\nCleaning {data_type} data...")
-        try:
-            # Clean the data and save to cleaned_data directory
-            df = clean_csv(file_path)
-            print(f"Successfully cleaned {data_type} data")
-            print(f"Original shape: {df.shape}")
-        except Exception as e:
-            print(f"Error cleaning {data_type}: {str(e)}")
-    
-    print("\nData cleaning completed!")
+    start = time.perf_counter()
+    reports = []
+
+    for report in iter_clean_events(workers, chunksize, use_cache):
+        reports.append(report)
+        data_type = report["dataset"]
+        if report["error"]:
+            print(f"Error cleaning {data_type}: {report['error']}")
+            continue
+        print(f"\nSuccessfully cleaned {data_type} data")
+        print(f"Original shape: ({report['rows']}, {report['columns']})")
+        print(
+            f"Time: {report['wall_time_s']:.3f}s | "
+            f"{report['rows_per_s'] or 0:,.0f} rows/s | "
+            f"Input: {report['input_bytes'] / 1024:,.1f} KiB | "
+            f"Peak memory: {(report['peak_memory_bytes'] or 0) / 1024 ** 2:,.1f} MiB"
+        )
+
+    summary = {
+        "workers": workers or os.cpu_count() or 1,
+        "wall_time_s": time.perf_counter() - start,
+        "datasets": reports,
+    }
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(summary, f, indent=4)
+
+    print(f"\nData cleaning completed in {summary['wall_time_s']:.2f}s!")
+    return summary
 
 if __name__ == "__main__":
-    clean_all_data() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean every dataset listed in DATA_PATHS.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream each file in chunks of this many rows")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always re-parse sources instead of using the binary cache")
+    parser.add_argument("--report", default=None,
+                        help="write the per-dataset report to this JSON file")
+    args = parser.parse_args()
+
+    clean_all_data(
+        workers=args.workers,
+        chunksize=args.chunksize,
+        use_cache=not args.no_cache,
+        report_path=args.report,
+    )
@@ -24,14 +24,15 @@ def allocate_maintenance(budget: float) -> List[Dict]:
             continue
 
         # Calculate road importance score: worse condition and higher traffic = higher priority
-        score = (10 - condition) * row.traffic_level
+        # int16 in the schema; widen before multiplying
+        score = (10 - condition) * int(row.traffic_level)
 
         # Create a dictionary with all road information
         road = {
             "FromID": row.from_id,        # Starting point ID
             "ToID": row.to_id,            # Ending point ID
             "Condition": condition,        # Current road condition (1-10)
-            "Capacity": row.traffic_level, # Traffic level (vehicles per day)
+            "Capacity": int(row.traffic_level), # Traffic level (vehicles per day)
             "Distance": distance,          # Road length in kilometers
             "MaintenanceCost": cost,       # Estimated maintenance cost
             "Score": score                 # Priority score for maintenance
@@ -1,5 +1,7 @@
 # graph_builder.py
 
+import numpy as np
+
 class Graph:
     def __init__(self):
         self.nodes = set()
@@ -14,4 +16,214 @@ class Graph:
         return list(self.nodes)
 
     def get_edges(self):
-        return self.edges
\ No newline at end of file
+        return self.edges
+
+    def to_csr(self):
+        return CSRGraph.from_graph(self)
+
+class CSRGraph:
+    """
+    Compact array form of a road graph with integer node indices.
+
+    Nodes are numbered 0..n-1 and node_ids[i] is the external id of node i.
+    Edges keep their input order in the columnar edge_* arrays. Each undirected
+    edge is stored as two arcs. Arcs are grouped by source node, so the
+    neighbours of node i are indices[indptr[i]:indptr[i + 1]]. weights holds the
+    matching arc weights and edge_of_arc maps each arc back to its edge.
+    """
+
+    def __init__(self, node_ids, edge_u, edge_v, weights, traffic=None, condition=None, directed=False):
+        self.node_ids = list(node_ids)
+        self._index = None
+        self.directed = directed
+
+        m = len(edge_u)
+        self.edge_u = np.asarray(edge_u, dtype=np.int32)
+        self.edge_v = np.asarray(edge_v, dtype=np.int32)
+        self.edge_weights = np.asarray(weights, dtype=np.float64)
+        self.edge_traffic = np.zeros(m, dtype=np.int32) if traffic is None else np.asarray(traffic, dtype=np.int32)
+        self.edge_condition = np.zeros(m, dtype=np.int8) if condition is None else np.asarray(condition, dtype=np.int8)
+
+        edge_ids = np.arange(m, dtype=np.int32)
+        if directed:
+            src, dst, arc_edges = self.edge_u, self.edge_v, edge_ids
+        else:
+            src = np.concatenate([self.edge_u, self.edge_v])
+            dst = np.concatenate([self.edge_v, self.edge_u])
+            arc_edges = np.concatenate([edge_ids, edge_ids])
+
+        n = len(self.node_ids)
+        order = np.argsort(src, kind="stable")
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+        self.indices = dst[order].astype(np.int32)
+        self.edge_of_arc = arc_edges[order].astype(np.int32)
+        self.weights = self.edge_weights[self.edge_of_arc]
+        self.keep_lists = False
+        self._lists = {}
+        self._transposed = None
+        self._twins = None
+
+    @classmethod
+    def from_arrays(cls, node_ids, indptr, indices, weights, edge_of_arc,
+                    edge_u, edge_v, edge_weights, traffic, condition, directed=False):
+        """
+        Wrap prebuilt CSR arrays, e.g. memory-mapped from a snapshot, without
+        copying or re-sorting them.
+        """
+        graph = cls.__new__(cls)
+        graph.node_ids = list(node_ids)
+        graph._index = None
+        graph.directed = directed
+        graph.indptr, graph.indices, graph.weights, graph.edge_of_arc = indptr, indices, weights, edge_of_arc
+        graph.edge_u, graph.edge_v, graph.edge_weights = edge_u, edge_v, edge_weights
+        graph.edge_traffic, graph.edge_condition = traffic, condition
+        graph.keep_lists = False
+        graph._lists = {}
+        graph._transposed = None
+        graph._twins = None
+        return graph
+
+    @classmethod
+    def from_edges(cls, u, v, weights, traffic=None, condition=None, node_ids=None, directed=False):
+        """
+        Build from parallel sequences of external endpoint ids. Nodes are numbered
+        in order of first appearance unless node_ids fixes the numbering.
+        """
+        node_ids = [] if node_ids is None else list(node_ids)
+        index = {label: i for i, label in enumerate(node_ids)}
+        edge_u, edge_v = [], []
+        for a, b in zip(u, v):
+            for label, out in ((a, edge_u), (b, edge_v)):
+                i = index.get(label)
+                if i is None:
+                    i = index[label] = len(node_ids)
+                    node_ids.append(label)
+                out.append(i)
+        return cls(node_ids, edge_u, edge_v, weights, traffic, condition, directed)
+
+    @classmethod
+    def from_graph(cls, graph):
+        edges = graph.get_edges()
+        return cls.from_edges(
+            [u for _, u, _, _ in edges],
+            [v for _, _, v, _ in edges],
+            [w for w, _, _, _ in edges],
+            traffic=[t for _, _, _, t in edges],
+        )
+
+    def to_graph(self):
+        graph = Graph()
+        for weight, u, v, traffic_level in self.get_edges():
+            graph.add_edge(u, v, weight, traffic_level)
+        return graph
+
+    @property
+    def index(self):
+        """
+        External id -> node index, built on first use.
+        """
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.node_ids)}
+        return self._index
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_u)
+
+    def get_nodes(self):
+        return list(self.node_ids)
+
+    def get_edges(self):
+        labels = self.node_ids
+        return [
+            (w, labels[u], labels[v], t)
+            for w, u, v, t in zip(
+                self.edge_weights.tolist(), self.edge_u.tolist(), self.edge_v.tolist(), self.edge_traffic.tolist()
+            )
+        ]
+
+    def degree(self, i):
+        return int(self.indptr[i + 1] - self.indptr[i])
+
+    def neighbors(self, i):
+        """
+        Return (neighbour indices, arc weights) of node i as array views.
+        """
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def arc_weights(self, edge_weights):
+        """
+        Spread a per-edge weight vector (in edge order) onto the arcs.
+        """
+        return np.asarray(edge_weights, dtype=np.float64)[self.edge_of_arc]
+
+    def transpose(self):
+        """
+        Graph with every arc reversed, built once; an undirected graph is its
+        own transpose.
+        """
+        if not self.directed:
+            return self
+        if self._transposed is None:
+            self._transposed = CSRGraph(
+                self.node_ids, self.edge_v, self.edge_u, self.edge_weights,
+                self.edge_traffic, self.edge_condition, directed=True,
+            )
+            self._transposed.keep_lists = self.keep_lists
+        return self._transposed
+
+    def transpose_arc_weights(self, arc_weights):
+        """
+        Re-order arc weights of this graph to line up with the arcs of transpose().
+        An undirected graph is its own transpose, but arc u -> v of the transpose
+        is traversed as v -> u, so it takes the weight of its twin arc.
+        """
+        if not self.directed:
+            if self._twins is None:
+                # the two arcs of each edge sit next to each other in edge order
+                order = np.argsort(self.edge_of_arc, kind="stable")
+                twins = np.empty_like(order)
+                twins[order[0::2]] = order[1::2]
+                twins[order[1::2]] = order[0::2]
+                self._twins = twins
+            return np.asarray(arc_weights, dtype=np.float64)[self._twins]
+        edge_weights = np.empty(self.num_edges)
+        edge_weights[self.edge_of_arc] = arc_weights
+        return self.transpose().arc_weights(edge_weights)
+
+    def adjacency_lists(self, arc_weights=None):
+        """
+        Plain Python lists (indptr, indices, weights) for the pure-Python search
+        loops, which index lists much faster than NumPy arrays. arc_weights
+        already given as a list are used as they are.
+
+        The lists take several times the memory of the arrays, so they are only
+        kept on the graph when keep_lists is set; otherwise every call pays an
+        O(arcs) conversion. Set it on long-lived graphs that answer many
+        queries, and call drop_lists() to free what was kept.
+        """
+        if arc_weights is None:
+            lists = self._lists.get("base")
+            if lists is None:
+                lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+                if self.keep_lists:
+                    self._lists["base"] = lists
+            return lists
+        indptr, indices, _ = self.adjacency_lists()
+        if not isinstance(arc_weights, list):
+            arc_weights = np.asarray(arc_weights, dtype=np.float64).tolist()
+        return indptr, indices, arc_weights
+
+    def drop_lists(self):
+        """
+        Free the lists kept by adjacency_lists and shortest_path.queues.
+        """
+        self._lists.clear()
+        if self._transposed is not None:
+            self._transposed._lists.clear()
@@ -0,0 +1,37 @@
+from graph.graph_builder import Graph, CSRGraph
+
+def make_graph():
+    g = Graph()
+    g.add_edge('A', 'B', 5, 2)
+    g.add_edge('B', 'C', 3)
+    g.add_edge('A', 'C', 7, 1)
+    return g
+
+def test_csr_neighbors():
+    csr = make_graph().to_csr()
+    assert (csr.num_nodes, csr.num_edges) == (3, 3)
+    b = csr.index['B']
+    neighbors, weights = csr.neighbors(b)
+    assert sorted(zip((csr.node_ids[i] for i in neighbors), weights.tolist())) == [('A', 5.0), ('C', 3.0)]
+    assert csr.degree(b) == 2
+
+def test_csr_round_trip():
+    g = make_graph()
+    assert CSRGraph.from_graph(g).to_graph().get_edges() == g.get_edges()
+    assert CSRGraph.from_graph(g).edge_traffic.tolist() == [2, 0, 1]
+
+def test_directed_transpose():
+    csr = CSRGraph.from_edges(['A', 'B'], ['B', 'C'], [1.0, 2.0], directed=True)
+    assert csr.degree(csr.index['C']) == 0
+    reverse = csr.transpose()
+    neighbors, _ = reverse.neighbors(reverse.index['C'])
+    assert [reverse.node_ids[i] for i in neighbors] == ['B']
+
+def test_adjacency_lists_kept_only_on_request():
+    csr = make_graph().to_csr()
+    assert csr.adjacency_lists() == csr.adjacency_lists()
+    assert csr.adjacency_lists() is not csr.adjacency_lists()
+    csr.keep_lists = True
+    assert csr.adjacency_lists() is csr.adjacency_lists()
+    csr.drop_lists()
+    assert csr._lists == {}
@@ -57,7 +57,8 @@ def main():
             from_id, to_id = row['From'], row['To']
             direction = estimate_direction(from_id, to_id)
             for p in periods:
-                entry_directions[p][direction] += row[p]
+                # int16 in the schema; widen so the totals cannot overflow
+                entry_directions[p][direction] += int(row[p])
 
         result = {"intersection_id": to_node}
         for p in periods:
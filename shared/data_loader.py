@@ -1,4 +1,5 @@
-from shared.preprocessing import clean_csv
+from collections import Counter
+import threading
 
 # mapping between type name and actual file path
 DATA_PATHS = {
@@ -14,16 +15,136 @@ DATA_PATHS = {
     "locations": "shared/data/locations.csv"
 }
 
+# declared column dtypes for every entry in DATA_PATHS, applied and validated on load.
+# IDs are categorical, distances and coordinates float32, levels and counts the smallest
+# integer that holds them. Consumers upcast before summing (e.g. astype("int64").sum())
+# and round floats for display.
+DATA_SCHEMAS = {
+    "neighborhoods": {
+        "id": "category", "name": "str", "population": "int32",
+        "x_coordinate": "float32", "y_coordinate": "float32",
+    },
+    "facilities": {
+        "id": "category", "name": "str", "type": "category",
+        "x_coordinate": "float32", "y_coordinate": "float32",
+    },
+    "roads": {
+        "from_id": "category", "to_id": "category", "distance_km": "float32",
+        "traffic_level": "int16", "condition": "int8",
+    },
+    "new_roads": {
+        "fromid": "category", "toid": "category", "distancekm": "float32",
+        "estimated_capacityvehicles/hour": "int16", "construction_costmillion_egp": "int16",
+    },
+    "bus_routes": {
+        "routeid": "category", "stopscomma_separated_ids": "str",
+        "busesassigned": "int16", "dailypassengers": "int32",
+    },
+    "metro_lines": {
+        "lineid": "category", "name": "str", "stationscomma_separated_ids": "str",
+        "daily_passengers": "int32",
+    },
+    "traffic": {
+        "roadid": "category", "morning_peakveh/h": "int16", "afternoonveh/h": "int16",
+        "evening_peakveh/h": "int16", "nightveh/h": "int16",
+    },
+    "demand": {
+        "fromid": "category", "toid": "category", "daily_passengers": "int32",
+    },
+    "greedy_intersections": {
+        "intersection_id": "category", "north_traffic": "int16", "south_traffic": "int16",
+        "east_traffic": "int16", "west_traffic": "int16",
+    },
+    "locations": {
+        "id": "category", "name": "str", "type": "category", "x": "float32", "y": "float32",
+    },
+}
+
+class DatasetRegistry:
+    """
+    Process-wide store of cleaned datasets. Each dataset is parsed once and every
+    caller gets its own read-only view of the shared frame.
+    """
+
+    def __init__(self, paths=None, schemas=None):
+        self.paths = DATA_PATHS if paths is None else paths
+        self.schemas = DATA_SCHEMAS if schemas is None else schemas
+        self._frames = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = Counter()
+
+    def get(self, data_type: str):
+        key = data_type.lower()
+        path = self.paths.get(key)
+        if not path:
+            raise ValueError(f"Unknown data type: {data_type}")
+
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                # Imported here so reading DATA_PATHS/DATA_SCHEMAS does not load pandas
+                from shared.preprocessing import clean_csv
+                self.misses += 1
+                self.loads[key] += 1
+                frame = _freeze(clean_csv(path, schema=self.schemas.get(key)))
+                self._frames[key] = frame
+            else:
+                self.hits += 1
+
+        # A shallow copy keeps column reassignment (e.g. df["id"] = ...astype(str))
+        # local to the caller, while in-place writes hit the read-only buffers
+        return frame.copy(deep=False)
+
+    def invalidate(self, data_type: str = None):
+        """
+        Drop one dataset (or all of them) so the next request reloads it.
+        """
+        with self._lock:
+            if data_type is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(data_type.lower(), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "loaded": sorted(self._frames),
+                "loads": dict(self.loads),
+            }
+
+def _freeze(df):
+    """
+    Own the frame's buffers and mark them read-only. Each NumPy-backed column
+    gets its own read-only array; extension columns (e.g. category) are kept.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=True)
+            values.flags.writeable = False
+            series = pd.Series(values, index=df.index, name=name, copy=False)
+        else:
+            series = series.copy()
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+registry = DatasetRegistry()
+
 def load_data(data_type: str):
     """
     Load a specific cleaned CSV dataset based on its type keyword.
-    
+    Datasets are parsed once per process; see DatasetRegistry.
+
     Available types:
     - neighborhoods, facilities, roads, new_roads
     - bus_routes, metro_lines, traffic, demand
     """
-    path = DATA_PATHS.get(data_type.lower())
-    if path:
-        return clean_csv(path)
-    else:
-        raise ValueError(f"Unknown data type: {data_type}")
+    return registry.get(data_type)
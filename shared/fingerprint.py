@@ -0,0 +1,39 @@
+import hashlib
+from pathlib import Path
+
+# Kept free of pandas so cheap staleness checks do not pay for its import
+
+def file_fingerprint(file_path: str) -> dict:
+    """
+    Identify a source file by its resolved path, mtime, size and content hash.
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    return {
+        "path": str(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": content_hash(path),
+    }
+
+def fingerprint_matches(fingerprint: dict) -> bool:
+    """
+    True when the fingerprinted file still has the same content. The hash is only
+    recomputed when mtime or size changed, so a touched but unmodified file
+    (e.g. after a git checkout) still matches.
+    """
+    path = Path(fingerprint.get("path", ""))
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if (fingerprint.get("mtime_ns"), fingerprint.get("size")) == (stat.st_mtime_ns, stat.st_size):
+        return True
+    return fingerprint.get("size") == stat.st_size and fingerprint.get("sha256") == content_hash(path)
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
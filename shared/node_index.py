@@ -0,0 +1,130 @@
+import threading
+import numpy as np
+import pandas as pd
+
+class NodeIndex:
+    """
+    Interning table mapping external node ids ("1", "F2", "A1") to dense int32
+    indices, with reverse lookup for display. Ids are compared as stripped strings.
+    """
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self._index = {}
+        self._pd_index = None
+        self.intern_many(labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, label):
+        return str(label).strip() in self._index
+
+    def intern(self, label) -> int:
+        label = str(label).strip()
+        i = self._index.get(label)
+        if i is None:
+            i = self._index[label] = len(self.labels)
+            self.labels.append(label)
+            self._pd_index = None
+        return i
+
+    def intern_many(self, labels) -> np.ndarray:
+        """
+        Intern a column of ids and return their indices as an int32 array.
+        Only the distinct values are hashed in Python; categoricals reuse their codes.
+        """
+        values = pd.Series(labels) if not isinstance(labels, pd.Series) else labels
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            if (codes < 0).any():
+                raise ValueError("cannot intern missing node ids")
+            return self.intern_many(values.cat.categories)[codes]
+
+        values = values.astype(str).str.strip()
+        for label in pd.unique(values):
+            if label not in self._index:
+                self.intern(label)
+        return self.lookup_many(values)
+
+    def lookup(self, label) -> int:
+        """
+        Index of a known id; raises KeyError for ids never interned.
+        """
+        return self._index[str(label).strip()]
+
+    def lookup_many(self, labels) -> np.ndarray:
+        """
+        Indices of a column of ids, with -1 for ids never interned.
+        """
+        if self._pd_index is None:
+            self._pd_index = pd.Index(self.labels)
+        values = pd.Series(labels).astype(str).str.strip()
+        return self._pd_index.get_indexer(values).astype(np.int32)
+
+    def label(self, i) -> str:
+        return self.labels[i]
+
+    def labels_of(self, indices) -> list:
+        labels = self.labels
+        return [labels[i] for i in np.asarray(indices).tolist()]
+
+def split_road_ids(road_ids, index: NodeIndex):
+    """
+    Intern traffic road ids of the form "1-3" and return (from, to) index arrays.
+    """
+    ends = pd.Series(road_ids).astype(str).str.split("-", n=1, expand=True)
+    return index.intern_many(ends[0]), index.intern_many(ends[1])
+
+def split_stop_lists(stop_lists, index: NodeIndex) -> list:
+    """
+    Intern comma-separated stop lists ("1,3,6,9") into one int32 array per row.
+    """
+    stops = pd.Series(stop_lists).astype(str).str.split(",")
+    flat = index.intern_many(stops.explode())
+    bounds = np.cumsum([0] + stops.str.len().tolist())
+    return [flat[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+_node_index = None
+_lock = threading.Lock()
+
+def build_node_index() -> NodeIndex:
+    """
+    Intern every node id referenced by the datasets. Locations come first so the
+    numbering of named places is stable regardless of what the road data adds.
+    """
+    from shared.data_loader import load_data
+
+    index = NodeIndex()
+    for data_type, columns in [
+        ("locations", ["id"]),
+        ("neighborhoods", ["id"]),
+        ("facilities", ["id"]),
+        ("roads", ["from_id", "to_id"]),
+        ("new_roads", ["fromid", "toid"]),
+        ("demand", ["fromid", "toid"]),
+        ("greedy_intersections", ["intersection_id"]),
+    ]:
+        df = load_data(data_type)
+        for col in columns:
+            index.intern_many(df[col])
+
+    split_road_ids(load_data("traffic")["roadid"], index)
+    split_stop_lists(load_data("bus_routes")["stopscomma_separated_ids"], index)
+    split_stop_lists(load_data("metro_lines")["stationscomma_separated_ids"], index)
+    return index
+
+def get_node_index() -> NodeIndex:
+    """
+    Process-wide node index, built from the datasets on first use.
+    """
+    global _node_index
+    with _lock:
+        if _node_index is None:
+            _node_index = build_node_index()
+        return _node_index
+
+def reset_node_index():
+    global _node_index
+    with _lock:
+        _node_index = None
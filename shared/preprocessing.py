@@ -1,60 +1,420 @@
 import pandas as pd
+import numpy as np
+import json
 import os
+import pickle
+import tempfile
 from pathlib import Path
+from shared.fingerprint import file_fingerprint, fingerprint_matches
 
-def clean_csv(file_path: str) -> pd.DataFrame:
+# Bump whenever the cleaning steps below change so stale caches are rebuilt
+CACHE_VERSION = 2
+
+def _cache_paths(cleaned_dir: Path, file_path: str):
+    cache_dir = cleaned_dir / ".cache"
+    stem = f"cleaned_{Path(file_path).stem}"
+    return cache_dir / f"{stem}.npz", cache_dir / f"{stem}.json"
+
+def _read_cache(data_path: Path, meta_path: Path, file_path: str, schema: dict = None):
+    """
+    Return the cached cleaned frame if it still matches the source file, else None.
+    """
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    source = meta.get("source", {})
+    path = Path(file_path).resolve()
+    if meta.get("version") != CACHE_VERSION or source.get("path") != str(path):
+        return None
+    if meta.get("schema") != schema:
+        return None
+
+    if not fingerprint_matches(source):
+        return None
+    stat = path.stat()
+    if source.get("mtime_ns") != stat.st_mtime_ns:
+        # Same content under a new mtime: refresh the key so the next load is stat-only
+        meta["source"] = dict(source, mtime_ns=stat.st_mtime_ns)
+        _write_json(meta_path, meta)
+
+    try:
+        with np.load(data_path, allow_pickle=False) as arrays:
+            columns = {}
+            for i, (name, kind) in enumerate(zip(meta["columns"], meta["kinds"])):
+                values = arrays[f"c{i}"]
+                if kind == "str":
+                    values = values.astype(object)
+                elif kind == "category":
+                    categories = arrays[f"c{i}_categories"].astype(object)
+                    values = pd.Categorical.from_codes(values, categories=categories)
+                columns[name] = values
+            index = arrays["index"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return pd.DataFrame(columns, columns=meta["columns"], index=index)
+
+def _write_cache(data_path: Path, meta_path: Path, df: pd.DataFrame, fingerprint: dict, schema: dict = None):
+    """
+    Store the cleaned frame column by column in an uncompressed .npz archive.
+    Frames with column types the archive cannot hold without pickling are skipped.
+    """
+    if not pd.api.types.is_integer_dtype(df.index.dtype):
+        return
+    arrays, kinds = {"index": df.index.to_numpy()}, []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if series.dtype == object:
+            if pd.api.types.infer_dtype(series, skipna=False) != "string":
+                return
+            arrays[f"c{i}"] = series.to_numpy(dtype=str)
+            kinds.append("str")
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if pd.api.types.infer_dtype(categories, skipna=False) != "string":
+                return
+            arrays[f"c{i}"] = series.cat.codes.to_numpy()
+            arrays[f"c{i}_categories"] = categories.to_numpy(dtype=str)
+            kinds.append("category")
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            arrays[f"c{i}"] = series.to_numpy()
+            kinds.append("numeric")
+        else:
+            return
+
+    data_path.parent.mkdir(exist_ok=True)
+    tmp_path = data_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, data_path)
+    _write_json(meta_path, {
+        "version": CACHE_VERSION,
+        "source": fingerprint,
+        "schema": schema,
+        "columns": [str(col) for col in df.columns],
+        "kinds": kinds,
+    })
+
+def _write_json(path: Path, payload: dict):
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+def _normalize_columns(columns: pd.Index) -> pd.Index:
+    return (
+        columns
+        .str.strip()
+        .str.lower()
+        .str.replace(r"[\[\]()]", "", regex=True)
+        .str.replace(" ", "_", regex=False)
+        .str.replace("-", "_", regex=False)
+    )
+
+def apply_schema(df: pd.DataFrame, schema: dict, name: str = "dataset") -> pd.DataFrame:
+    """
+    Cast a cleaned frame to its declared column dtypes and validate it.
+    Raises ValueError when a declared column is missing, a value cannot be
+    converted, or an integer does not fit its declared width.
+    """
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise ValueError(f"{name}: missing columns {missing}")
+
+    df = df.copy()
+    for col, dtype in schema.items():
+        if dtype == "category":
+            df[col] = df[col].astype(str).astype("category")
+        elif dtype == "str":
+            df[col] = df[col].astype(str)
+        else:
+            target = np.dtype(dtype)
+            values = pd.to_numeric(df[col], errors='coerce')
+            if values.isna().any():
+                raise ValueError(f"{name}: column {col!r} has missing or non-numeric values")
+            if target.kind in "iu":
+                info = np.iinfo(target)
+                if (values % 1 != 0).any() or values.min() < info.min or values.max() > info.max:
+                    raise ValueError(f"{name}: column {col!r} does not fit {dtype}")
+            df[col] = values.astype(target)
+    return df
+
+def clean_csv(file_path: str, use_cache: bool = True, schema: dict = None) -> pd.DataFrame:
     """
     Clean and preprocess CSV data with comprehensive cleaning steps.
     Returns a cleaned pandas DataFrame.
+
+    The cleaned frame is cached in binary form next to the cleaned CSVs, keyed on
+    the source file fingerprint. Warm loads skip both the parse and the CSV write.
+    When a schema (column -> dtype) is given, the frame is cast and validated
+    with apply_schema.
     """
     # Create cleaned_data directory if it doesn't exist
     cleaned_dir = Path(file_path).parent.parent / "cleaned_data"
     cleaned_dir.mkdir(exist_ok=True)
-    
+
+    data_path, meta_path = _cache_paths(cleaned_dir, file_path)
+    if use_cache:
+        cached = _read_cache(data_path, meta_path, file_path, schema)
+        if cached is not None:
+            return cached
+        # Fingerprint before parsing so a file edited mid-clean is never cached as fresh
+        fingerprint = file_fingerprint(file_path)
+
     # Read the original CSV
     df = pd.read_csv(file_path, encoding='utf-8-sig')
-    
+
     # 1. Clean column names
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.lower()
-        .str.replace(r"[\[\]()]", "", regex=True)
-        .str.replace(" ", "_", regex=False)
-        .str.replace("-", "_", regex=False)
-    )
-    
+    df.columns = _normalize_columns(df.columns)
+
     # 2. Clean string values
     for col in df.select_dtypes(include=['object']).columns:
         df[col] = df[col].str.strip()
-    
+
     # 3. Handle missing values
     # For numeric columns, fill with median
     numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
     for col in numeric_cols:
         df[col] = df[col].fillna(df[col].median())
-    
+
     # For categorical columns, fill with mode
     categorical_cols = df.select_dtypes(include=['object']).columns
     for col in categorical_cols:
         df[col] = df[col].fillna(df[col].mode()[0])
-    
+
     # 4. Remove duplicates
     df = df.drop_duplicates()
-    
+
     # 5. Data type conversion
     # Convert ID columns to string
     id_cols = [col for col in df.columns if 'id' in col.lower()]
     for col in id_cols:
         df[col] = df[col].astype(str)
-    
+
     # Convert numeric columns
     numeric_cols = [col for col in df.columns if any(term in col.lower() for term in ['count', 'number', 'amount', 'cost', 'price'])]
     for col in numeric_cols:
         df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # 6. Save cleaned version
+
+    # 6. Apply the declared schema
+    if schema:
+        df = apply_schema(df, schema, Path(file_path).name)
+
+    # 7. Save cleaned version
     cleaned_path = cleaned_dir / f"cleaned_{Path(file_path).name}"
     df.to_csv(cleaned_path, index=False)
-    
+
+    if use_cache:
+        _write_cache(data_path, meta_path, df, fingerprint, schema)
+
     return df
+
+class _Reservoir:
+    """
+    Fixed-size uniform sample of a numeric stream, used for approximate medians.
+    Each value gets a random key and the `size` smallest keys are kept, so the
+    sample is exact (and the median too) until more than `size` values arrive.
+    """
+
+    def __init__(self, size: int, rng: np.random.Generator):
+        self.size = size
+        self.rng = rng
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+
+    def update(self, values: np.ndarray):
+        keys = np.concatenate([self.keys, self.rng.random(len(values))])
+        values = np.concatenate([self.values, values])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            keys, values = keys[keep], values[keep]
+        self.keys, self.values = keys, values
+
+    def median(self):
+        return float(np.median(self.values)) if len(self.values) else None
+
+class _FrequentItems:
+    """
+    Mergeable Misra-Gries summary of at most `capacity` counters, used for
+    approximate modes. Counts are exact while the column has at most `capacity`
+    distinct values; beyond that each count is low by at most n / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+
+    def update(self, counts: pd.Series):
+        merged = self.counts.add(counts, fill_value=0) if len(self.counts) else counts
+        if len(merged) > self.capacity:
+            cut = merged.nlargest(self.capacity + 1).iloc[-1]
+            merged = merged[merged > cut] - cut
+        self.counts = merged
+
+    def mode(self):
+        if not len(self.counts):
+            return None
+        # Same tie-break as Series.mode()[0]: smallest of the most frequent values
+        return min(self.counts.index[self.counts == self.counts.max()])
+
+def _read_chunks(file_path: str, chunksize: int, dtype=None):
+    reader = pd.read_csv(file_path, encoding='utf-8-sig', chunksize=chunksize, dtype=dtype)
+    with reader:
+        for chunk in reader:
+            chunk.columns = _normalize_columns(chunk.columns)
+            yield chunk
+
+def _fill_chunk(chunk: pd.DataFrame, is_numeric: dict, fills: dict) -> pd.DataFrame:
+    for col in chunk.columns:
+        if not is_numeric[col]:
+            chunk[col] = chunk[col].str.strip()
+    return chunk.fillna(fills)
+
+def _spill_rows(files: list, chunk: pd.DataFrame, first_row: int):
+    # Rows go to the partition of their hash, indexed by their input row number
+    chunk = chunk.set_axis(pd.RangeIndex(first_row, first_row + len(chunk)))
+    hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    part = (hashes % np.uint64(len(files))).astype(np.intp)
+    for p in np.unique(part):
+        pickle.dump(chunk[part == p], files[p], protocol=pickle.HIGHEST_PROTOCOL)
+
+def _duplicate_rows(path: Path) -> np.ndarray:
+    """
+    Sorted row numbers of the repeated rows in one spilled partition. Rows are
+    compared by value, so a hash collision never drops a distinct row; they
+    were appended in input order, so the first occurrence is the one kept.
+    """
+    pieces = []
+    with open(path, "rb") as f:
+        while True:
+            try:
+                pieces.append(pickle.load(f))
+            except EOFError:
+                break
+    if not pieces:
+        return np.empty(0, dtype=np.int64)
+    rows = pd.concat(pieces)
+    return rows.index[rows.duplicated()].to_numpy(dtype=np.int64)
+
+def stream_clean_csv(
+    file_path: str,
+    chunksize: int = 100_000,
+    sample_size: int = 100_000,
+    mode_capacity: int = 1024,
+    dedup_rows: int = 4_000_000,
+    seed: int = 0,
+    schema: dict = None
+) -> tuple:
+    """
+    Clean a CSV too large to hold in memory, applying the same steps as clean_csv
+    in bounded-size chunks. Returns the path of the cleaned CSV and the number
+    of rows written to it.
+
+    The first pass collects column types, a reservoir sample per numeric column
+    for the median and a frequent-items summary per column for the mode. The
+    second pass fills each chunk and spills its rows to on-disk partitions of
+    about `dedup_rows` rows each, chosen by row hash; the partitions are then
+    de-duplicated one at a time by comparing the rows themselves. The third pass fills each chunk again,
+    drops the duplicate rows and appends it to the output. A schema, if given,
+    is validated per chunk.
+    """
+    cleaned_dir = Path(file_path).parent.parent / "cleaned_data"
+    cleaned_dir.mkdir(exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    header = pd.read_csv(file_path, encoding='utf-8-sig', nrows=0)
+    raw_names = dict(zip(_normalize_columns(header.columns), header.columns))
+    is_numeric = {col: True for col in raw_names}
+    has_float = {col: False for col in raw_names}
+    samples = {col: _Reservoir(sample_size, rng) for col in raw_names}
+    frequent = {col: _FrequentItems(mode_capacity) for col in raw_names}
+    total_rows = 0
+
+    # Pass 1: infer column types and gather fill statistics. Every column is read
+    # as text so its mode counts all chunks, even those read before a
+    # non-numeric value turned the column into text.
+    for chunk in _read_chunks(file_path, chunksize, dtype=str):
+        total_rows += len(chunk)
+        for col in chunk.columns:
+            values = chunk[col].str.strip()
+            frequent[col].update(values.value_counts(sort=False))
+            if not is_numeric[col]:
+                continue
+            numbers = pd.to_numeric(values, errors='coerce')
+            if numbers.notna().sum() < values.notna().sum():
+                # A non-numeric value makes the whole column text, as pd.read_csv would
+                is_numeric[col] = False
+                samples[col] = None
+                continue
+            has_float[col] |= numbers.dtype.kind == "f"
+            samples[col].update(numbers.dropna().to_numpy(dtype=float))
+
+    cleaned_path = cleaned_dir / f"cleaned_{Path(file_path).name}"
+    tmp_path = cleaned_path.with_suffix(".tmp")
+
+    fills = {}
+    for col in raw_names:
+        fill = samples[col].median() if is_numeric[col] else frequent[col].mode()
+        if fill is not None:
+            fills[col] = fill
+    dtypes = {raw_names[col]: (float if has_float[col] else "int64") if is_numeric[col] else str
+              for col in raw_names}
+    id_cols = [col for col in raw_names if 'id' in col.lower()]
+    numeric_cols = [col for col in raw_names if any(term in col.lower() for term in ['count', 'number', 'amount', 'cost', 'price'])]
+
+    with tempfile.TemporaryDirectory(dir=cleaned_dir) as spill_dir:
+        # Pass 2: spill the filled rows, partitioned by hash
+        partitions = max(1, -(-total_rows // max(dedup_rows, 1)))
+        paths = [Path(spill_dir) / f"part{p}.pkl" for p in range(partitions)]
+        files = [open(path, "wb") for path in paths]
+        try:
+            row = 0
+            for chunk in _read_chunks(file_path, chunksize, dtype=dtypes):
+                chunk = _fill_chunk(chunk, is_numeric, fills)
+                _spill_rows(files, chunk, row)
+                row += len(chunk)
+        finally:
+            for f in files:
+                f.close()
+
+        # Equal rows hash to the same partition, so each is de-duplicated on its own
+        drop_paths = [path.with_suffix(".drop") for path in paths]
+        for path, drop_path in zip(paths, drop_paths):
+            _duplicate_rows(path).tofile(drop_path)
+            path.unlink()
+        drops = [np.memmap(path, dtype=np.int64, mode="r") if path.stat().st_size else np.empty(0, dtype=np.int64)
+                 for path in drop_paths]
+        cursors = [0] * partitions
+
+        # Pass 3: fill, drop the duplicates and append chunk by chunk
+        first = True
+        row = written = 0
+        for chunk in _read_chunks(file_path, chunksize, dtype=dtypes):
+            chunk = _fill_chunk(chunk, is_numeric, fills)
+            keep = np.ones(len(chunk), dtype=bool)
+            for p, drop in enumerate(drops):
+                end = cursors[p] + int(np.searchsorted(drop[cursors[p]:], row + len(chunk)))
+                keep[np.asarray(drop[cursors[p]:end]) - row] = False
+                cursors[p] = end
+            row += len(chunk)
+            chunk = chunk[keep]
+
+            for col in id_cols:
+                chunk[col] = chunk[col].astype(str)
+            for col in numeric_cols:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+            if schema:
+                chunk = apply_schema(chunk, schema, Path(file_path).name)
+
+            chunk.to_csv(tmp_path, index=False, header=first, mode="w" if first else "a")
+            written += len(chunk)
+            first = False
+        del drops
+
+    if first:
+        # Header-only input
+        pd.DataFrame(columns=list(raw_names)).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, cleaned_path)
+    return cleaned_path, written
@@ -0,0 +1,54 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from shared.data_loader import DatasetRegistry
+
+def make_registry(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    source = data_dir / "Existing_Roads.csv"
+    source.write_text("from_id,to_id,distance_km,traffic_level,condition\n1,3,8.5,3000,7\n3,5,6.25,2500,6\n")
+    return DatasetRegistry({"roads": str(source)})
+
+def test_dataset_parsed_once(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.get("roads")
+    registry.get("ROADS")
+    stats = registry.stats()
+    assert stats["loads"] == {"roads": 1}
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    registry.invalidate("roads")
+    registry.get("roads")
+    assert registry.stats()["loads"] == {"roads": 2}
+
+def test_views_do_not_leak_mutations(tmp_path):
+    registry = make_registry(tmp_path)
+    view = registry.get("roads")
+    view["from_id"] = view["from_id"].astype(int)
+    assert registry.get("roads")["from_id"].tolist() == ["1", "3"]
+
+    view = registry.get("roads")
+    with pytest.raises(ValueError):
+        view.loc[0, "distance_km"] = 0.0
+    assert registry.get("roads")["distance_km"].tolist() == [8.5, 6.25]
+
+def test_unknown_dataset(tmp_path):
+    with pytest.raises(ValueError):
+        make_registry(tmp_path).get("ferries")
+
+def test_schema_applied_on_load(tmp_path):
+    roads = make_registry(tmp_path).get("roads")
+    assert roads["from_id"].dtype == "category"
+    assert roads["distance_km"].dtype == "float32"
+    assert roads["condition"].dtype == "int8"
+
+def test_schema_rejects_out_of_range_values(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.schemas = {"roads": {"condition": "int8", "traffic_level": "int8"}}
+    with pytest.raises(ValueError, match="traffic_level"):
+        registry.get("roads")
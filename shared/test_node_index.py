@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from shared.node_index import NodeIndex, split_road_ids, split_stop_lists
+
+def test_intern_is_dense_and_reversible():
+    index = NodeIndex(["1", "F2"])
+    ids = index.intern_many(pd.Series(["F2", " 3", "1", "3"], dtype="category"))
+    assert ids.tolist() == [1, 2, 0, 2]
+    assert ids.dtype == "int32"
+    assert index.labels_of(ids) == ["F2", "3", "1", "3"]
+    assert index.lookup_many(["3", "A1"]).tolist() == [2, -1]
+
+def test_split_helpers_share_the_index():
+    index = NodeIndex()
+    u, v = split_road_ids(["1-3", "3-F2"], index)
+    assert (u.tolist(), v.tolist()) == ([0, 1], [1, 2])
+    stops = split_stop_lists(["1,3,6", "F2,1"], index)
+    assert [s.tolist() for s in stops] == [[0, 1, 3], [2, 0]]
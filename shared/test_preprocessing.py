@@ -0,0 +1,85 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from shared.preprocessing import clean_csv, stream_clean_csv
+
+def write_source(tmp_path, text):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir(exist_ok=True)
+    source = data_dir / "Roads.csv"
+    source.write_text(text)
+    return source
+
+def test_cache_round_trip(tmp_path):
+    source = write_source(tmp_path, "FromID,ToID,Distance(km)\n1,3,8.5\n1,3,8.5\nF2, 4,\n")
+    cold = clean_csv(str(source))
+    cleaned_csv = tmp_path / "cleaned_data" / "cleaned_Roads.csv"
+    os.remove(cleaned_csv)
+
+    warm = clean_csv(str(source))
+    pd.testing.assert_frame_equal(cold, warm)
+    # A warm load neither re-parses nor rewrites the cleaned CSV
+    assert not cleaned_csv.exists()
+
+def test_cache_invalidated_by_content_change(tmp_path):
+    source = write_source(tmp_path, "FromID,ToID,Distance(km)\n1,3,8.5\n")
+    clean_csv(str(source))
+    source.write_text("FromID,ToID,Distance(km)\n1,3,9.5\n")
+    assert clean_csv(str(source))["distancekm"].tolist() == [9.5]
+
+def test_cache_survives_touch(tmp_path):
+    source = write_source(tmp_path, "FromID,ToID,Distance(km)\n1,3,8.5\n")
+    clean_csv(str(source))
+    os.utime(source, ns=(1, 1))
+    cleaned_csv = tmp_path / "cleaned_data" / "cleaned_Roads.csv"
+    os.remove(cleaned_csv)
+    assert clean_csv(str(source))["distancekm"].tolist() == [8.5]
+    assert not cleaned_csv.exists()
+
+def test_streaming_matches_in_memory_clean(tmp_path):
+    source = write_source(tmp_path, (
+        "RoadID,Distance(km),Condition,Type\n"
+        "1-3,8.5,7, Main\n"
+        "1-8,,6,Main\n"
+        "1-3,8.5,7,Main\n"
+        "2-5,4.1,,Side\n"
+        "1-8,5.0,6,\n"
+        "2-5,4.1,7,Side\n"
+    ))
+    expected = clean_csv(str(source), use_cache=False)
+    cleaned_path, rows = stream_clean_csv(str(source), chunksize=2)
+    assert rows == len(expected)
+    streamed = pd.read_csv(cleaned_path, dtype={"roadid": str})
+    pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True))
+
+def test_streaming_dedup_partitions_and_late_text_columns(tmp_path):
+    # "Type" only turns out to be text in the third chunk; its mode must still count "1"
+    source = write_source(tmp_path, (
+        "RoadID,Type,Cost\n"
+        "1-3,1,8\n"
+        "1-8,1,6\n"
+        "1-3,1,8\n"
+        "2-5,,7\n"
+        "2-6,Side,\n"
+        "1-8,1,6\n"
+        "2-5,1,7\n"
+    ))
+    expected = clean_csv(str(source), use_cache=False)
+    cleaned_path, _ = stream_clean_csv(str(source), chunksize=2, dedup_rows=2)
+    streamed = pd.read_csv(cleaned_path, dtype={"roadid": str, "type": str})
+    pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True))
+    assert streamed["type"].tolist() == ["1", "1", "1", "Side"]
+
+def test_streaming_dedup_survives_hash_collisions(tmp_path, monkeypatch):
+    source = write_source(tmp_path, "RoadID,Cost\n1-3,8\n1-8,6\n1-3,8\n2-5,7\n")
+    expected = clean_csv(str(source), use_cache=False)
+    # Every row hashes alike, so only comparing the rows keeps them apart
+    monkeypatch.setattr(pd.util, "hash_pandas_object", lambda df, index=False: pd.Series(0, index=df.index, dtype="uint64"))
+    cleaned_path, rows = stream_clean_csv(str(source), chunksize=2)
+    streamed = pd.read_csv(cleaned_path, dtype={"roadid": str})
+    assert rows == 3
+    pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True))
@@ -1,20 +1,18 @@
-from shared.data_loader import load_data
+from shortest_path import road_network
+from shortest_path.dijkstra import build_path
+from shortest_path.dijkstra_traffic import calculate_cost
 import heapq
 import math
 
-locations = load_data("neighborhoods")
-roads = load_data("roads")
-
-graph = {}
-coords = {}
-
-for _, row in locations.iterrows():
-    coords[row["id"]] = (row["x_coordinate"], row["y_coordinate"])
-
-for _, row in roads.iterrows():
-    f, t, d = row["from_id"], row["to_id"], row["distance_km"]
-    graph.setdefault(f, []).append((t, d))
-    graph.setdefault(t, []).append((f, d))
+def __getattr__(name):
+    # graph, coords and landmarks are built on first access, not at import
+    if name == "graph":
+        return road_network.get_road_graph()
+    if name == "coords":
+        return road_network.get_neighborhood_coords()
+    if name == "landmarks":
+        return road_network.get_landmarks()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def haversine(coord1, coord2):
     lon1, lat1 = coord1
@@ -26,19 +24,31 @@ def haversine(coord1, coord2):
     a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
     return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
-def astar(graph, coords, start, goal):
-    queue = [(0, 0, start, [])]
-    visited = set()
+def astar(graph, coords, start, goal, landmarks=None, traffic_data=None, period=None):
+    """
+    A* from start to goal. By default the heuristic is the haversine distance
+    between coords; passing landmarks (see shortest_path.landmarks) switches to
+    ALT lower bounds, which need no coordinates and stay exact when
+    traffic_data/period scale the road lengths as in dijkstra_with_traffic.
+    """
+    if landmarks is not None:
+        heuristic = landmarks.heuristic(goal) if goal in landmarks.index else lambda node: 0.0
+    else:
+        heuristic = lambda node: haversine(coords[node], coords[goal])
+
+    queue = [(0, 0, start, start)]
+    parent = {}
     while queue:
-        f, g, node, path = heapq.heappop(queue)
-        if node in visited:
+        f, g, node, prev = heapq.heappop(queue)
+        if node in parent:
             continue
-        visited.add(node)
-        path = path + [node]
+        parent[node] = prev
         if node == goal:
-            return path, g
+            return build_path(parent, start, goal), g
         for neighbor, cost in graph.get(node, []):
-            if neighbor not in visited:
-                h = haversine(coords[neighbor], coords[goal])
-                heapq.heappush(queue, (g + cost + h, g + cost, neighbor, path))
+            if neighbor not in parent:
+                if traffic_data is not None:
+                    cost = calculate_cost(node, neighbor, cost, traffic_data, period)
+                h = heuristic(neighbor)
+                heapq.heappush(queue, (g + cost + h, g + cost, neighbor, node))
     return [], float("inf")
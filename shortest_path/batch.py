@@ -0,0 +1,160 @@
+# batch.py
+#
+# Batch origin-destination routing. Requests are grouped by origin so a single
+# shortest-path tree answers every destination of that origin, and origins are
+# fanned out over a process pool. Workers memory-map the network snapshot, so
+# they all read the same pages of one read-only graph instead of each holding
+# a copy. Results are yielded per origin as they complete.
+#
+#   python -m shortest_path.batch --period morning --workers 4 --paths --output routes.csv
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from shortest_path.path_tree import shortest_path_tree
+
+_worker = {}
+
+def _init_worker(graph, arc_weights):
+    """
+    graph is a CSRGraph or the path of a snapshot to memory-map.
+    """
+    if isinstance(graph, (str, os.PathLike)):
+        from shortest_path.snapshot import load_snapshot
+        graph = load_snapshot(graph, check=False).graph
+    _worker["graph"] = graph
+    _worker["arc_weights"] = arc_weights
+
+def _route_origin(origin, destinations, rows, with_paths):
+    graph = _worker["graph"]
+    start = time.perf_counter()
+    tree = shortest_path_tree(graph, origin, _worker["arc_weights"])
+    distances = tree.dist[destinations]
+    paths = None
+    if with_paths:
+        labels = graph.node_ids
+        paths = [[labels[i] for i in tree.path(d)] for d in destinations.tolist()]
+    elapsed = time.perf_counter() - start
+    return {
+        "origin": graph.node_ids[origin],
+        "rows": rows,
+        "destinations": [graph.node_ids[d] for d in destinations.tolist()],
+        "distances": distances,
+        "paths": paths,
+        "pairs": len(rows),
+        "elapsed_s": elapsed,
+        "pairs_per_s": len(rows) / elapsed if elapsed > 0 else None,
+    }
+
+def group_by_origin(graph, origins, destinations):
+    """
+    Split OD pairs (sequences of node labels) into per-origin batches of
+    (origin index, destination indices, row positions). Pairs with an unknown
+    label come back separately as a list of row positions.
+    """
+    index = graph.index
+    o = np.array([index.get(str(label), -1) for label in origins], dtype=np.int64)
+    d = np.array([index.get(str(label), -1) for label in destinations], dtype=np.int64)
+    known = (o >= 0) & (d >= 0)
+    rows = np.flatnonzero(known)
+    order = rows[np.argsort(o[rows], kind="stable")]
+    starts = np.flatnonzero(np.diff(o[order], prepend=-1))
+    batches = [
+        (int(o[part[0]]), d[part].astype(np.int32), part)
+        for part in np.split(order, starts[1:])
+        if len(part)
+    ]
+    return batches, np.flatnonzero(~known).tolist()
+
+def iter_route_batches(graph, origins, destinations, arc_weights=None, workers=1, with_paths=False,
+                       snapshot_path=None):
+    """
+    Route every (origins[k], destinations[k]) pair and yield one report per
+    origin as soon as it finishes: origin, the rows it covers, destinations,
+    distances (inf when unreachable), paths when with_paths is set, and the
+    batch's pair count, compute time and pairs per second. Pairs naming an
+    unknown node are reported in a final batch with origin None.
+
+    With more than one worker the origins run on a process pool. Passing
+    snapshot_path lets workers memory-map that snapshot's graph (which must be
+    `graph`) rather than receive a pickled copy.
+    """
+    batches, unknown = group_by_origin(graph, origins, destinations)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(graph, arc_weights)
+        for origin, dests, rows in batches:
+            yield _route_origin(origin, dests, rows, with_paths)
+    else:
+        shared = graph if snapshot_path is None else str(snapshot_path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared, arc_weights)) as pool:
+            futures = [pool.submit(_route_origin, o, d, r, with_paths) for o, d, r in batches]
+            for future in as_completed(futures):
+                yield future.result()
+
+    if unknown:
+        yield {
+            "origin": None,
+            "rows": np.array(unknown),
+            "destinations": [str(destinations[i]) for i in unknown],
+            "distances": np.full(len(unknown), np.inf),
+            "paths": [[] for _ in unknown] if with_paths else None,
+            "pairs": len(unknown),
+            "elapsed_s": 0.0,
+            "pairs_per_s": None,
+        }
+
+def iter_demand_routes(period=None, workers=1, with_paths=False, demand=None):
+    """
+    Route the Transportation_Demand table (or another frame with fromid/toid
+    columns) over the road snapshot, costed for a traffic period or by plain
+    length when period is None. Yields per-origin reports as iter_route_batches.
+    """
+    from shared.data_loader import load_data
+    from shortest_path.road_network import get_snapshot
+    from shortest_path.time_dependent import compile_period_weights
+
+    demand = load_data("demand") if demand is None else demand
+    snapshot = get_snapshot()
+    arc_weights = None
+    if period is not None:
+        arc_weights = compile_period_weights(snapshot.graph, snapshot.volumes, snapshot.periods).arc(period)
+    yield from iter_route_batches(
+        snapshot.graph, demand["fromid"].astype(str).tolist(), demand["toid"].astype(str).tolist(),
+        arc_weights, workers, with_paths, snapshot_path=snapshot.path,
+    )
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+
+    parser = argparse.ArgumentParser(description="Route every origin-destination pair of the demand table.")
+    parser.add_argument("--period", choices=["morning", "afternoon", "evening", "night"], default=None)
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (0 = one per CPU)")
+    parser.add_argument("--paths", action="store_true", help="also return the node path of every route")
+    parser.add_argument("--output", default=None, help="write fromid,toid,cost[,path] rows to this CSV")
+    args = parser.parse_args()
+
+    from shared.data_loader import load_data
+
+    demand = load_data("demand")
+    start = time.perf_counter()
+    pairs = 0
+    out = open(args.output, "w", newline="") if args.output else None
+    writer = csv.writer(out) if out else None
+    if writer:
+        writer.writerow(["fromid", "toid", "cost"] + (["path"] if args.paths else []))
+    for batch in iter_demand_routes(args.period, args.workers, args.paths, demand):
+        pairs += batch["pairs"]
+        if writer:
+            for k, (row, dist) in enumerate(zip(batch["rows"].tolist(), batch["distances"].tolist())):
+                line = [demand["fromid"].iloc[row], demand["toid"].iloc[row], dist]
+                writer.writerow(line + ([",".join(batch["paths"][k])] if args.paths else []))
+    if out:
+        out.close()
+    elapsed = time.perf_counter() - start
+    print(f"Routed {pairs} pairs in {elapsed:.3f}s ({pairs / elapsed:,.0f} pairs/s)")
@@ -0,0 +1,103 @@
+# benchmark.py
+#
+# Compare the point-to-point routing backends on the road network or on a
+# synthetic grid: preprocessing time and mean query latency over random pairs.
+#
+#   python -m shortest_path.benchmark
+#   python -m shortest_path.benchmark --grid 60 --queries 500
+
+import argparse
+import random
+import time
+
+def grid_graph(size, seed=0):
+    """
+    A size x size grid CSRGraph with random road lengths, as a larger stand-in
+    for a metro-area network.
+    """
+    import numpy as np
+    from graph.graph_builder import CSRGraph
+
+    rng = np.random.default_rng(seed)
+    ids = np.arange(size * size).reshape(size, size)
+    u = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    v = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    weights = rng.uniform(0.5, 5.0, len(u)).round(2)
+    graph = CSRGraph([str(i) for i in range(size * size)], u, v, weights)
+    graph.keep_lists = True
+    return graph
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run(graph, queries=200, seed=0):
+    """
+    Time every backend on the same random origin/destination pairs and check
+    that they agree on the costs. Returns one row per backend.
+    """
+    from shortest_path.astar_emergency import astar
+    from shortest_path.bidirectional import bidirectional_dijkstra
+    from shortest_path.contraction import build_hierarchy, ch_dijkstra
+    from shortest_path.dijkstra import dijkstra
+    from shortest_path.landmarks import build_landmarks
+    from shortest_path.overlay import build_overlay, overlay_dijkstra
+    from shortest_path.path_tree import shortest_path
+
+    adjacency = {}
+    for w, a, b, _ in graph.get_edges():
+        adjacency.setdefault(a, []).append((b, w))
+        adjacency.setdefault(b, []).append((a, w))
+    hierarchy, ch_build = _timed(lambda: build_hierarchy(graph))
+    landmarks, alt_build = _timed(lambda: build_landmarks(graph))
+    overlay, overlay_build = _timed(lambda: build_overlay(graph))
+
+    rng = random.Random(seed)
+    nodes = list(adjacency)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+    backends = [
+        ("dijkstra", 0.0, lambda s, t: dijkstra(adjacency, s, t)),
+        ("csr heap", 0.0, lambda s, t: shortest_path(graph, s, t)),
+        ("csr dial", 0.0, lambda s, t: shortest_path(graph, s, t, backend="dial")),
+        ("csr radix", 0.0, lambda s, t: shortest_path(graph, s, t, backend="radix")),
+        ("bidirectional", 0.0, lambda s, t: bidirectional_dijkstra(adjacency, s, t)),
+        ("alt", alt_build, lambda s, t: astar(adjacency, None, s, t, landmarks=landmarks)),
+        ("contraction", ch_build, lambda s, t: ch_dijkstra(hierarchy, s, t)),
+        ("overlay", overlay_build, lambda s, t: overlay_dijkstra(overlay, s, t)),
+    ]
+
+    rows, reference = [], None
+    for name, build_time, route in backends:
+        costs, elapsed = _timed(lambda: [route(s, t)[1] for s, t in pairs])
+        if reference is None:
+            reference = costs
+        mismatches = sum(abs(a - b) > 1e-9 for a, b in zip(costs, reference))
+        rows.append({
+            "backend": name,
+            "preprocess_s": build_time,
+            "query_us": elapsed / len(pairs) * 1e6,
+            "mismatches": mismatches,
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shortest-path backends.")
+    parser.add_argument("--grid", type=int, default=0, help="use a synthetic N x N grid instead of the road data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.grid:
+        graph = grid_graph(args.grid, args.seed)
+    else:
+        from shortest_path.road_network import get_csr_graph
+        graph = get_csr_graph()
+
+    print(f"{graph.num_nodes} nodes, {graph.num_edges} edges, {args.queries} queries")
+    print(f"{'backend':<15}{'preprocess (s)':>16}{'query (us)':>14}{'mismatches':>12}")
+    for row in run(graph, args.queries, args.seed):
+        print(f"{row['backend']:<15}{row['preprocess_s']:>16.3f}{row['query_us']:>14.1f}{row['mismatches']:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+from shortest_path import road_network
+from shortest_path.dijkstra_traffic import calculate_cost
+import heapq
+
+def bidirectional_dijkstra(graph, start, end, reverse_graph=None, cost=None):
+    """
+    Point-to-point shortest path searching forward from start over `graph` and
+    backward from end over `reverse_graph` (the same dict for undirected roads).
+    Same (path, cost) contract as dijkstra.dijkstra.
+
+    `cost(u, v, base)` prices the edge u -> v; it defaults to the base weight.
+    The search stops once the two queue minimums add up to at least the best
+    meeting distance found so far, which is then provably optimal.
+    """
+    if reverse_graph is None:
+        reverse_graph = graph
+    if start == end:
+        return [start], 0
+
+    dist = ({start: 0}, {end: 0})
+    parent = ({start: start}, {end: end})
+    settled = (set(), set())
+    queues = ([(0, start)], [(0, end)])
+    adjacency = (graph, reverse_graph)
+    best, meet = float("inf"), None
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # Grow whichever frontier is currently closer to its root
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        d, node = heapq.heappop(queues[side])
+        if node in settled[side]:
+            continue
+        settled[side].add(node)
+
+        mine, other = dist[side], dist[1 - side]
+        for neighbor, base in adjacency[side].get(node, []):
+            if neighbor in settled[side]:
+                continue
+            if cost is None:
+                weight = base
+            elif side == 0:
+                weight = cost(node, neighbor, base)
+            else:
+                # Backward search walks the edge neighbor -> node against its direction
+                weight = cost(neighbor, node, base)
+            nd = d + weight
+            if nd < mine.get(neighbor, float("inf")):
+                mine[neighbor] = nd
+                parent[side][neighbor] = node
+                heapq.heappush(queues[side], (nd, neighbor))
+                if neighbor in other and nd + other[neighbor] < best:
+                    best, meet = nd + other[neighbor], neighbor
+
+    if meet is None:
+        return [], float("inf")
+
+    path = [meet]
+    while path[-1] != start:
+        path.append(parent[0][path[-1]])
+    path.reverse()
+    node = meet
+    while node != end:
+        node = parent[1][node]
+        path.append(node)
+    return path, best
+
+def bidirectional_dijkstra_with_traffic(graph, traffic_data, start, end, period):
+    """
+    Bidirectional counterpart of dijkstra_traffic.dijkstra_with_traffic.
+    """
+    def cost(u, v, base):
+        return calculate_cost(u, v, base, traffic_data, period)
+    return bidirectional_dijkstra(graph, start, end, cost=cost)
+
+def bidirectional_shortest_path(graph, start, end, arc_weights=None, reverse_weights=None):
+    """
+    Bidirectional search over a CSRGraph and its external node ids, with the
+    same (path, cost) contract. arc_weights (array or list, in arc order)
+    replace the graph's own weights, e.g. one traffic period's costs.
+    reverse_weights, if given, are arc_weights already in the arc order of
+    graph.transpose(), so repeated queries need not re-order them.
+    """
+    index = graph.index
+    if start not in index or end not in index:
+        return [], float("inf")
+    s, t = index[start], index[end]
+    if s == t:
+        return [start], 0.0
+
+    if reverse_weights is None and arc_weights is not None:
+        reverse_weights = graph.transpose_arc_weights(arc_weights)
+    lists = (graph.adjacency_lists(arc_weights), graph.transpose().adjacency_lists(reverse_weights))
+    n = graph.num_nodes
+    inf = float("inf")
+    dist = ([inf] * n, [inf] * n)
+    parent = ([-1] * n, [-1] * n)
+    done = (bytearray(n), bytearray(n))
+    dist[0][s], dist[1][t] = 0.0, 0.0
+    parent[0][s], parent[1][t] = s, t
+    queues = ([(0.0, s)], [(0.0, t)])
+    best, meet = inf, -1
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        d, u = heapq.heappop(queues[side])
+        if done[side][u]:
+            continue
+        done[side][u] = 1
+        mine, other, pred = dist[side], dist[1 - side], parent[side]
+        indptr, indices, weights = lists[side]
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + weights[k]
+            if nd < mine[v]:
+                mine[v] = nd
+                pred[v] = u
+                heapq.heappush(queues[side], (nd, v))
+                if nd + other[v] < best:
+                    best, meet = nd + other[v], v
+
+    if meet < 0:
+        return [], inf
+    path = [meet]
+    while path[-1] != s:
+        path.append(parent[0][path[-1]])
+    path.reverse()
+    while path[-1] != t:
+        path.append(parent[1][path[-1]])
+    labels = graph.node_ids
+    return [labels[i] for i in path], best
+
+def __getattr__(name):
+    # graph is built on first access, not at import
+    if name == "graph":
+        return road_network.get_road_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
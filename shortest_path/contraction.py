@@ -0,0 +1,329 @@
+# contraction.py
+#
+# Contraction Hierarchies over a CSRGraph. The offline build contracts nodes
+# one at a time in order of importance, adding shortcut arcs that preserve
+# shortest-path distances between the nodes that remain. Queries then run a
+# bidirectional Dijkstra that only ever climbs to more important nodes, which
+# settles a few dozen nodes instead of the whole network.
+#
+# The hierarchy is stored next to the cleaned road data and rebuilt when the
+# datasets it was compiled from change (see shortest_path.snapshot).
+
+import heapq
+import json
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_HIERARCHY = "shared/cleaned_data/network.ch.npz"
+HIERARCHY_VERSION = 1
+
+# witness searches give up after settling this many nodes; a failed search only
+# costs an unnecessary shortcut, never a wrong distance
+WITNESS_SETTLE_LIMIT = 500
+
+class ContractionHierarchy:
+    """
+    Node ranks plus the upward search graph. fwd_* holds, for every node, the
+    arcs to higher-ranked nodes; bwd_* holds the arcs arriving from higher-ranked
+    nodes, stored at their head. *_middle is the contracted node a shortcut
+    bypasses, or -1 for an original road.
+    """
+
+    def __init__(self, node_ids, rank, fwd, bwd, header=None):
+        self.node_ids = list(node_ids)
+        self.rank = rank
+        self.fwd_indptr, self.fwd_indices, self.fwd_weights, self.fwd_middle = fwd
+        self.bwd_indptr, self.bwd_indices, self.bwd_weights, self.bwd_middle = bwd
+        self.header = header or {}
+        self._index = None
+        self._lists = None
+        self._middle = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.node_ids)}
+        return self._index
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_shortcuts(self):
+        return int((self.fwd_middle >= 0).sum() + (self.bwd_middle >= 0).sum())
+
+    def is_stale(self) -> bool:
+        from shortest_path.snapshot import sources_stale
+        return "sources" not in self.header or sources_stale(self.header["sources"])
+
+    def _adjacency(self):
+        if self._lists is None:
+            self._lists = (
+                (self.fwd_indptr.tolist(), self.fwd_indices.tolist(), self.fwd_weights.tolist()),
+                (self.bwd_indptr.tolist(), self.bwd_indices.tolist(), self.bwd_weights.tolist()),
+            )
+        return self._lists
+
+    def _middle_of(self):
+        """
+        (tail, head) -> bypassed node for every shortcut, used to unpack paths.
+        """
+        if self._middle is None:
+            middle = {}
+            for indptr, indices, mids, forward in (
+                (self.fwd_indptr, self.fwd_indices, self.fwd_middle, True),
+                (self.bwd_indptr, self.bwd_indices, self.bwd_middle, False),
+            ):
+                owners = np.repeat(np.arange(self.num_nodes), np.diff(indptr))
+                for a, b, m in zip(owners.tolist(), indices.tolist(), mids.tolist()):
+                    if m >= 0:
+                        middle[(a, b) if forward else (b, a)] = m
+            self._middle = middle
+        return self._middle
+
+    def query(self, source, target):
+        """
+        Distance and node-index path from source to target, or (inf, []).
+        """
+        if source == target:
+            return 0.0, [source]
+        inf = float("inf")
+        adjacency = self._adjacency()
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: source}, {target: target})
+        queues = ([(0.0, source)], [(0.0, target)])
+        best, meet = inf, -1
+
+        # The sum-of-minimums stop of plain bidirectional search does not hold on
+        # upward graphs; each direction runs until its own minimum reaches best.
+        while queues[0] or queues[1]:
+            for side in (0, 1):
+                queue = queues[side]
+                if not queue:
+                    continue
+                if queue[0][0] >= best:
+                    queue.clear()
+                    continue
+                d, u = heapq.heappop(queue)
+                mine = dist[side]
+                if d > mine[u]:
+                    continue
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best, meet = d + other, u
+                indptr, indices, weights = adjacency[side]
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    nd = d + weights[k]
+                    if nd < mine.get(v, inf):
+                        mine[v] = nd
+                        parent[side][v] = u
+                        heapq.heappush(queue, (nd, v))
+
+        if meet < 0:
+            return inf, []
+        up = [meet]
+        while up[-1] != source:
+            up.append(parent[0][up[-1]])
+        up.reverse()
+        down = [meet]
+        while down[-1] != target:
+            down.append(parent[1][down[-1]])
+        return best, self._unpack(up + down[1:])
+
+    def _unpack(self, path):
+        middle = self._middle_of()
+        out = [path[0]]
+        # arcs are stacked in reverse so the next one to emit is on top
+        stack = list(zip(path, path[1:]))[::-1]
+        while stack:
+            a, b = stack.pop()
+            m = middle.get((a, b))
+            if m is None:
+                out.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return out
+
+def _witness_distances(out_adj, source, skip, limit, targets):
+    """
+    Distances from source among uncontracted nodes, avoiding `skip`, up to
+    `limit`. The search ends early once every node in `targets` is settled.
+    """
+    dist = {source: 0.0}
+    queue = [(0.0, source)]
+    settled = 0
+    remaining = len(targets)
+    while queue and remaining:
+        d, u = heapq.heappop(queue)
+        if d > dist[u]:
+            continue
+        if d > limit or settled >= WITNESS_SETTLE_LIMIT:
+            break
+        settled += 1
+        if u in targets:
+            remaining -= 1
+        for x, w in out_adj[u].items():
+            if x == skip:
+                continue
+            nd = d + w
+            if nd < dist.get(x, float("inf")):
+                dist[x] = nd
+                heapq.heappush(queue, (nd, x))
+    return dist
+
+def _shortcuts(out_adj, in_adj, v):
+    """
+    Shortcuts (u, x, weight) needed to remove v without lengthening any u -> v -> x path.
+    """
+    needed = []
+    if not out_adj[v]:
+        return needed
+    longest_out = max(out_adj[v].values())
+    for u, w_uv in in_adj[v].items():
+        dist = _witness_distances(out_adj, u, v, w_uv + longest_out, out_adj[v].keys() - {u})
+        for x, w_vx in out_adj[v].items():
+            if x != u and dist.get(x, float("inf")) > w_uv + w_vx:
+                needed.append((u, x, w_uv + w_vx))
+    return needed
+
+def build_hierarchy(graph, arc_weights=None) -> ContractionHierarchy:
+    """
+    Contract every node of a CSRGraph. Nodes are ordered by edge difference
+    (shortcuts added minus arcs removed) plus the number of already contracted
+    neighbours, with priorities re-evaluated lazily when a node is popped.
+    """
+    indptr, indices, weights = graph.adjacency_lists(arc_weights)
+    n = graph.num_nodes
+    out_adj = [{} for _ in range(n)]
+    in_adj = [{} for _ in range(n)]
+    for u in range(n):
+        for k in range(indptr[u], indptr[u + 1]):
+            v, w = indices[k], weights[k]
+            if v != u and w < out_adj[u].get(v, float("inf")):
+                out_adj[u][v] = w
+                in_adj[v][u] = w
+    middle = {}
+
+    deleted = [0] * n
+    def priority(v):
+        return len(_shortcuts(out_adj, in_adj, v)) - len(out_adj[v]) - len(in_adj[v]) + deleted[v]
+
+    queue = [(priority(v), v) for v in range(n)]
+    heapq.heapify(queue)
+    rank = np.full(n, -1, dtype=np.int32)
+    fwd = [[] for _ in range(n)]
+    bwd = [[] for _ in range(n)]
+    order = 0
+    while queue:
+        _, v = heapq.heappop(queue)
+        if rank[v] >= 0:
+            continue
+        current = priority(v)
+        if queue and current > queue[0][0]:
+            heapq.heappush(queue, (current, v))
+            continue
+
+        rank[v] = order
+        order += 1
+        for x, w in out_adj[v].items():
+            fwd[v].append((x, w, middle.get((v, x), -1)))
+        for u, w in in_adj[v].items():
+            bwd[v].append((u, w, middle.get((u, v), -1)))
+
+        for u, x, w in _shortcuts(out_adj, in_adj, v):
+            if w < out_adj[u].get(x, float("inf")):
+                out_adj[u][x] = w
+                in_adj[x][u] = w
+                middle[(u, x)] = v
+        for x in out_adj[v]:
+            del in_adj[x][v]
+            deleted[x] += 1
+        for u in in_adj[v]:
+            del out_adj[u][v]
+            deleted[u] += 1
+        out_adj[v], in_adj[v] = {}, {}
+
+    return ContractionHierarchy(graph.node_ids, rank, _pack(fwd), _pack(bwd))
+
+def _pack(arcs):
+    indptr = np.zeros(len(arcs) + 1, dtype=np.int64)
+    np.cumsum([len(a) for a in arcs], out=indptr[1:])
+    flat = [arc for node_arcs in arcs for arc in node_arcs]
+    return (
+        indptr,
+        np.array([a[0] for a in flat], dtype=np.int32),
+        np.array([a[1] for a in flat], dtype=np.float64),
+        np.array([a[2] for a in flat], dtype=np.int32),
+    )
+
+_ARRAYS = ("indptr", "indices", "weights", "middle")
+
+def save_hierarchy(hierarchy, path: str = DEFAULT_HIERARCHY) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {"rank": hierarchy.rank}
+    for prefix in ("fwd", "bwd"):
+        for name in _ARRAYS:
+            arrays[f"{prefix}_{name}"] = getattr(hierarchy, f"{prefix}_{name}")
+    header = dict(hierarchy.header, version=HIERARCHY_VERSION, node_ids=hierarchy.node_ids)
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez(tmp_path, header=np.array(json.dumps(header)), **arrays)
+    tmp_path.replace(path)
+    return path
+
+def load_hierarchy(path: str = DEFAULT_HIERARCHY, check: bool = True):
+    """
+    Load a saved hierarchy; None when it is missing, from another format
+    version, or (with check=True) built from datasets that have since changed.
+    """
+    try:
+        data = np.load(path)
+    except (OSError, ValueError):
+        return None
+    with data:
+        header = json.loads(str(data["header"]))
+        if header.get("version") != HIERARCHY_VERSION:
+            return None
+        fwd = tuple(data[f"fwd_{name}"] for name in _ARRAYS)
+        bwd = tuple(data[f"bwd_{name}"] for name in _ARRAYS)
+        hierarchy = ContractionHierarchy(header.pop("node_ids"), data["rank"], fwd, bwd, header)
+    if check and hierarchy.is_stale():
+        return None
+    return hierarchy
+
+def build_road_hierarchy(path: str = DEFAULT_HIERARCHY) -> ContractionHierarchy:
+    """
+    Contract the road network and save the hierarchy with the fingerprints of
+    the datasets it came from.
+    """
+    import time
+    from shortest_path.road_network import get_csr_graph
+    from shortest_path.snapshot import source_fingerprints
+
+    sources = source_fingerprints()
+    start = time.perf_counter()
+    hierarchy = build_hierarchy(get_csr_graph())
+    hierarchy.header = {"sources": sources, "build_time_s": round(time.perf_counter() - start, 6)}
+    save_hierarchy(hierarchy, path)
+    return hierarchy
+
+def ch_dijkstra(hierarchy, start, end):
+    """
+    Same (path, cost) contract as dijkstra.dijkstra, answered from a hierarchy.
+    """
+    if start not in hierarchy.index or end not in hierarchy.index:
+        return [], float("inf")
+    cost, path = hierarchy.query(hierarchy.index[start], hierarchy.index[end])
+    labels = hierarchy.node_ids
+    return [labels[i] for i in path], cost
+
+if __name__ == "__main__":
+    built = build_road_hierarchy()
+    print(
+        f"Contracted {built.num_nodes} nodes with {built.num_shortcuts} shortcuts "
+        f"in {built.header['build_time_s']:.3f}s -> {DEFAULT_HIERARCHY}"
+    )
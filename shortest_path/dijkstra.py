@@ -1,30 +1,39 @@
-from shared.data_loader import load_data
+from shortest_path import road_network
 import heapq
 
-locations = load_data("neighborhoods")
-roads = load_data("roads")
-
-graph = {}
-for _, row in roads.iterrows():
-    f, t, d = row["from_id"], row["to_id"], row["distance_km"]
-    graph.setdefault(f, []).append((t, d))
-    graph.setdefault(t, []).append((f, d))
-
-id_to_name = dict(zip(locations["id"], locations["name"]))
-name_to_id = {n.lower(): i for i, n in zip(locations["id"], locations["name"])}
+def __getattr__(name):
+    # graph, id_to_name and name_to_id are built on first access, not at import
+    if name == "graph":
+        return road_network.get_road_graph()
+    if name == "id_to_name":
+        return road_network.get_neighborhood_names()[0]
+    if name == "name_to_id":
+        return road_network.get_neighborhood_names()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def dijkstra(graph, start, end):
-    queue = [(0, start, [])]
-    visited = set()
+    # Heap entries carry the predecessor instead of a copy of the path so far;
+    # the path is rebuilt once from the parent pointers at the end
+    queue = [(0, start, start)]
+    parent = {}
     while queue:
-        cost, node, path = heapq.heappop(queue)
-        if node in visited:
+        cost, node, prev = heapq.heappop(queue)
+        if node in parent:
             continue
-        visited.add(node)
-        path = path + [node]
+        parent[node] = prev
         if node == end:
-            return path, cost
+            return build_path(parent, start, end), cost
         for neighbor, weight in graph.get(node, []):
-            if neighbor not in visited:
-                heapq.heappush(queue, (cost + weight, neighbor, path))
+            if neighbor not in parent:
+                heapq.heappush(queue, (cost + weight, neighbor, node))
     return [], float("inf")
+
+def build_path(parent, start, end):
+    """
+    Walk parent pointers back from end to start; parent[start] is start itself.
+    """
+    path = [end]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
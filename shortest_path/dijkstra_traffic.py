@@ -1,24 +1,14 @@
-from shared.data_loader import load_data
+from shortest_path import road_network
+from shortest_path.dijkstra import build_path
 import heapq
 
-roads = load_data("roads")
-traffic = load_data("traffic")
-
-graph = {}
-for _, row in roads.iterrows():
-    f, t, d = row["from_id"], row["to_id"], row["distance_km"]
-    graph.setdefault(f, []).append((t, d))
-    graph.setdefault(t, []).append((f, d))
-
-traffic_data = {}
-for _, row in traffic.iterrows():
-    key = row["roadid"]
-    traffic_data[key] = {
-        "morning": row["morning_peakveh/h"],
-        "afternoon": row["afternoonveh/h"],
-        "evening": row["evening_peakveh/h"],
-        "night": row["nightveh/h"]
-    }
+def __getattr__(name):
+    # graph and traffic_data are built on first access, not at import
+    if name == "graph":
+        return road_network.get_road_graph()
+    if name == "traffic_data":
+        return road_network.get_traffic_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def calculate_cost(n1, n2, base, traffic_data, period):
     key1 = f"{n1}-{n2}"
@@ -30,18 +20,17 @@ def calculate_cost(n1, n2, base, traffic_data, period):
     return base * (1 + level / 10000)
 
 def dijkstra_with_traffic(graph, traffic_data, start, end, period):
-    queue = [(0, start, [])]
-    visited = set()
+    queue = [(0, start, start)]
+    parent = {}
     while queue:
-        cost, node, path = heapq.heappop(queue)
-        if node in visited:
+        cost, node, prev = heapq.heappop(queue)
+        if node in parent:
             continue
-        visited.add(node)
-        path = path + [node]
+        parent[node] = prev
         if node == end:
-            return path, cost
+            return build_path(parent, start, end), cost
         for neighbor, base in graph.get(node, []):
-            if neighbor not in visited:
+            if neighbor not in parent:
                 adj = calculate_cost(node, neighbor, base, traffic_data, period)
-                heapq.heappush(queue, (cost + adj, neighbor, path))
+                heapq.heappush(queue, (cost + adj, neighbor, node))
     return [], float("inf")
@@ -0,0 +1,212 @@
+# distance_matrix.py
+#
+# All-pairs shortest-path distances and predecessors. One single-source search
+# per origin, spread over a process pool, fills an (n x n) float32 distance
+# matrix and an int32 predecessor matrix. Both are saved as .npy files that
+# later processes memory-map instead of recomputing, in a directory keyed by
+# the network version and traffic period; a build only happens when the road
+# or traffic data has changed since the last one.
+#
+#   python -m shortest_path.distance_matrix --period morning --workers 4
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_MATRIX_DIR = "shared/cleaned_data/.matrix"
+MATRIX_VERSION = 1
+
+class DistanceMatrix:
+    """
+    dist[i, j] is the distance from node i to node j (inf if unreachable) and
+    pred[i, j] the node before j on that path (-1 for j == i or unreachable).
+    """
+
+    def __init__(self, node_ids, dist, pred, header=None):
+        self.node_ids = list(node_ids)
+        self.dist = dist
+        self.pred = pred
+        self.header = header or {}
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.node_ids)}
+        return self._index
+
+    def is_stale(self) -> bool:
+        from shortest_path.snapshot import sources_stale
+        return "sources" not in self.header or sources_stale(self.header["sources"])
+
+    def distance(self, start, end) -> float:
+        """
+        Distance between two node labels; inf when either is unknown or unreachable.
+        """
+        index = self.index
+        if start not in index or end not in index:
+            return float("inf")
+        return float(self.dist[index[start], index[end]])
+
+    def row(self, start) -> np.ndarray:
+        """
+        Distances from one node label to every node, as a view of the matrix.
+        """
+        return self.dist[self.index[start]]
+
+    def path(self, start, end):
+        """
+        Same (path, cost) contract as dijkstra.dijkstra.
+        """
+        cost = self.distance(start, end)
+        if cost == float("inf"):
+            return [], cost
+        i, j = self.index[start], self.index[end]
+        pred = self.pred[i]
+        path = [j]
+        while path[-1] != i:
+            path.append(int(pred[path[-1]]))
+        labels = self.node_ids
+        return [labels[k] for k in reversed(path)], cost
+
+_worker_graph = None
+
+def _init_worker(graph, arc_weights):
+    global _worker_graph
+    _worker_graph = (graph, arc_weights)
+
+def _rows(origins):
+    from shortest_path.path_tree import shortest_path_tree
+
+    graph, arc_weights = _worker_graph
+    dist = np.empty((len(origins), graph.num_nodes), dtype=np.float32)
+    pred = np.empty((len(origins), graph.num_nodes), dtype=np.int32)
+    for k, origin in enumerate(origins):
+        tree = shortest_path_tree(graph, origin, arc_weights)
+        dist[k] = tree.dist
+        pred[k] = tree.pred
+    return origins[0], dist, pred
+
+def compute_matrix(graph, arc_weights=None, workers=1, dist=None, pred=None):
+    """
+    Fill (and return) dist/pred matrices for a CSRGraph, one search per origin.
+    workers > 1 splits the origins into chunks handled by a process pool;
+    dist and pred may be preallocated, e.g. as memory-mapped arrays.
+    """
+    n = graph.num_nodes
+    if dist is None:
+        dist = np.empty((n, n), dtype=np.float32)
+    if pred is None:
+        pred = np.empty((n, n), dtype=np.int32)
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, min(256, -(-n // (workers * 4))))
+    chunks = [list(range(i, min(i + chunk, n))) for i in range(0, n, chunk)]
+
+    if workers == 1:
+        _init_worker(graph, arc_weights)
+        results = map(_rows, chunks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph, arc_weights))
+        results = pool.map(_rows, chunks)
+    try:
+        for first, d, p in results:
+            dist[first:first + len(d)] = d
+            pred[first:first + len(p)] = p
+    finally:
+        if workers != 1:
+            pool.shutdown()
+    return dist, pred
+
+def _matrix_dir(root, version, period):
+    return Path(root) / f"{version[:16]}-{period or 'base'}"
+
+def load_distance_matrix(period=None, root: str = DEFAULT_MATRIX_DIR, version=None, check: bool = True):
+    """
+    Memory-map the saved matrix for the given network version (the current
+    snapshot's by default) and period. None when there is none or it is stale.
+    """
+    if version is None:
+        from shortest_path.road_network import get_snapshot
+        version = get_snapshot().source_hash
+    directory = _matrix_dir(root, version, period)
+    try:
+        header = json.loads((directory / "header.json").read_text())
+        dist = np.load(directory / "dist.npy", mmap_mode="r")
+        pred = np.load(directory / "pred.npy", mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if header.get("version") != MATRIX_VERSION:
+        return None
+    matrix = DistanceMatrix(header.pop("node_ids"), dist, pred, header)
+    if check and matrix.is_stale():
+        return None
+    return matrix
+
+def build_distance_matrix(period=None, workers=1, root: str = DEFAULT_MATRIX_DIR) -> DistanceMatrix:
+    """
+    Build the road network's matrix (traffic-weighted for a period, plain road
+    lengths for None), write it under root and return it memory-mapped.
+    Matrices of older network versions for the same period are removed.
+    """
+    from shortest_path.road_network import get_snapshot
+    from shortest_path.time_dependent import compile_period_weights
+
+    snapshot = get_snapshot()
+    graph = snapshot.graph
+    arc_weights = None
+    if period is not None:
+        arc_weights = compile_period_weights(graph, snapshot.volumes, snapshot.periods).arc(period)
+
+    directory = _matrix_dir(root, snapshot.source_hash, period)
+    tmp = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    n = graph.num_nodes
+    dist = np.lib.format.open_memmap(tmp / "dist.npy", mode="w+", dtype=np.float32, shape=(n, n))
+    pred = np.lib.format.open_memmap(tmp / "pred.npy", mode="w+", dtype=np.int32, shape=(n, n))
+    compute_matrix(graph, arc_weights, workers, dist, pred)
+    dist.flush()
+    pred.flush()
+    del dist, pred
+
+    header = {
+        "version": MATRIX_VERSION,
+        "network_version": snapshot.source_hash,
+        "period": period,
+        "sources": snapshot.header["sources"],
+        "node_ids": graph.node_ids,
+    }
+    (tmp / "header.json").write_text(json.dumps(header))
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+    for old in Path(root).glob(f"*-{period or 'base'}"):
+        if old != directory:
+            shutil.rmtree(old, ignore_errors=True)
+    return load_distance_matrix(period, root, snapshot.source_hash, check=False)
+
+def get_distance_matrix(period=None, workers=1, root: str = DEFAULT_MATRIX_DIR) -> DistanceMatrix:
+    """
+    The saved matrix for the period, building it first if the road or traffic
+    data changed since it was written.
+    """
+    matrix = load_distance_matrix(period, root)
+    if matrix is None:
+        matrix = build_distance_matrix(period, workers, root)
+    return matrix
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the all-pairs distance matrix.")
+    parser.add_argument("--period", choices=["morning", "afternoon", "evening", "night"], default=None)
+    parser.add_argument("--workers", type=int, default=1, help="processes to use (0 = one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matrix = build_distance_matrix(args.period, args.workers)
+    print(f"Built {len(matrix.node_ids)}x{len(matrix.node_ids)} matrix in {time.perf_counter() - start:.3f}s")
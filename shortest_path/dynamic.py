@@ -0,0 +1,103 @@
+# dynamic.py
+#
+# Incremental repair of shortest-path trees when a few edge weights change.
+# Instead of re-running Dijkstra from scratch, only the region the change can
+# affect is recomputed:
+#
+#   - a tree arc that got more expensive invalidates the subtree below it; those
+#     nodes are reset and re-seeded from their unaffected in-neighbours,
+#   - any arc that got cheaper seeds its head if it now offers a shorter path,
+#
+# and a Dijkstra pass started from just those seeds propagates the corrections.
+
+import heapq
+
+import numpy as np
+
+def changed_edges(old_edge_weights, new_edge_weights) -> np.ndarray:
+    """
+    Indices of the edges whose weight differs between two edge-ordered vectors.
+    """
+    return np.flatnonzero(np.asarray(old_edge_weights) != np.asarray(new_edge_weights))
+
+def edge_weights_from_graph(csr, graph) -> np.ndarray:
+    """
+    Edge weights of a graph_builder.Graph (e.g. after the penalties of
+    simulation.traffic_simulation) in the edge order of `csr`, which must have
+    been built from that graph with CSRGraph.from_graph.
+    """
+    edges = graph.get_edges()
+    if len(edges) != csr.num_edges:
+        raise ValueError(f"graph has {len(edges)} edges, expected {csr.num_edges}")
+    labels = csr.node_ids
+    for k, (_, u, v, _) in enumerate(edges):
+        if (u, v) != (labels[csr.edge_u[k]], labels[csr.edge_v[k]]):
+            raise ValueError(f"edge {k} is {u}-{v}, not an edge of the CSR graph in the same order")
+    return np.array([w for w, _, _, _ in edges], dtype=np.float64)
+
+def repair_tree(tree, arc_weights, edges) -> np.ndarray:
+    """
+    Update a full path_tree.ShortestPathTree in place after the weights of
+    `edges` changed; arc_weights are the graph's arc weights after the change.
+    Returns the node indices whose distance or predecessor changed.
+    """
+    graph = tree.graph
+    indptr, indices, weights = graph.adjacency_lists(arc_weights)
+    arcs = np.flatnonzero(np.isin(graph.edge_of_arc, np.asarray(edges)))
+    tails = (np.searchsorted(graph.indptr, arcs, side="right") - 1).tolist()
+    arcs = arcs.tolist()
+
+    old_dist, old_pred = tree.dist.copy(), tree.pred.copy()
+    dist, pred = tree.dist.tolist(), tree.pred.tolist()
+    inf = float("inf")
+
+    # Tree arcs that now cost more than the distance they explain
+    roots = [indices[a] for a, u in zip(arcs, tails)
+             if pred[indices[a]] == u and dist[u] + weights[a] > dist[indices[a]]]
+    affected = set()
+    if roots:
+        children = {}
+        for v, p in enumerate(pred):
+            if p >= 0:
+                children.setdefault(p, []).append(v)
+        stack = list(roots)
+        while stack:
+            v = stack.pop()
+            if v not in affected:
+                affected.add(v)
+                stack.extend(children.get(v, ()))
+        for v in affected:
+            dist[v], pred[v] = inf, -1
+
+    queue = []
+    if affected:
+        reverse = graph.transpose()
+        r_indptr, r_indices, r_weights = reverse.adjacency_lists(graph.transpose_arc_weights(arc_weights))
+        for v in affected:
+            for k in range(r_indptr[v], r_indptr[v + 1]):
+                x = r_indices[k]
+                if x not in affected and dist[x] + r_weights[k] < dist[v]:
+                    dist[v], pred[v] = dist[x] + r_weights[k], x
+            if dist[v] < inf:
+                queue.append((dist[v], v))
+    for a, u in zip(arcs, tails):
+        v = indices[a]
+        if dist[u] + weights[a] < dist[v]:
+            dist[v], pred[v] = dist[u] + weights[a], u
+            queue.append((dist[v], v))
+    heapq.heapify(queue)
+
+    while queue:
+        d, u = heapq.heappop(queue)
+        if d > dist[u]:
+            continue
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v], pred[v] = nd, u
+                heapq.heappush(queue, (nd, v))
+
+    tree.dist[:] = dist
+    tree.pred[:] = pred
+    return np.flatnonzero((tree.dist != old_dist) | (tree.pred != old_pred))
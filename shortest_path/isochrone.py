@@ -0,0 +1,119 @@
+# isochrone.py
+#
+# Reachability within distance (or time) thresholds. Each source gets one
+# Dijkstra truncated at the largest threshold, and every threshold is answered
+# from that single search by bucketing the distances. Results are stored as a
+# compact (sources x nodes) array of bucket numbers, from which per-threshold
+# bitsets and coverage counts are read without searching again.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from shortest_path.path_tree import shortest_path_tree
+
+class Isochrones:
+    """
+    bucket[s, v] is the index of the first threshold within which node v is
+    reachable from sources[s], or len(thresholds) when it is farther than the
+    last threshold or unreachable.
+    """
+
+    def __init__(self, graph, sources, thresholds, bucket):
+        self.graph = graph
+        self.sources = list(sources)
+        self.thresholds = tuple(thresholds)
+        self.bucket = bucket
+
+    def _level(self, threshold) -> int:
+        if threshold not in self.thresholds:
+            raise ValueError(f"unknown threshold {threshold!r}; expected one of {self.thresholds}")
+        return self.thresholds.index(threshold)
+
+    def mask(self, threshold) -> np.ndarray:
+        """
+        (sources x nodes) boolean array of the nodes within threshold of each source.
+        """
+        return self.bucket <= self._level(threshold)
+
+    def bitsets(self, threshold) -> np.ndarray:
+        """
+        The mask packed to one bit per node: (sources x ceil(nodes / 8)) uint8.
+        """
+        return np.packbits(self.mask(threshold), axis=1)
+
+    def reachable(self, source, threshold) -> list:
+        """
+        Labels of the nodes within threshold of one source label.
+        """
+        row = self.bucket[self.sources.index(source)]
+        labels = self.graph.node_ids
+        return [labels[i] for i in np.flatnonzero(row <= self._level(threshold)).tolist()]
+
+    def coverage(self, threshold) -> np.ndarray:
+        """
+        Number of sources that reach each node within threshold.
+        """
+        return self.mask(threshold).sum(axis=0)
+
+_worker = {}
+
+def _init_worker(graph, arc_weights, thresholds):
+    _worker.update(graph=graph, arc_weights=arc_weights, thresholds=np.asarray(thresholds))
+
+def _buckets(sources):
+    graph, thresholds = _worker["graph"], _worker["thresholds"]
+    dtype = np.uint8 if len(thresholds) < 255 else np.uint16
+    out = np.empty((len(sources), graph.num_nodes), dtype=dtype)
+    for k, source in enumerate(sources):
+        dist = shortest_path_tree(graph, source, _worker["arc_weights"], cutoff=thresholds[-1]).dist
+        out[k] = np.searchsorted(thresholds, dist, side="left")
+    return out
+
+def isochrones(graph, sources, thresholds, arc_weights=None, workers=1) -> Isochrones:
+    """
+    Isochrones of a CSRGraph for source node labels and increasing thresholds,
+    in the units of the arc weights (road km by default; pass travel times as
+    arc_weights for minutes). workers > 1 spreads the sources over a process pool.
+    """
+    thresholds = sorted(thresholds)
+    if not thresholds:
+        raise ValueError("at least one threshold is required")
+    index = graph.index
+    missing = [s for s in sources if s not in index]
+    if missing:
+        raise ValueError(f"unknown source nodes: {missing}")
+    nodes = [index[s] for s in sources]
+
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, -(-len(nodes) // (workers * 4)))
+    chunks = [nodes[i:i + chunk] for i in range(0, len(nodes), chunk)]
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(graph, arc_weights, thresholds)
+        parts = [_buckets(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(graph, arc_weights, thresholds)) as pool:
+            parts = list(pool.map(_buckets, chunks))
+    dtype = np.uint8 if len(thresholds) < 255 else np.uint16
+    bucket = np.concatenate(parts) if parts else np.empty((0, graph.num_nodes), dtype=dtype)
+    return Isochrones(graph, sources, thresholds, bucket)
+
+def facility_isochrones(thresholds, sources=None, period=None, speed_kmh=None, workers=1) -> Isochrones:
+    """
+    Isochrones over the road network from facilities and neighborhoods (all of
+    them unless `sources` lists ids). Distances are km, traffic-weighted for
+    `period` when given; with speed_kmh thresholds are minutes instead.
+    """
+    from shared.data_loader import load_data
+    from shortest_path.road_network import get_csr_graph, get_period_weights
+
+    graph = get_csr_graph()
+    if sources is None:
+        ids = list(load_data("facilities")["id"].astype(str)) + list(load_data("neighborhoods")["id"].astype(str))
+        sources = [i for i in dict.fromkeys(ids) if i in graph.index]
+    weights = graph.weights if period is None else np.asarray(get_period_weights().arc(period))
+    if speed_kmh is not None:
+        weights = weights / speed_kmh * 60
+    return isochrones(graph, sources, thresholds, weights, workers)
@@ -0,0 +1,105 @@
+# landmarks.py
+#
+# ALT (A*, landmarks, triangle inequality) lower bounds. Distances to and from a
+# few well-spread landmark nodes are computed once; for any node v and goal t
+#
+#     d(v, t) >= d(v, L) - d(t, L)    and    d(v, t) >= d(L, t) - d(L, v)
+#
+# for every landmark L, so the largest of these is an admissible and consistent
+# A* heuristic. Bounds from base road distances stay valid for any cost that
+# never drops below the distance, such as the traffic-scaled costs of
+# dijkstra_traffic.calculate_cost, so searches with them remain exact.
+#
+# This is a library backend: no app page uses it, since the emergency page
+# runs one multi-target search (nearest.py) and point-to-point routes go
+# through the route cache. Pass road_network.get_landmarks() to
+# astar_emergency.astar to use it; benchmark.py compares it with Dijkstra.
+
+import numpy as np
+
+from shortest_path.path_tree import shortest_path_tree
+
+DEFAULT_LANDMARKS = 8
+
+class Landmarks:
+    """
+    to_landmark[i, v] is the distance from node v to landmark i and
+    from_landmark[i, v] the distance from landmark i to v (inf if unreachable).
+    """
+
+    def __init__(self, node_ids, nodes, to_landmark, from_landmark):
+        self.node_ids = list(node_ids)
+        self.nodes = nodes
+        self.to_landmark = to_landmark
+        self.from_landmark = from_landmark
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {label: i for i, label in enumerate(self.node_ids)}
+        return self._index
+
+    def lower_bounds(self, goal) -> np.ndarray:
+        """
+        Lower bound on the distance from every node to node index `goal`.
+        inf marks nodes that provably cannot reach the goal.
+        """
+        to_l, from_l = self.to_landmark, self.from_landmark
+        with np.errstate(invalid="ignore"):
+            forward = to_l - to_l[:, goal:goal + 1]
+            backward = from_l[:, goal:goal + 1] - from_l
+        # inf - inf carries no information; fmax skips those NaNs
+        bounds = np.fmax(forward, backward)
+        bounds = np.fmax.reduce(bounds, axis=0) if len(bounds) else np.zeros(len(self.node_ids))
+        return np.nan_to_num(np.maximum(bounds, 0.0), nan=0.0, posinf=np.inf)
+
+    def heuristic(self, goal_label):
+        """
+        Label -> lower bound lookup for A* over label-keyed graphs.
+        """
+        bounds = self.lower_bounds(self.index[goal_label]).tolist()
+        index = self.index
+        return lambda label: bounds[index[label]] if label in index else 0.0
+
+def select_landmarks(graph, count=DEFAULT_LANDMARKS, arc_weights=None) -> list:
+    """
+    Farthest-point selection: start from node 0 and repeatedly add the node
+    farthest from every landmark chosen so far. Nodes no landmark reaches
+    count as farthest, so each connected component gets a landmark.
+    """
+    n = graph.num_nodes
+    count = min(count, n)
+    if count == 0:
+        return []
+    nearest = np.full(n, np.inf)
+    chosen = []
+    candidate = 0
+    for _ in range(count):
+        chosen.append(candidate)
+        dist = shortest_path_tree(graph, candidate, arc_weights).dist
+        nearest = np.minimum(nearest, dist)
+        nearest[chosen] = -1.0
+        candidate = int(np.argmax(nearest))
+        if nearest[candidate] <= 0:
+            break
+    return chosen
+
+def build_landmarks(graph, count=DEFAULT_LANDMARKS, arc_weights=None, nodes=None) -> Landmarks:
+    """
+    Pick landmarks (unless `nodes` gives them) and compute their distance arrays.
+    """
+    if nodes is None:
+        nodes = select_landmarks(graph, count, arc_weights)
+    from_landmark = np.array([shortest_path_tree(graph, l, arc_weights).dist for l in nodes])
+    if graph.directed:
+        reverse = graph.transpose()
+        reverse_weights = None if arc_weights is None else graph.transpose_arc_weights(arc_weights)
+        to_landmark = np.array([shortest_path_tree(reverse, l, reverse_weights).dist for l in nodes])
+    else:
+        to_landmark = from_landmark
+    shape = (len(nodes), graph.num_nodes)
+    return Landmarks(
+        graph.node_ids, np.asarray(nodes, dtype=np.int32),
+        to_landmark.reshape(shape), from_landmark.reshape(shape),
+    )
@@ -0,0 +1,109 @@
+# nearest.py
+#
+# Nearest-facility queries. A single search from the incident settles nodes in
+# distance order, so the first target it settles is the nearest one; there is
+# no need to route to every facility and keep the minimum. For repeated
+# dispatch, one multi-source search run backwards from all facilities at once
+# labels every node with its nearest facility, turning a lookup into an array read.
+
+import heapq
+
+import numpy as np
+
+from shortest_path.dijkstra import build_path
+from shortest_path.dijkstra_traffic import calculate_cost
+
+def nearest_target(graph, start, targets, traffic_data=None, period=None):
+    """
+    Dijkstra from start over a label-keyed adjacency dict that stops at the
+    first settled node in targets. Returns (target, path, cost), or
+    (None, [], inf) when no target is reachable. With traffic_data/period the
+    edges cost what they cost in dijkstra_with_traffic.
+    """
+    targets = set(targets)
+    queue = [(0, start, start)]
+    parent = {}
+    while queue:
+        cost, node, prev = heapq.heappop(queue)
+        if node in parent:
+            continue
+        parent[node] = prev
+        if node in targets:
+            return node, build_path(parent, start, node), cost
+        for neighbor, weight in graph.get(node, []):
+            if neighbor not in parent:
+                if traffic_data is not None:
+                    weight = calculate_cost(node, neighbor, weight, traffic_data, period)
+                heapq.heappush(queue, (cost + weight, neighbor, node))
+    return None, [], float("inf")
+
+class NearestTable:
+    """
+    For every node v of a CSRGraph: target[v] is the node index of its nearest
+    target (-1 if none is reachable), distance[v] the distance to it, and
+    next_hop[v] the following node on that route (v itself at a target).
+    """
+
+    def __init__(self, graph, target, distance, next_hop):
+        self.graph = graph
+        self.target = target
+        self.distance = distance
+        self.next_hop = next_hop
+
+    def lookup(self, label):
+        """
+        (target label, path of labels, distance) for a node label, or
+        (None, [], inf) when the node is unknown or no target is reachable.
+        """
+        graph = self.graph
+        i = graph.index.get(label)
+        if i is None or self.target[i] < 0:
+            return None, [], float("inf")
+        path = [i]
+        while self.next_hop[path[-1]] != path[-1]:
+            path.append(int(self.next_hop[path[-1]]))
+        labels = graph.node_ids
+        return labels[self.target[i]], [labels[v] for v in path], float(self.distance[i])
+
+def nearest_target_table(graph, targets, arc_weights=None) -> NearestTable:
+    """
+    Multi-source Dijkstra seeded with every target at distance 0, run over the
+    reversed graph so distances are measured from each node to its target.
+    `targets` are node indices; arc_weights default to the graph's own.
+    """
+    reverse_weights = None if arc_weights is None else graph.transpose_arc_weights(arc_weights)
+    indptr, indices, weights = graph.transpose().adjacency_lists(reverse_weights)
+
+    n = graph.num_nodes
+    inf = float("inf")
+    dist = [inf] * n
+    owner = [-1] * n
+    hop = list(range(n))
+    done = bytearray(n)
+    queue = []
+    for t in set(int(t) for t in targets):
+        dist[t] = 0.0
+        owner[t] = t
+        queue.append((0.0, t))
+    heapq.heapify(queue)
+
+    while queue:
+        d, u = heapq.heappop(queue)
+        if done[u]:
+            continue
+        done[u] = 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                owner[v] = owner[u]
+                hop[v] = u
+                heapq.heappush(queue, (nd, v))
+
+    return NearestTable(
+        graph,
+        np.array(owner, dtype=np.int32),
+        np.array(dist),
+        np.array(hop, dtype=np.int32),
+    )
@@ -0,0 +1,247 @@
+# overlay.py
+#
+# Partition + overlay routing in the style of customizable route planning.
+# The road graph is split into balanced cells by recursive bisection; each
+# cell's boundary nodes (endpoints of cut edges) get a clique whose arcs are
+# the shortest distances between them inside the cell. A query searches the
+# full graph only inside the source and target cells and jumps across every
+# other cell along its clique arcs and the cut edges.
+#
+# Partitioning depends only on the topology, so it is done once. The cliques
+# ("customization") depend on the weights: when some weights change, only the
+# cells containing those edges are re-customized; cut edges are read directly
+# by queries and never need it. This is a single-level overlay; nesting cells
+# into coarser levels would be the next step for much larger networks.
+
+import heapq
+from collections import deque
+
+import numpy as np
+
+DEFAULT_CELL_SIZE = 128
+
+def _undirected_neighbours(graph) -> list:
+    neighbours = [[] for _ in range(graph.num_nodes)]
+    for u, v in zip(graph.edge_u.tolist(), graph.edge_v.tolist()):
+        neighbours[u].append(v)
+        neighbours[v].append(u)
+    return neighbours
+
+def _bfs_order(neighbours, start, members) -> list:
+    order, seen = [start], {start}
+    queue = deque(order)
+    while queue:
+        u = queue.popleft()
+        for v in neighbours[u]:
+            if v in members and v not in seen:
+                seen.add(v)
+                order.append(v)
+                queue.append(v)
+    return order
+
+def _bisect(neighbours, nodes) -> tuple:
+    # Grow one half breadth-first from a pseudo-peripheral node, so the cut
+    # runs along a BFS level front; disconnected leftovers go to the far side.
+    members = set(nodes)
+    far = _bfs_order(neighbours, nodes[0], members)[-1]
+    order = _bfs_order(neighbours, far, members)
+    if len(order) < len(nodes):
+        reached = set(order)
+        order += [v for v in nodes if v not in reached]
+    half = len(order) // 2
+    return order[:half], order[half:]
+
+def partition(graph, max_cell_size: int = DEFAULT_CELL_SIZE) -> np.ndarray:
+    """
+    Cell number of every node of a CSRGraph; cells hold at most max_cell_size
+    nodes and are split evenly, so sizes differ by at most a factor of two.
+    """
+    if max_cell_size < 1:
+        raise ValueError("max_cell_size must be at least 1")
+    neighbours = _undirected_neighbours(graph)
+    cell = np.zeros(graph.num_nodes, dtype=np.int32)
+    pending = [list(range(graph.num_nodes))] if graph.num_nodes else []
+    cells = 0
+    while pending:
+        nodes = pending.pop()
+        if len(nodes) <= max_cell_size:
+            cell[nodes] = cells
+            cells += 1
+        else:
+            pending.extend(_bisect(neighbours, nodes))
+    return cell
+
+def _necessary_arcs(clique) -> np.ndarray:
+    # A clique arc a->b can be left out of the search graph when some other
+    # boundary node c has d(a, c) + d(c, b) == d(a, b) with both legs positive:
+    # the search reaches b through c at the same cost (by induction on the
+    # arc length, the legs themselves are kept or implied in turn).
+    legs = np.where(clique > 0, clique, np.inf)
+    keep = np.isfinite(clique)
+    np.fill_diagonal(keep, False)
+    for i in range(len(clique)):
+        via = (legs[i][:, None] + legs).min(axis=0)
+        keep[i] &= via > clique[i] * (1 + 1e-12)
+    return keep
+
+class Overlay:
+    """
+    A partitioned CSRGraph with per-cell boundary cliques for the current arc
+    weights. boundary[c] lists the boundary node indices of cell c and
+    cliques[c][i, j] is the distance from boundary[c][i] to boundary[c][j]
+    without leaving the cell (inf when there is no such path).
+    """
+
+    def __init__(self, graph, cell, arc_weights=None):
+        self.graph = graph
+        self.cell = np.asarray(cell, dtype=np.int32)
+        self.num_cells = int(self.cell.max()) + 1 if len(self.cell) else 0
+        tails = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+        self.internal = self.cell[tails] == self.cell[graph.indices]
+        cut = ~self.internal
+        is_boundary = np.zeros(graph.num_nodes, dtype=bool)
+        is_boundary[tails[cut]] = True
+        is_boundary[graph.indices[cut]] = True
+        nodes = np.flatnonzero(is_boundary)
+        self.boundary = [nodes[self.cell[nodes] == c] for c in range(self.num_cells)]
+        self.cliques = [None] * self.num_cells
+        self._internal = self.internal.tolist()
+        self._clique_arcs = {}
+        self._weights = None
+        self.customize(arc_weights)
+
+    @property
+    def cut_size(self) -> int:
+        """
+        Number of edges whose endpoints lie in different cells.
+        """
+        edge_cell = self.cell[self.graph.edge_u] != self.cell[self.graph.edge_v]
+        return int(edge_cell.sum())
+
+    def _cell_search(self, source, target=None):
+        # Dijkstra from node index `source` over the arcs inside its cell
+        indptr, indices, weights = self._lists
+        internal = self._internal
+        dist, pred = {source: 0.0}, {source: -1}
+        done = set()
+        queue = [(0.0, source)]
+        while queue:
+            d, u = heapq.heappop(queue)
+            if u in done:
+                continue
+            done.add(u)
+            if u == target:
+                break
+            for k in range(indptr[u], indptr[u + 1]):
+                if internal[k]:
+                    v = indices[k]
+                    nd = d + weights[k]
+                    if nd < dist.get(v, float("inf")):
+                        dist[v] = nd
+                        pred[v] = u
+                        heapq.heappush(queue, (nd, v))
+        return dist, pred
+
+    def customize(self, arc_weights=None, cells=None) -> list:
+        """
+        Set the arc weights (the graph's own by default) and recompute the
+        cliques of `cells`, or of every cell. Returns the cells recomputed.
+        """
+        self._lists = self.graph.adjacency_lists(arc_weights)
+        self._weights = np.asarray(self._lists[2], dtype=np.float64)
+        cells = range(self.num_cells) if cells is None else sorted(set(int(c) for c in cells))
+        for c in cells:
+            nodes = self.boundary[c].tolist()
+            clique = np.full((len(nodes), len(nodes)), np.inf)
+            for i, a in enumerate(nodes):
+                dist = self._cell_search(a)[0]
+                clique[i] = [dist.get(b, np.inf) for b in nodes]
+            self.cliques[c] = clique
+            keep = _necessary_arcs(clique)
+            for i, a in enumerate(nodes):
+                self._clique_arcs[a] = [(nodes[j], float(clique[i, j])) for j in np.flatnonzero(keep[i]).tolist()]
+        return list(cells)
+
+    def update(self, arc_weights, edges=None) -> list:
+        """
+        Switch to new arc weights (e.g. another traffic period) and re-customize
+        only the cells containing a changed edge. `edges` lists the changed edge
+        indices; by default they are found by comparing with the current weights.
+        Returns the cells recomputed.
+        """
+        graph = self.graph
+        if edges is None:
+            arcs = np.flatnonzero(np.asarray(arc_weights, dtype=np.float64) != self._weights)
+        else:
+            arcs = np.flatnonzero(np.isin(graph.edge_of_arc, np.asarray(edges)))
+        arcs = arcs[self.internal[arcs]]
+        return self.customize(arc_weights, self.cell[graph.indices[arcs]])
+
+    def query(self, source, target):
+        """
+        (cost, node index path) from source to target, or (inf, []) when
+        target is unreachable.
+        """
+        indptr, indices, weights = self._lists
+        internal, cell, clique_arcs = self._internal, self.cell.tolist(), self._clique_arcs
+        open_cells = {cell[source], cell[target]}
+        inf = float("inf")
+        dist = [inf] * len(cell)
+        pred = [-1] * len(cell)
+        shortcut = bytearray(len(cell))
+        done = bytearray(len(cell))
+        dist[source] = 0.0
+        queue = [(0.0, source)]
+        while queue:
+            d, u = heapq.heappop(queue)
+            if done[u]:
+                continue
+            done[u] = 1
+            if u == target:
+                break
+            inside = cell[u] in open_cells
+            for k in range(indptr[u], indptr[u + 1]):
+                if inside or not internal[k]:
+                    v = indices[k]
+                    nd = d + weights[k]
+                    if nd < dist[v]:
+                        dist[v], pred[v], shortcut[v] = nd, u, 0
+                        heapq.heappush(queue, (nd, v))
+            if not inside:
+                for v, w in clique_arcs.get(u, ()):
+                    nd = d + w
+                    if nd < dist[v]:
+                        dist[v], pred[v], shortcut[v] = nd, u, 1
+                        heapq.heappush(queue, (nd, v))
+        if not done[target]:
+            return inf, []
+
+        path = [target]
+        while path[-1] != source:
+            u = pred[path[-1]]
+            if shortcut[path[-1]]:
+                inner = self._cell_search(u, path[-1])[1]
+                v = inner[path[-1]]
+                while v != u:
+                    path.append(v)
+                    v = inner[v]
+            path.append(u)
+        path.reverse()
+        return dist[target], path
+
+def build_overlay(graph, max_cell_size: int = DEFAULT_CELL_SIZE, arc_weights=None) -> Overlay:
+    """
+    Partition a CSRGraph and customize the overlay for arc_weights.
+    """
+    return Overlay(graph, partition(graph, max_cell_size), arc_weights)
+
+def overlay_dijkstra(overlay, start, end):
+    """
+    Same (path, cost) contract as dijkstra.dijkstra, over an Overlay.
+    """
+    index = overlay.graph.index
+    if start not in index or end not in index:
+        return [], float("inf")
+    cost, path = overlay.query(index[start], index[end])
+    labels = overlay.graph.node_ids
+    return [labels[i] for i in path], cost
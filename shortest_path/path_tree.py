@@ -0,0 +1,109 @@
+# path_tree.py
+#
+# Single-source shortest paths over a CSRGraph with distance and predecessor
+# arrays. One search from an origin answers queries to every destination;
+# paths are only materialised when asked for.
+
+import heapq
+import numpy as np
+
+class ShortestPathTree:
+    """
+    Result of a single-source search. dist[v] is the distance from the source
+    (inf when v was not reached) and pred[v] the previous node on that path
+    (-1 for the source and unreached nodes).
+    """
+
+    def __init__(self, graph, source, dist, pred):
+        self.graph = graph
+        self.source = source
+        self.dist = dist
+        self.pred = pred
+
+    def distance(self, target) -> float:
+        return float(self.dist[target])
+
+    def reached(self, target) -> bool:
+        return bool(np.isfinite(self.dist[target]))
+
+    def path(self, target) -> list:
+        """
+        Node indices from the source to target, or [] when target is unreachable.
+        """
+        if not self.reached(target):
+            return []
+        pred = self.pred
+        path = [int(target)]
+        while path[-1] != self.source:
+            path.append(int(pred[path[-1]]))
+        path.reverse()
+        return path
+
+    def path_labels(self, target_label) -> list:
+        graph = self.graph
+        return [graph.node_ids[i] for i in self.path(graph.index[target_label])]
+
+def shortest_path_tree(graph, source, arc_weights=None, target=None, cutoff=None,
+                       backend="heap", precision=None) -> ShortestPathTree:
+    """
+    Dijkstra from node index `source`. Arc weights default to the graph's own.
+    With `target` the search stops once it is settled; with `cutoff` nodes
+    farther than cutoff are left unreached. Without either, the result is the
+    full shortest-path tree.
+
+    backend "heap" searches exact float weights with heapq; "dial" and "radix"
+    round weights to multiples of `precision` and use the monotone integer
+    queues of shortest_path.queues (see there for the error bound).
+    """
+    if backend != "heap":
+        from shortest_path.queues import DEFAULT_PRECISION, monotone_tree
+        return monotone_tree(graph, source, arc_weights, target, cutoff, backend,
+                             DEFAULT_PRECISION if precision is None else precision)
+    indptr, indices, weights = graph.adjacency_lists(arc_weights)
+    n = graph.num_nodes
+    inf = float("inf")
+    dist = [inf] * n
+    pred = [-1] * n
+    done = bytearray(n)
+    limit = inf if cutoff is None else cutoff
+
+    dist[source] = 0.0
+    queue = [(0.0, source)]
+    while queue:
+        d, u = heapq.heappop(queue)
+        if done[u]:
+            continue
+        done[u] = 1
+        if u == target:
+            break
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + weights[k]
+            if nd < dist[v] and nd <= limit:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(queue, (nd, v))
+
+    dist = np.array(dist)
+    if target is not None or cutoff is not None:
+        # Tentative labels of unsettled nodes are not final; report them unreached
+        unsettled = np.frombuffer(bytes(done), dtype=np.uint8) == 0
+        dist[unsettled] = np.inf
+    pred = np.array(pred, dtype=np.int32)
+    pred[~np.isfinite(dist)] = -1
+    return ShortestPathTree(graph, source, dist, pred)
+
+def shortest_path(graph, start, end, arc_weights=None, backend="heap", precision=None):
+    """
+    Same (path, cost) contract as dijkstra.dijkstra, over a CSRGraph and its
+    external node ids. backend and precision choose the queue as in
+    shortest_path_tree.
+    """
+    if start not in graph.index or end not in graph.index:
+        return [], float("inf")
+    target = graph.index[end]
+    tree = shortest_path_tree(graph, graph.index[start], arc_weights, target=target,
+                              backend=backend, precision=precision)
+    if not tree.reached(target):
+        return [], float("inf")
+    return tree.path_labels(end), tree.distance(target)
@@ -0,0 +1,197 @@
+# queues.py
+#
+# Monotone priority queues for Dijkstra over integer-quantized weights.
+#
+# Arc weights are rounded to multiples of `precision` (0.001 km, i.e. metres,
+# by default) and searched as integers. Dijkstra only ever pops keys in
+# non-decreasing order, which lets a queue skip the general heap invariant:
+#
+#   DialQueue  - a ring of buckets `width` distance units wide; push is an
+#                append, pop scans forward to the next non-empty bucket. The
+#                width is the smallest positive arc weight (Dinitz), so every
+#                label in the lowest bucket is already final and the ring has
+#                about max / min weight buckets whatever the precision. Zero
+#                weights force width 1; rings longer than MAX_DIAL_BUCKETS are
+#                refused rather than scanned.
+#   RadixHeap  - buckets by the highest bit in which a key differs from the
+#                last popped key; each key moves down at most log2(C) times.
+#
+# Both are pure Python, so in CPython they do not beat heapq's C heap; they are
+# for compiled ports to start from and for comparing the queue disciplines.
+# shortest_path.benchmark times them alongside the other backends.
+#
+# Error bound: rounding changes each arc by at most precision / 2, so a path of
+# h arcs changes by at most h * precision / 2. A reported distance is therefore
+# within h * precision / 2 of the exact length of the returned path, and that
+# path is at most (h + h*) * precision / 2 longer than the exact optimum, where
+# h* is the arc count of an exact shortest path. Choose precision well below
+# the smallest weight difference that matters.
+
+import numpy as np
+
+DEFAULT_PRECISION = 0.001
+BACKENDS = ("dial", "radix")
+MAX_DIAL_BUCKETS = 4096
+
+def quantize(weights, precision=DEFAULT_PRECISION) -> np.ndarray:
+    """
+    Round non-negative weights to integer multiples of precision.
+    """
+    if precision <= 0:
+        raise ValueError("precision must be positive")
+    weights = np.asarray(weights, dtype=np.float64)
+    if (weights < 0).any():
+        raise ValueError("monotone queues need non-negative weights")
+    return np.rint(weights / precision).astype(np.int64)
+
+class DialQueue:
+    """
+    Dial's buckets of `width` keys each: valid while every key in the queue
+    lies within max_weight of the last popped key, which Dijkstra guarantees.
+    Keys come out in bucket order, which is key order for width 1.
+    """
+
+    def __init__(self, max_weight, width=1):
+        self.width = int(width)
+        self.size = int(max_weight) // self.width + 2
+        self.buckets = [[] for _ in range(self.size)]
+        self.current = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, key, item):
+        self.buckets[key // self.width % self.size].append((key, item))
+        self.count += 1
+
+    def pop(self):
+        buckets, size = self.buckets, self.size
+        while not buckets[self.current % size]:
+            self.current += 1
+        self.count -= 1
+        return buckets[self.current % size].pop()
+
+class RadixHeap:
+    """
+    Radix heap over non-negative integer keys that never drop below the last
+    popped key.
+    """
+
+    def __init__(self):
+        self.buckets = [[] for _ in range(65)]
+        self.last = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, key, item):
+        self.buckets[(key ^ self.last).bit_length()].append((key, item))
+        self.count += 1
+
+    def pop(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            moving = buckets[i]
+            buckets[i] = []
+            self.last = last = min(moving)[0]
+            for entry in moving:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self.count -= 1
+        return buckets[0].pop()
+
+def dial_bounds(weights) -> tuple:
+    """
+    (largest weight, bucket width) of integer arc weights for dial_queue. The
+    width is the smallest positive weight, or 1 when any weight is zero.
+    """
+    weights = np.asarray(weights, dtype=np.int64)
+    if not len(weights):
+        return 0, 1
+    low = int(weights.min())
+    return int(weights.max()), 1 if low == 0 else low
+
+def dial_queue(max_weight, width=1) -> DialQueue:
+    """
+    DialQueue for arc weights up to max_weight with buckets `width` wide, as
+    returned by dial_bounds.
+    """
+    queue_size = max_weight // width + 2
+    if queue_size > MAX_DIAL_BUCKETS:
+        raise ValueError(
+            f"dial backend would need {queue_size} buckets (more than {MAX_DIAL_BUCKETS}); "
+            "use a coarser precision or the radix backend"
+        )
+    return DialQueue(max_weight, width)
+
+def quantized_lists(graph, arc_weights=None, precision=DEFAULT_PRECISION):
+    """
+    (indptr, indices, integer weights, dial_bounds of the weights); kept on the
+    graph for its own weights when graph.keep_lists is set, so the bounds are
+    worked out once per weight array rather than per query.
+    """
+    if arc_weights is None:
+        key = ("quantized", precision)
+        lists = graph._lists.get(key)
+        if lists is None:
+            indptr, indices, _ = graph.adjacency_lists()
+            weights = quantize(graph.weights, precision)
+            lists = (indptr, indices, weights.tolist(), dial_bounds(weights))
+            if graph.keep_lists:
+                graph._lists[key] = lists
+        return lists
+    indptr, indices, _ = graph.adjacency_lists()
+    weights = quantize(arc_weights, precision)
+    return indptr, indices, weights.tolist(), dial_bounds(weights)
+
+def monotone_tree(graph, source, arc_weights=None, target=None, cutoff=None,
+                  backend="radix", precision=DEFAULT_PRECISION):
+    """
+    shortest_path_tree with a monotone integer queue; distances come back in
+    the original units, rounded as described at the top of this module.
+    """
+    from shortest_path.path_tree import ShortestPathTree
+
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown queue backend {backend!r}; expected one of {BACKENDS}")
+    indptr, indices, weights, bounds = quantized_lists(graph, arc_weights, precision)
+    n = graph.num_nodes
+    unreached = -1
+    dist = [unreached] * n
+    pred = [-1] * n
+    done = bytearray(n)
+    limit = None if cutoff is None else int(np.floor(cutoff / precision + 0.5))
+    queue = dial_queue(*bounds) if backend == "dial" else RadixHeap()
+
+    dist[source] = 0
+    queue.push(0, source)
+    while queue:
+        _, u = queue.pop()
+        if done[u]:
+            continue
+        # A Dial bucket may hold a stale entry ahead of the node's final label
+        d = dist[u]
+        done[u] = 1
+        if u == target:
+            break
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + weights[k]
+            if (dist[v] == unreached or nd < dist[v]) and (limit is None or nd <= limit):
+                dist[v] = nd
+                pred[v] = u
+                queue.push(nd, v)
+
+    dist = np.array(dist, dtype=np.float64) * precision
+    dist[dist < 0] = np.inf
+    if target is not None or cutoff is not None:
+        # Tentative labels of unsettled nodes are not final; report them unreached
+        unsettled = np.frombuffer(bytes(done), dtype=np.uint8) == 0
+        dist[unsettled] = np.inf
+    pred = np.array(pred, dtype=np.int32)
+    pred[~np.isfinite(dist)] = -1
+    return ShortestPathTree(graph, source, dist, pred)
@@ -0,0 +1,292 @@
+# road_network.py
+#
+# Lazily built road network shared by the routing modules. Nothing is loaded at
+# import time; each structure is built on first use and then reused.
+
+import threading
+
+_cache = {}
+_lock = threading.RLock()
+
+# traffic periods in the order used by every per-period array, and their columns
+TRAFFIC_PERIODS = ("morning", "afternoon", "evening", "night")
+PERIOD_COLUMNS = {
+    "morning": "morning_peakveh/h",
+    "afternoon": "afternoonveh/h",
+    "evening": "evening_peakveh/h",
+    "night": "nightveh/h",
+}
+
+def _get(name, builder):
+    with _lock:
+        if name not in _cache:
+            _cache[name] = builder()
+        return _cache[name]
+
+def build_road_graph(roads) -> dict:
+    """
+    Build an undirected adjacency dict {node: [(neighbor, distance_km), ...]}.
+    """
+    graph = {}
+    for f, t, d in zip(roads["from_id"], roads["to_id"], roads["distance_km"].to_numpy(dtype=float).tolist()):
+        f, t = str(f), str(t)
+        graph.setdefault(f, []).append((t, d))
+        graph.setdefault(t, []).append((f, d))
+    return graph
+
+def build_road_csr(roads, node_index=None):
+    """
+    Build the road network as a CSRGraph with traffic and condition columns.
+    Node i of the graph is node i of the shared node index, so integer results
+    line up with every other dataset.
+    """
+    from graph.graph_builder import CSRGraph
+    from shared.node_index import get_node_index
+
+    index = get_node_index() if node_index is None else node_index
+    u = index.intern_many(roads["from_id"])
+    v = index.intern_many(roads["to_id"])
+    return CSRGraph(
+        list(index.labels), u, v,
+        roads["distance_km"].to_numpy(dtype=float),
+        traffic=roads["traffic_level"].to_numpy(),
+        condition=roads["condition"].to_numpy(),
+    )
+
+def _period_volumes(csr, traffic, tails, heads):
+    """
+    Vehicles per hour from tails[i] to heads[i] in each of TRAFFIC_PERIODS, as
+    a float32 array with one row per pair. Like calculate_cost, a -> b takes
+    the "a-b" record and falls back to "b-a"; pairs without a record are NaN.
+    """
+    import numpy as np
+    from shared.node_index import NodeIndex, split_road_ids
+
+    index = NodeIndex(csr.node_ids)
+    u, v = split_road_ids(traffic["roadid"], index)
+    n = csr.num_nodes
+    rows = traffic[[PERIOD_COLUMNS[p] for p in TRAFFIC_PERIODS]].to_numpy(dtype=np.float32)
+    # later records replace earlier ones, as in build_traffic_data
+    record = {a * n + b: k for k, (a, b) in enumerate(zip(u.tolist(), v.tolist())) if a < n and b < n}
+
+    volumes = np.full((len(tails), len(TRAFFIC_PERIODS)), np.nan, dtype=np.float32)
+    for i, (a, b) in enumerate(zip(tails.tolist(), heads.tolist())):
+        k = record.get(a * n + b, record.get(b * n + a))
+        if k is not None:
+            volumes[i] = rows[k]
+    return volumes
+
+def build_arc_period_volumes(csr, traffic):
+    """
+    Vehicles per hour on every arc of `csr` in each of TRAFFIC_PERIODS, as an
+    (arcs x periods) float32 array. Each direction of a road takes its own
+    traffic record, so this is what routing costs are compiled from.
+    """
+    import numpy as np
+
+    tails = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+    return _period_volumes(csr, traffic, tails, csr.indices)
+
+def build_edge_period_volumes(csr, traffic):
+    """
+    Vehicles per hour on every edge of `csr` in each of TRAFFIC_PERIODS, as an
+    (edges x periods) float32 array, taken in the direction the edge is stored.
+    For per-road reports; see build_arc_period_volumes for routing.
+    """
+    return _period_volumes(csr, traffic, csr.edge_u, csr.edge_v)
+
+def build_node_attributes(csr, locations):
+    """
+    Per-node x/y coordinates (float32, NaN when unknown) and location type tags
+    (int16 codes into the returned list of type names, -1 when untagged).
+    """
+    import numpy as np
+    from shared.node_index import NodeIndex
+
+    n = csr.num_nodes
+    x = np.full(n, np.nan, dtype=np.float32)
+    y = np.full(n, np.nan, dtype=np.float32)
+    tags = np.full(n, -1, dtype=np.int16)
+
+    nodes = NodeIndex(csr.node_ids).lookup_many(locations["id"])
+    known = (nodes >= 0) & (nodes < n)
+    x[nodes[known]] = locations["x"].to_numpy(dtype=np.float32)[known]
+    y[nodes[known]] = locations["y"].to_numpy(dtype=np.float32)[known]
+    types = locations["type"].astype("category")
+    tags[nodes[known]] = types.cat.codes.to_numpy()[known]
+    return x, y, tags, [str(t) for t in types.cat.categories]
+
+def build_traffic_data(traffic) -> dict:
+    """
+    Map each road id ("1-3") to its vehicles per hour in every period.
+    """
+    return {
+        str(road): {"morning": int(m), "afternoon": int(a), "evening": int(e), "night": int(n)}
+        for road, m, a, e, n in zip(
+            traffic["roadid"],
+            traffic["morning_peakveh/h"],
+            traffic["afternoonveh/h"],
+            traffic["evening_peakveh/h"],
+            traffic["nightveh/h"],
+        )
+    }
+
+def get_road_graph() -> dict:
+    from shared.data_loader import load_data
+    return _get("graph", lambda: build_road_graph(load_data("roads")))
+
+def get_csr_graph():
+    """
+    The road CSRGraph, memory-mapped from the network snapshot when a fresh one
+    exists (see shortest_path.snapshot), otherwise built from the datasets.
+    It serves every query of the process, so it keeps its search lists.
+    """
+    from shared.data_loader import load_data
+    from shortest_path.snapshot import load_snapshot
+
+    def build():
+        snapshot = load_snapshot()
+        graph = snapshot.graph if snapshot is not None else build_road_csr(load_data("roads"))
+        graph.keep_lists = True
+        return graph
+    return _get("csr", build)
+
+def get_snapshot():
+    """
+    The network snapshot, built on first use if it is missing or stale.
+    """
+    from shortest_path.snapshot import open_snapshot
+    return _get("snapshot", open_snapshot)
+
+def get_hierarchy():
+    """
+    Contraction hierarchy of the road network, loaded from disk when a fresh
+    one exists (see shortest_path.contraction), otherwise built and saved.
+    """
+    from shortest_path.contraction import build_road_hierarchy, load_hierarchy
+
+    def build():
+        hierarchy = load_hierarchy()
+        return build_road_hierarchy() if hierarchy is None else hierarchy
+    return _get("hierarchy", build)
+
+def get_landmarks():
+    """
+    ALT landmark distances over the road CSRGraph (see shortest_path.landmarks).
+    """
+    from shortest_path.landmarks import build_landmarks
+    return _get("landmarks", lambda: build_landmarks(get_csr_graph()))
+
+def get_period_weights():
+    """
+    Per-period arc costs of the road CSRGraph (see shortest_path.time_dependent).
+    """
+    from shared.data_loader import load_data
+    from shortest_path.time_dependent import compile_period_weights
+
+    def build():
+        csr = get_csr_graph()
+        return compile_period_weights(csr, build_arc_period_volumes(csr, load_data("traffic")))
+    return _get("period_weights", build)
+
+def get_overlay(period=None):
+    """
+    Partitioned overlay of the road network (see shortest_path.overlay),
+    customized for a traffic period or for plain lengths when period is None.
+    Every period keeps its own overlay over one shared partition, so callers
+    never see an overlay being re-customized for another period.
+    """
+    from shortest_path.overlay import Overlay, partition
+
+    def build():
+        graph = get_csr_graph()
+        cells = _get("overlay_cells", lambda: partition(graph))
+        return Overlay(graph, cells, None if period is None else get_period_weights().arc(period))
+    return _get(("overlay", period), build)
+
+def get_isochrones(thresholds, period=None, speed_kmh=None):
+    """
+    Facility and neighborhood isochrones (see shortest_path.isochrone), computed
+    once per set of thresholds so map redraws only read the stored arrays.
+    """
+    from shortest_path.isochrone import facility_isochrones
+
+    key = ("isochrones", tuple(sorted(thresholds)), period, speed_kmh)
+    return _get(key, lambda: facility_isochrones(key[1], period=period, speed_kmh=speed_kmh))
+
+def get_traffic_data() -> dict:
+    from shared.data_loader import load_data
+    return _get("traffic_data", lambda: build_traffic_data(load_data("traffic")))
+
+def get_neighborhood_coords() -> dict:
+    """
+    Neighborhood id -> (x, y) coordinates, as used by the A* heuristic.
+    """
+    from shared.data_loader import load_data
+
+    def build():
+        locations = load_data("neighborhoods")
+        return {
+            str(i): (x, y)
+            for i, x, y in zip(
+                locations["id"],
+                locations["x_coordinate"].to_numpy(dtype=float).tolist(),
+                locations["y_coordinate"].to_numpy(dtype=float).tolist(),
+            )
+        }
+    return _get("coords", build)
+
+def get_neighborhood_names():
+    """
+    Return (id_to_name, name_to_id) for neighborhoods; name keys are lower-case.
+    """
+    from shared.data_loader import load_data
+
+    def build():
+        locations = load_data("neighborhoods")
+        ids, names = [str(i) for i in locations["id"]], list(locations["name"])
+        return dict(zip(ids, names)), {n.lower(): i for i, n in zip(ids, names)}
+    return _get("names", build)
+
+def data_version() -> str:
+    """
+    Version of the road, traffic and location data the network is built from.
+    Files are only re-hashed when their size or mtime changed since the last call.
+    """
+    from shortest_path.snapshot import combined_source_hash, source_fingerprints, sources_stale
+
+    with _lock:
+        sources = _cache.get("version_sources")
+        if sources is None or sources_stale(sources):
+            _cache["version_sources"] = source_fingerprints()
+            _cache["version"] = combined_source_hash(_cache["version_sources"])
+        return _cache["version"]
+
+def warm():
+    """
+    Build every shared structure now, e.g. before forking worker processes.
+    """
+    get_road_graph()
+    get_csr_graph()
+    get_landmarks()
+    get_period_weights()
+    get_traffic_data()
+    get_neighborhood_coords()
+    get_neighborhood_names()
+
+def reset():
+    """
+    Forget every built structure so the next use rebuilds it from the datasets.
+    """
+    with _lock:
+        _cache.clear()
+
+def reload():
+    """
+    Reset and also drop the registry's datasets, so the next use re-reads the
+    files; for when the data on disk changed.
+    """
+    from shared.data_loader import registry
+
+    registry.invalidate()
+    reset()
@@ -0,0 +1,233 @@
+# route_cache.py
+#
+# Bounded LRU cache of routes and shortest-path trees. Entries are keyed on
+# (origin, destination, period) and tagged with the data version they were
+# computed under; when the road or traffic data changes the whole cache is
+# dropped, along with the network structures and datasets it was built
+# from. A cached tree also answers every route that lies on one of its
+# branches, since any part of a shortest path is itself a shortest path.
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+
+def _route_size(path) -> int:
+    # list, tuple and float overhead plus a small str per node
+    return 200 + 64 * len(path)
+
+class RouteCache:
+    """
+    LRU cache bounded by an estimate of its memory use. `version` is a callable
+    returning the current data version (road_network.data_version by default);
+    it is consulted at most once every `check_interval` seconds. When it
+    changes, the cache is cleared and `on_change` is called so routes are not
+    recomputed on stale structures (road_network.reload by default).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, version=None, check_interval: float = 1.0,
+                 on_change=None):
+        if version is None:
+            from shortest_path.road_network import data_version, reload
+            version = data_version
+            on_change = reload if on_change is None else on_change
+        self.max_bytes = max_bytes
+        self._version_of = version
+        self._on_change = on_change
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._trees = {}
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked = float("-inf")
+        self.bytes = 0
+        self.hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        version = self._version_of()
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+                if self._on_change is not None:
+                    self._on_change()
+            self._clear()
+            self._version = version
+
+    def _clear(self):
+        self._entries.clear()
+        self._trees.clear()
+        self.bytes = 0
+
+    def _store(self, key, value, size) -> bool:
+        """
+        Insert or replace an entry and evict down to max_bytes. False (and
+        nothing changed) when the entry alone is larger than the cache.
+        """
+        if size > self.max_bytes:
+            return False
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            evicted, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+            if evicted[0] == "tree":
+                self._trees.get(evicted[2], {}).pop(evicted[1], None)
+        return True
+
+    def _discard(self, key):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        if key[0] == "tree":
+            self._trees.get(key[2], {}).pop(key[1], None)
+
+    def get(self, origin, destination, period=None):
+        """
+        Cached (path, cost) for the pair, from a stored route or from any stored
+        tree of the same period whose branch runs through origin to destination.
+        None on a miss.
+        """
+        with self._lock:
+            self._check_version()
+            key = ("route", origin, destination, period)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                path, cost = entry[0]
+                return list(path), cost
+            found = self._from_trees(origin, destination, period)
+            if found is not None:
+                self.tree_hits += 1
+                return found
+            self.misses += 1
+            return None
+
+    def _from_trees(self, origin, destination, period):
+        trees = self._trees.get(period, {})
+        # a tree rooted at the origin first, then any tree passing through it
+        for root in sorted(trees, key=lambda r: r != origin):
+            tree = trees[root]
+            graph = tree.graph
+            if origin not in graph.index or destination not in graph.index:
+                continue
+            u, v = graph.index[origin], graph.index[destination]
+            if not tree.reached(v):
+                continue
+            pred = tree.pred
+            branch = [v]
+            while branch[-1] != u and branch[-1] != tree.source:
+                branch.append(int(pred[branch[-1]]))
+            if branch[-1] != u:
+                continue
+            self._entries.move_to_end(("tree", root, period))
+            labels = graph.node_ids
+            cost = float(tree.dist[v] - tree.dist[u])
+            return [labels[i] for i in reversed(branch)], cost
+        return None
+
+    def put(self, origin, destination, period, path, cost):
+        with self._lock:
+            self._check_version()
+            self._store(("route", origin, destination, period), (list(path), cost), _route_size(path))
+
+    def put_tree(self, tree, period=None):
+        """
+        Store a path_tree.ShortestPathTree; it serves routes from its source and
+        every sub-route along its branches.
+        """
+        with self._lock:
+            self._check_version()
+            root = tree.graph.node_ids[tree.source]
+            size = 200 + np.asarray(tree.dist).nbytes + np.asarray(tree.pred).nbytes
+            key = ("tree", root, period)
+            if self._store(key, tree, size):
+                self._trees.setdefault(period, {})[root] = tree
+            else:
+                # Too large to keep; an older tree for the root must not outlive it
+                self._discard(key)
+
+    def apply_edge_changes(self, period, arc_weights, edges) -> dict:
+        """
+        Bring the period's entries up to date after the weights of `edges`
+        changed (arc_weights being the new arc weights). Cached trees are
+        repaired in place (see shortest_path.dynamic); cached routes are
+        re-read from a repaired tree, or dropped when no tree covers them.
+        Returns the destinations whose route changed per tree root, and the
+        (origin, destination) routes that changed or were dropped.
+        """
+        from shortest_path.dynamic import repair_tree
+
+        with self._lock:
+            # Never repair trees computed under an outdated data version
+            self._check_version()
+            trees = {}
+            for root, tree in self._trees.get(period, {}).items():
+                labels = tree.graph.node_ids
+                trees[root] = [labels[i] for i in repair_tree(tree, arc_weights, edges).tolist()]
+
+            changed, dropped = [], []
+            for key in [k for k in self._entries if k[0] == "route" and k[3] == period]:
+                if key not in self._entries:
+                    # evicted while storing an earlier repaired route
+                    continue
+                path, cost = self._entries[key][0]
+                found = self._from_trees(key[1], key[2], period)
+                if found is None:
+                    self._discard(key)
+                    dropped.append(key[1:3])
+                elif found[0] != path or not math.isclose(found[1], cost):
+                    if self._store(key, found, _route_size(found[0])):
+                        changed.append(key[1:3])
+                    else:
+                        self._discard(key)
+                        dropped.append(key[1:3])
+            return {"trees": trees, "changed": changed, "dropped": dropped}
+
+    def route(self, origin, destination, period, compute):
+        """
+        Cached (path, cost) for the pair, or compute() it and cache the result.
+        """
+        found = self.get(origin, destination, period)
+        if found is None:
+            found = compute()
+            self.put(origin, destination, period, *found)
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.tree_hits + self.misses
+            return {
+                "hits": self.hits,
+                "tree_hits": self.tree_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.tree_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "version": self._version,
+            }
+
+route_cache = RouteCache()
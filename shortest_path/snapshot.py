@@ -0,0 +1,209 @@
+# snapshot.py
+#
+# Prebuilt road network snapshot. A build step compiles the road graph, node
+# coordinates, per-arc traffic volumes for every period and location tags into
+# one binary file that processes memory-map read-only, so workers share the
+# same pages.
+#
+# Layout: 8-byte magic, uint32 format version, uint32 header length, a JSON
+# header, then every array at a 64-byte aligned offset listed in the header.
+
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"RTSNAP\0\0"
+SNAPSHOT_VERSION = 3
+DEFAULT_SNAPSHOT = "shared/cleaned_data/network.snap"
+SNAPSHOT_SOURCES = ("roads", "traffic", "locations")
+_ALIGN = 64
+
+class Snapshot:
+    """
+    A memory-mapped network snapshot. All arrays are read-only views of the file.
+    """
+
+    def __init__(self, path, header, arrays):
+        self.path = Path(path)
+        self.header = header
+        self.arrays = arrays
+        self.periods = tuple(header["periods"])
+        self.tag_names = header["tag_names"]
+
+        from graph.graph_builder import CSRGraph
+        self.graph = CSRGraph.from_arrays(
+            np.char.decode(arrays["node_ids"], "utf-8").tolist(),
+            arrays["indptr"], arrays["indices"], arrays["weights"], arrays["edge_of_arc"],
+            arrays["edge_u"], arrays["edge_v"], arrays["edge_weights"],
+            arrays["edge_traffic"], arrays["edge_condition"],
+        )
+        self.x = arrays["x"]
+        self.y = arrays["y"]
+        self.tags = arrays["tags"]
+        self.volumes = arrays["volumes"]
+
+    @property
+    def source_hash(self) -> str:
+        return self.header["source_hash"]
+
+    def is_stale(self) -> bool:
+        return _is_stale(self.header)
+
+def source_fingerprints() -> dict:
+    """
+    Fingerprint and schema of every dataset the network is compiled from.
+    """
+    from shared.data_loader import DATA_PATHS, DATA_SCHEMAS
+    from shared.fingerprint import file_fingerprint
+
+    return {
+        name: dict(file_fingerprint(DATA_PATHS[name]), schema=DATA_SCHEMAS.get(name))
+        for name in SNAPSHOT_SOURCES
+    }
+
+def combined_source_hash(fingerprints: dict) -> str:
+    """
+    One digest over the content and schema of every source; the network's version.
+    """
+    import hashlib
+
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+    for name in sorted(fingerprints):
+        payload = {"sha256": fingerprints[name]["sha256"], "schema": fingerprints[name]["schema"]}
+        digest.update(f"{name}:{json.dumps(payload, sort_keys=True)}".encode())
+    return digest.hexdigest()
+
+def _is_stale(header: dict) -> bool:
+    return sources_stale(header.get("sources", {}))
+
+def sources_stale(sources: dict) -> bool:
+    """
+    True when fingerprints taken by source_fingerprints() no longer match the datasets.
+    """
+    from shared.data_loader import DATA_PATHS, DATA_SCHEMAS
+    from shared.fingerprint import fingerprint_matches
+
+    if set(sources) != set(SNAPSHOT_SOURCES):
+        return True
+    for name, fingerprint in sources.items():
+        if fingerprint.get("path") != str(Path(DATA_PATHS[name]).resolve()):
+            return True
+        if fingerprint.get("schema") != DATA_SCHEMAS.get(name):
+            return True
+        if not fingerprint_matches(fingerprint):
+            return True
+    return False
+
+def build_snapshot(path: str = DEFAULT_SNAPSHOT) -> Path:
+    """
+    Compile the network from the datasets and write it to `path` atomically.
+    """
+    from shared.data_loader import load_data
+    from shortest_path.road_network import (
+        TRAFFIC_PERIODS, build_arc_period_volumes, build_node_attributes, build_road_csr
+    )
+
+    # Fingerprint first so sources edited during the build read as stale later
+    fingerprints = source_fingerprints()
+    csr = build_road_csr(load_data("roads"))
+    volumes = build_arc_period_volumes(csr, load_data("traffic"))
+    x, y, tags, tag_names = build_node_attributes(csr, load_data("locations"))
+
+    arrays = {
+        "node_ids": np.array([label.encode("utf-8") for label in csr.node_ids], dtype=bytes),
+        "indptr": csr.indptr,
+        "indices": csr.indices,
+        "weights": csr.weights,
+        "edge_of_arc": csr.edge_of_arc,
+        "edge_u": csr.edge_u,
+        "edge_v": csr.edge_v,
+        "edge_weights": csr.edge_weights,
+        "edge_traffic": csr.edge_traffic,
+        "edge_condition": csr.edge_condition,
+        "x": x,
+        "y": y,
+        "tags": tags,
+        "volumes": volumes,
+    }
+    header = {
+        "source_hash": combined_source_hash(fingerprints),
+        "sources": fingerprints,
+        "periods": list(TRAFFIC_PERIODS),
+        "tag_names": tag_names,
+        "arrays": {},
+    }
+
+    # Offsets depend on the header length, so lay out against a padded estimate
+    # and grow it until the encoded header fits
+    layout = {name: {"dtype": a.dtype.str, "shape": list(a.shape)} for name, a in arrays.items()}
+    header["arrays"] = layout
+    header_size = _aligned(16 + len(json.dumps(header).encode()) + 32 * len(arrays) + _ALIGN)
+    while True:
+        offset = header_size
+        for name, a in arrays.items():
+            layout[name]["offset"] = offset
+            offset = _aligned(offset + a.nbytes)
+        encoded = json.dumps(header).encode()
+        if 16 + len(encoded) <= header_size:
+            break
+        header_size = _aligned(16 + len(encoded) + _ALIGN)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<II", SNAPSHOT_VERSION, len(encoded)) + encoded)
+        for name, a in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(np.ascontiguousarray(a).tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+    return path
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+def load_snapshot(path: str = DEFAULT_SNAPSHOT, check: bool = True):
+    """
+    Memory-map a snapshot. Returns None when the file is missing, was written by
+    another format version, or (with check=True) no longer matches its sources.
+    """
+    try:
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError):
+        return None
+    if bytes(mm[:8]) != MAGIC:
+        return None
+    version, header_len = struct.unpack("<II", bytes(mm[8:16]))
+    if version != SNAPSHOT_VERSION:
+        return None
+    header = json.loads(bytes(mm[16:16 + header_len]).decode())
+    if check and _is_stale(header):
+        return None
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        arrays[name] = np.ndarray(
+            tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]), buffer=mm, offset=spec["offset"]
+        )
+    return Snapshot(path, header, arrays)
+
+def open_snapshot(path: str = DEFAULT_SNAPSHOT) -> Snapshot:
+    """
+    Load the snapshot, rebuilding it first if it is missing or stale.
+    """
+    snapshot = load_snapshot(path)
+    if snapshot is None:
+        build_snapshot(path)
+        snapshot = load_snapshot(path, check=False)
+    return snapshot
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    built = build_snapshot()
+    print(f"Built {built} in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,44 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import numpy as np
+from shared.data_loader import load_data
+from shortest_path.batch import iter_demand_routes, iter_route_batches
+from shortest_path.benchmark import grid_graph
+from shortest_path.dijkstra_traffic import dijkstra_with_traffic
+from shortest_path.road_network import get_road_graph, get_traffic_data
+
+def collect(batches):
+    distances, paths = {}, {}
+    for batch in batches:
+        for k, row in enumerate(batch["rows"].tolist()):
+            distances[row] = float(batch["distances"][k])
+            paths[row] = batch["paths"][k] if batch["paths"] is not None else None
+    return distances, paths
+
+def test_demand_routes_match_dijkstra_with_traffic():
+    demand = load_data("demand")
+    distances, paths = collect(iter_demand_routes("morning", with_paths=True))
+    assert sorted(distances) == list(range(len(demand)))
+    graph, traffic = get_road_graph(), get_traffic_data()
+    for row, (start, end) in enumerate(zip(demand["fromid"].astype(str), demand["toid"].astype(str))):
+        path, cost = dijkstra_with_traffic(graph, traffic, start, end, "morning")
+        assert math.isclose(distances[row], cost) or distances[row] == cost
+        assert paths[row] == path
+
+def test_pool_matches_serial_and_groups_by_origin():
+    graph = grid_graph(6)
+    origins = ["0", "0", "7", "unknown", "7", "35"]
+    destinations = ["35", "1", "0", "3", "7", "0"]
+    serial = list(iter_route_batches(graph, origins, destinations))
+    assert [b["origin"] for b in serial] == ["0", "7", "35", None]
+    assert [b["pairs"] for b in serial] == [2, 2, 1, 1]
+
+    pooled, _ = collect(iter_route_batches(graph, origins, destinations, workers=2))
+    assert pooled == collect(serial)[0]
+    assert pooled[3] == math.inf and pooled[4] == 0.0
+    assert np.isclose(pooled[0], pooled[5])
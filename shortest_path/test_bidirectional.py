@@ -0,0 +1,79 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from graph.graph_builder import CSRGraph
+from shortest_path.dijkstra import dijkstra
+from shortest_path.dijkstra_traffic import dijkstra_with_traffic
+from shortest_path.bidirectional import (
+    bidirectional_dijkstra,
+    bidirectional_dijkstra_with_traffic,
+    bidirectional_shortest_path,
+)
+
+EDGES = [("A", "B", 4.0), ("A", "C", 1.0), ("C", "B", 2.0), ("B", "D", 5.0), ("C", "D", 9.0), ("E", "F", 1.0)]
+TRAFFIC = {"A-C": {"morning": 9000}, "B-C": {"morning": 8000}}
+
+def make_graph():
+    graph = {}
+    for u, v, w in EDGES:
+        graph.setdefault(u, []).append((v, w))
+        graph.setdefault(v, []).append((u, w))
+    return graph
+
+def make_csr():
+    u, v, w = zip(*EDGES)
+    return CSRGraph.from_edges(u + v, v + u, w + w)
+
+def assert_valid_path(graph, path, cost, start, end):
+    """
+    The path runs from start to end over existing edges and its weights sum to cost.
+    """
+    assert path[0] == start and path[-1] == end
+    total = 0.0
+    for a, b in zip(path, path[1:]):
+        weights = [w for n, w in graph.get(a, []) if n == b]
+        assert weights, f"{a}-{b} is not an edge"
+        total += min(weights)
+    assert math.isclose(total, cost, abs_tol=1e-12)
+
+def test_matches_dijkstra_on_every_pair():
+    graph, csr = make_graph(), make_csr()
+    for start in graph:
+        for end in graph:
+            expected_path, expected_cost = dijkstra(graph, start, end)
+            for path, cost in (bidirectional_dijkstra(graph, start, end),
+                               bidirectional_shortest_path(csr, start, end)):
+                assert math.isclose(cost, expected_cost) or cost == expected_cost
+                if expected_path:
+                    assert_valid_path(graph, path, cost, start, end)
+                    assert len(path) == len(expected_path)
+                else:
+                    assert path == []
+
+def test_same_node_and_disconnected_pairs():
+    graph, csr = make_graph(), make_csr()
+    for search in (bidirectional_dijkstra, bidirectional_shortest_path):
+        network = graph if search is bidirectional_dijkstra else csr
+        assert search(network, "A", "A") == (["A"], 0)
+        assert search(network, "A", "E") == ([], math.inf)
+        assert search(network, "F", "D") == ([], math.inf)
+        assert search(network, "A", "Z") == ([], math.inf)
+
+def test_traffic_cost_matches_dijkstra_with_traffic():
+    graph = make_graph()
+    path, cost = bidirectional_dijkstra_with_traffic(graph, TRAFFIC, "A", "D", "morning")
+    expected_path, expected_cost = dijkstra_with_traffic(graph, TRAFFIC, "A", "D", "morning")
+    assert path == expected_path == ["A", "B", "D"]
+    assert math.isclose(cost, expected_cost)
+    # A-B carries no traffic record; B-D neither, so the cost is the plain length
+    assert_valid_path(graph, path, cost, "A", "D")
+
+def test_directed_search_uses_reverse_adjacency():
+    graph = {"A": [("B", 1.0)], "B": [("C", 1.0)]}
+    reverse = {"B": [("A", 1.0)], "C": [("B", 1.0)]}
+    assert bidirectional_dijkstra(graph, "A", "C", reverse_graph=reverse) == (["A", "B", "C"], 2.0)
+    assert bidirectional_dijkstra(reverse, "A", "C", reverse_graph=graph) == ([], math.inf)
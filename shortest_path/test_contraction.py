@@ -0,0 +1,50 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import random
+from graph.graph_builder import CSRGraph
+from shortest_path.benchmark import grid_graph
+from shortest_path.contraction import build_hierarchy, ch_dijkstra, load_hierarchy, save_hierarchy
+from shortest_path.path_tree import shortest_path
+
+def path_cost(graph, path):
+    weights = {}
+    for w, a, b, _ in graph.get_edges():
+        for key in ((a, b), (b, a)) if not graph.directed else ((a, b),):
+            weights[key] = min(w, weights.get(key, math.inf))
+    return sum(weights[a, b] for a, b in zip(path, path[1:]))
+
+def test_matches_dijkstra_on_grid():
+    graph = grid_graph(12)
+    hierarchy = build_hierarchy(graph)
+    assert hierarchy.num_shortcuts > 0
+    rng = random.Random(0)
+    for _ in range(200):
+        start, end = rng.choice(graph.node_ids), rng.choice(graph.node_ids)
+        path, cost = ch_dijkstra(hierarchy, start, end)
+        assert math.isclose(cost, shortest_path(graph, start, end)[1])
+        assert path[0] == start and path[-1] == end
+        assert math.isclose(path_cost(graph, path), cost)
+
+def test_directed_graph_and_unreachable_pairs():
+    graph = CSRGraph.from_edges(["A", "B", "C", "A"], ["B", "C", "A", "C"], [1.0, 1.0, 1.0, 5.0], directed=True)
+    graph = CSRGraph(graph.node_ids + ["D"], graph.edge_u, graph.edge_v, graph.edge_weights, directed=True)
+    hierarchy = build_hierarchy(graph)
+    assert ch_dijkstra(hierarchy, "A", "C") == (["A", "B", "C"], 2.0)
+    assert ch_dijkstra(hierarchy, "C", "B") == (["C", "A", "B"], 2.0)
+    assert ch_dijkstra(hierarchy, "A", "D") == ([], math.inf)
+    assert ch_dijkstra(hierarchy, "A", "Z") == ([], math.inf)
+
+def test_saved_hierarchy_round_trips(tmp_path):
+    graph = grid_graph(6)
+    hierarchy = build_hierarchy(graph)
+    path = save_hierarchy(hierarchy, tmp_path / "grid.ch.npz")
+    loaded = load_hierarchy(path, check=False)
+    assert loaded.node_ids == hierarchy.node_ids
+    assert ch_dijkstra(loaded, "0", "35") == ch_dijkstra(hierarchy, "0", "35")
+    # built outside the road data, so there are no sources to vouch for it
+    assert load_hierarchy(path) is None
@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import numpy as np
+from shortest_path.benchmark import grid_graph
+from shortest_path.distance_matrix import compute_matrix, get_distance_matrix, load_distance_matrix
+from shortest_path.dijkstra_traffic import dijkstra_with_traffic
+from shortest_path.path_tree import shortest_path_tree
+from shortest_path.road_network import get_road_graph, get_traffic_data
+
+def test_parallel_build_matches_serial_searches():
+    graph = grid_graph(8)
+    serial_dist, serial_pred = compute_matrix(graph)
+    dist, pred = compute_matrix(graph, workers=2)
+    assert np.array_equal(dist, serial_dist) and np.array_equal(pred, serial_pred)
+    tree = shortest_path_tree(graph, 5)
+    assert np.allclose(dist[5], tree.dist)
+
+def test_saved_matrix_matches_traffic_routing(tmp_path):
+    matrix = get_distance_matrix("morning", root=tmp_path)
+    assert isinstance(matrix.dist, np.memmap) and matrix.dist.dtype == np.float32
+
+    graph, traffic = get_road_graph(), get_traffic_data()
+    for start, end in [("1", "15"), ("3", "F10"), ("7", "7")]:
+        path, cost = dijkstra_with_traffic(graph, traffic, start, end, "morning")
+        cached_path, cached_cost = matrix.path(start, end)
+        assert math.isclose(cached_cost, cost, rel_tol=1e-6)
+        assert cached_path[0] == start and cached_path[-1] == end
+    assert matrix.path("1", "unknown") == ([], math.inf)
+
+def test_unchanged_data_reuses_saved_matrix(tmp_path):
+    first = get_distance_matrix(None, root=tmp_path)
+    stamp = os.stat(first.dist.filename).st_mtime_ns
+    again = load_distance_matrix(None, root=tmp_path)
+    assert again is not None
+    assert os.stat(get_distance_matrix(None, root=tmp_path).dist.filename).st_mtime_ns == stamp
+    assert load_distance_matrix("night", root=tmp_path) is None
@@ -0,0 +1,86 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import numpy as np
+from graph.graph_builder import CSRGraph, Graph
+from shortest_path.benchmark import grid_graph
+from shortest_path.dynamic import changed_edges, edge_weights_from_graph, repair_tree
+from shortest_path.path_tree import shortest_path, shortest_path_tree
+from shortest_path.route_cache import RouteCache
+from simulation.traffic_simulation import apply_traffic_penalty, simulate_traffic
+
+def test_repair_matches_full_recompute():
+    graph = grid_graph(10)
+    rng = np.random.default_rng(0)
+    weights = graph.edge_weights.copy()
+    tree = shortest_path_tree(graph, 0)
+    for _ in range(50):
+        edges = rng.choice(graph.num_edges, 4, replace=False)
+        before = tree.dist.copy()
+        weights[edges] *= rng.uniform(0.3, 3.0, len(edges))
+        changed = repair_tree(tree, graph.arc_weights(weights), edges)
+        expected = shortest_path_tree(graph, 0, graph.arc_weights(weights))
+        assert np.allclose(tree.dist, expected.dist)
+        moved = np.flatnonzero(~np.isclose(before, expected.dist))
+        assert set(moved.tolist()) <= set(changed.tolist())
+
+def test_simulated_traffic_changes_feed_the_repair():
+    random.seed(0)
+    graph = Graph()
+    for u, v, w in [("A", "B", 5), ("B", "C", 3), ("A", "C", 7), ("C", "D", 2)]:
+        graph.add_edge(u, v, w)
+    csr = CSRGraph.from_graph(graph)
+    tree = shortest_path_tree(csr, csr.index["A"])
+
+    simulate_traffic(graph)
+    apply_traffic_penalty(graph)
+    weights = edge_weights_from_graph(csr, graph)
+    repair_tree(tree, csr.arc_weights(weights), changed_edges(csr.edge_weights, weights))
+    expected = CSRGraph(csr.node_ids, csr.edge_u, csr.edge_v, weights)
+    assert np.allclose(tree.dist, shortest_path_tree(expected, csr.index["A"]).dist)
+
+def test_route_cache_reports_changed_routes():
+    graph = grid_graph(6)
+    cache = RouteCache(version=lambda: "v1", check_interval=0)
+    cache.put_tree(shortest_path_tree(graph, 0), "morning")
+    path, cost = cache.get("0", "35", "morning")
+    cache.put("0", "35", "morning", path, cost)
+    cache.put("35", "0", "morning", path[::-1], cost)
+    cache.put("0", "35", "night", path, cost)
+
+    weights = graph.edge_weights.copy()
+    on_route = [e for e in range(graph.num_edges)
+                if {graph.node_ids[graph.edge_u[e]], graph.node_ids[graph.edge_v[e]]} <= set(path)]
+    weights[on_route[0]] += 100
+    report = cache.apply_edge_changes("morning", graph.arc_weights(weights), [on_route[0]])
+
+    updated = CSRGraph(graph.node_ids, graph.edge_u, graph.edge_v, weights)
+    assert "35" in report["trees"]["0"]
+    assert report["changed"] == [("0", "35")]
+    assert report["dropped"] == [("35", "0")]
+    assert cache.get("0", "35", "morning") == shortest_path(updated, "0", "35")
+    assert cache.get("0", "35", "night") == (path, cost)
+
+def test_route_cache_repairs_stay_within_budget_and_version():
+    graph = grid_graph(6)
+    version = ["v1"]
+    cache = RouteCache(max_bytes=1000, version=lambda: version[0], check_interval=0, on_change=lambda: None)
+    tree = shortest_path_tree(graph, 0)
+    cache.put_tree(tree, "morning")
+    # A stale short route, replaced by the tree's longer branch on repair
+    cache.put("0", "35", "morning", ["0", "35"], 1.0)
+    report = cache.apply_edge_changes("morning", graph.arc_weights(graph.edge_weights), [])
+    assert report["changed"] == [("0", "35")]
+    assert cache.stats()["bytes"] <= 1000 and cache.stats()["evictions"] == 1
+
+    cache.put_tree(tree, "morning")
+    before = tree.dist.copy()
+    version[0] = "v2"
+    weights = graph.edge_weights + 1.0
+    report = cache.apply_edge_changes("morning", graph.arc_weights(weights), list(range(graph.num_edges)))
+    assert report == {"trees": {}, "changed": [], "dropped": []}
+    assert np.array_equal(tree.dist, before)
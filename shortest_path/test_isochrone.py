@@ -0,0 +1,39 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from shortest_path.benchmark import grid_graph
+from shortest_path.isochrone import isochrones
+from shortest_path.path_tree import shortest_path_tree
+from shortest_path.road_network import get_isochrones
+
+def test_buckets_match_full_searches():
+    graph = grid_graph(8)
+    sources = ["0", "27", "63"]
+    iso = isochrones(graph, sources, [10.0, 3.0, 6.0])
+    assert iso.thresholds == (3.0, 6.0, 10.0)
+    for s, source in enumerate(sources):
+        dist = shortest_path_tree(graph, graph.index[source]).dist
+        for threshold in iso.thresholds:
+            assert np.array_equal(iso.mask(threshold)[s], dist <= threshold)
+    packed = iso.bitsets(6.0)
+    assert packed.shape == (3, 8)
+    assert np.array_equal(np.unpackbits(packed, axis=1)[:, :graph.num_nodes], iso.mask(6.0))
+
+def test_pool_matches_serial_and_rejects_unknown_sources():
+    graph = grid_graph(6)
+    serial = isochrones(graph, graph.node_ids, [2.0, 5.0])
+    pooled = isochrones(graph, graph.node_ids, [2.0, 5.0], workers=2)
+    assert np.array_equal(serial.bucket, pooled.bucket)
+    with pytest.raises(ValueError):
+        isochrones(graph, ["nowhere"], [1.0])
+
+def test_road_isochrones_are_computed_once():
+    iso = get_isochrones([5, 10])
+    assert get_isochrones([10, 5]) is iso
+    assert "F9" in iso.reachable("F9", 5)
+    assert iso.coverage(10)[iso.graph.index["F9"]] >= 1
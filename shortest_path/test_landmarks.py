@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import random
+import numpy as np
+from graph.graph_builder import CSRGraph
+from shortest_path.astar_emergency import astar
+from shortest_path.benchmark import grid_graph
+from shortest_path.dijkstra_traffic import dijkstra_with_traffic
+from shortest_path.landmarks import build_landmarks
+from shortest_path.path_tree import shortest_path_tree
+
+def label_graph(graph):
+    adjacency = {}
+    for w, a, b, _ in graph.get_edges():
+        adjacency.setdefault(a, []).append((b, w))
+        adjacency.setdefault(b, []).append((a, w))
+    return adjacency
+
+def test_bounds_never_exceed_true_distance():
+    graph = grid_graph(10)
+    landmarks = build_landmarks(graph, count=4)
+    assert len(set(landmarks.nodes.tolist())) == 4
+    for goal in [0, 37, 99]:
+        exact = shortest_path_tree(graph, goal).dist
+        bounds = landmarks.lower_bounds(goal)
+        assert (bounds <= exact + 1e-9).all()
+        assert bounds[goal] == 0
+
+def test_alt_astar_is_exact_with_traffic():
+    graph = grid_graph(10)
+    adjacency = label_graph(graph)
+    landmarks = build_landmarks(graph, count=4)
+    rng = random.Random(0)
+    traffic = {f"{a}-{b}": {"morning": rng.randrange(0, 5000)} for a in adjacency for b, _ in adjacency[a]}
+    for _ in range(50):
+        start, goal = rng.choice(graph.node_ids), rng.choice(graph.node_ids)
+        _, expected = dijkstra_with_traffic(adjacency, traffic, start, goal, "morning")
+        path, cost = astar(adjacency, None, start, goal, landmarks=landmarks, traffic_data=traffic, period="morning")
+        assert math.isclose(cost, expected)
+        assert path[0] == start and path[-1] == goal
+
+def test_directed_bounds_detect_unreachable_goal():
+    graph = CSRGraph.from_edges(["A", "B", "C"], ["B", "C", "D"], [1.0, 2.0, 3.0], directed=True)
+    landmarks = build_landmarks(graph, count=2)
+    bounds = landmarks.lower_bounds(graph.index["B"])
+    assert bounds[graph.index["A"]] <= 1.0
+    assert np.isinf(bounds[graph.index["D"]])
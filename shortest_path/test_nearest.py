@@ -0,0 +1,39 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from graph.graph_builder import CSRGraph
+from shortest_path.dijkstra import dijkstra
+from shortest_path.nearest import nearest_target, nearest_target_table
+
+EDGES = [("A", "B", 4.0), ("A", "C", 1.0), ("C", "B", 2.0), ("B", "D", 5.0), ("D", "H2", 1.0),
+         ("C", "H1", 6.0), ("E", "F", 1.0)]
+HOSPITALS = ["H1", "H2"]
+
+def make_graphs():
+    csr = CSRGraph.from_edges(*zip(*EDGES))
+    graph = {}
+    for u, v, w in EDGES:
+        graph.setdefault(u, []).append((v, w))
+        graph.setdefault(v, []).append((u, w))
+    return csr, graph
+
+def test_single_search_matches_per_hospital_minimum():
+    _, graph = make_graphs()
+    for start in ["A", "B", "C", "D"]:
+        expected = min((dijkstra(graph, start, h)[1], h) for h in HOSPITALS)
+        hospital, path, cost = nearest_target(graph, start, HOSPITALS)
+        assert (cost, hospital) == expected
+        assert path == dijkstra(graph, start, hospital)[0]
+    assert nearest_target(graph, "E", HOSPITALS) == (None, [], math.inf)
+
+def test_table_gives_nearest_hospital_for_every_node():
+    csr, graph = make_graphs()
+    table = nearest_target_table(csr, [csr.index[h] for h in HOSPITALS])
+    for start in ["A", "B", "C", "D", "H1"]:
+        assert table.lookup(start) == nearest_target(graph, start, HOSPITALS)
+    assert table.lookup("F") == (None, [], math.inf)
+    assert table.lookup("unknown") == (None, [], math.inf)
@@ -0,0 +1,78 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import numpy as np
+import pytest
+from graph.graph_builder import CSRGraph
+from shortest_path.benchmark import grid_graph
+from shortest_path.overlay import Overlay, build_overlay, overlay_dijkstra, partition
+from shortest_path.path_tree import shortest_path
+
+def _path_cost(graph, path):
+    weights = graph.weights
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        a, b = graph.index[u], graph.index[v]
+        arcs = np.arange(graph.indptr[a], graph.indptr[a + 1])
+        total += weights[arcs[graph.indices[arcs] == b]].min()
+    return total
+
+def test_partition_is_balanced():
+    graph = grid_graph(20)
+    cell = partition(graph, 50)
+    sizes = np.bincount(cell)
+    assert sizes.max() <= 50
+    assert sizes.min() * 2 >= sizes.max()
+    with pytest.raises(ValueError):
+        partition(graph, 0)
+
+def test_overlay_matches_flat_search():
+    graph = grid_graph(15)
+    overlay = build_overlay(graph, 30)
+    assert overlay.num_cells > 4
+    rng = random.Random(0)
+    for _ in range(60):
+        s, t = str(rng.randrange(225)), str(rng.randrange(225))
+        path, cost = overlay_dijkstra(overlay, s, t)
+        expected = shortest_path(graph, s, t)[1]
+        assert cost == pytest.approx(expected)
+        assert path[0] == s and path[-1] == t
+        assert _path_cost(graph, path) == pytest.approx(cost)
+    assert overlay_dijkstra(overlay, "0", "missing") == ([], float("inf"))
+
+def test_directed_and_disconnected():
+    rng = np.random.default_rng(1)
+    u, v = rng.integers(0, 60, 150), rng.integers(0, 60, 150)
+    graph = CSRGraph([str(i) for i in range(60)], u, v, rng.uniform(1, 9, 150), directed=True)
+    overlay = Overlay(graph, partition(graph, 12))
+    for s in range(0, 60, 7):
+        for t in range(0, 60, 5):
+            cost = overlay.query(s, t)[0]
+            assert cost == pytest.approx(shortest_path(graph, str(s), str(t))[1])
+
+def test_update_recustomizes_only_touched_cells():
+    graph = grid_graph(15)
+    overlay = build_overlay(graph, 30)
+    weights = graph.edge_weights.copy()
+    inside = np.flatnonzero(overlay.cell[graph.edge_u] == overlay.cell[graph.edge_v])
+    cut = np.flatnonzero(overlay.cell[graph.edge_u] != overlay.cell[graph.edge_v])
+    edges = [inside[0], inside[-1], cut[0]]
+    weights[edges] *= 3
+    arc_weights = graph.arc_weights(weights)
+
+    cells = overlay.update(arc_weights)
+    assert cells == sorted({int(overlay.cell[graph.edge_u[e]]) for e in edges[:2]})
+    assert overlay.update(arc_weights) == []
+    assert overlay.update(graph.weights, edges) == cells
+
+    overlay.update(arc_weights, edges)
+    fresh = Overlay(graph, overlay.cell, arc_weights)
+    for a, b in zip(overlay.cliques, fresh.cliques):
+        assert np.array_equal(a, b)
+    for s, t in [(0, 224), (14, 210), (100, 7)]:
+        cost, path = overlay.query(s, t)
+        assert cost == pytest.approx(shortest_path(graph, str(s), str(t), arc_weights)[1])
@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from graph.graph_builder import CSRGraph
+from shortest_path.dijkstra import dijkstra
+from shortest_path.path_tree import shortest_path_tree, shortest_path
+
+EDGES = [("A", "B", 4.0), ("A", "C", 1.0), ("C", "B", 2.0), ("B", "D", 5.0), ("E", "F", 1.0)]
+
+def make_graphs():
+    csr = CSRGraph.from_edges(*zip(*EDGES))
+    graph = {}
+    for u, v, w in EDGES:
+        graph.setdefault(u, []).append((v, w))
+        graph.setdefault(v, []).append((u, w))
+    return csr, graph
+
+def test_tree_answers_every_destination():
+    csr, graph = make_graphs()
+    tree = shortest_path_tree(csr, csr.index["A"])
+    for node in ["A", "B", "C", "D"]:
+        path, cost = dijkstra(graph, "A", node)
+        assert tree.path_labels(node) == path
+        assert tree.distance(csr.index[node]) == cost
+    assert not tree.reached(csr.index["E"])
+    assert tree.path(csr.index["E"]) == []
+
+def test_point_to_point_contract():
+    csr, _ = make_graphs()
+    assert shortest_path(csr, "A", "D") == (["A", "C", "B", "D"], 8.0)
+    assert shortest_path(csr, "A", "F") == ([], math.inf)
+
+def test_cutoff_leaves_far_nodes_unreached():
+    csr, _ = make_graphs()
+    tree = shortest_path_tree(csr, csr.index["A"], cutoff=3.0)
+    assert tree.reached(csr.index["B"])
+    assert not tree.reached(csr.index["D"])
@@ -0,0 +1,95 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import numpy as np
+import pytest
+from shortest_path.benchmark import grid_graph
+from shortest_path.path_tree import shortest_path, shortest_path_tree
+from graph.graph_builder import CSRGraph
+from shortest_path.queues import MAX_DIAL_BUCKETS, DialQueue, RadixHeap, dial_bounds, dial_queue, quantize
+
+@pytest.mark.parametrize("queue", [lambda: DialQueue(50), RadixHeap])
+def test_queues_pop_in_key_order(queue):
+    rng = random.Random(0)
+    q = queue()
+    q.push(0, "start")
+    popped = []
+    while q:
+        key, item = q.pop()
+        popped.append(key)
+        if len(popped) < 500:
+            for _ in range(2):
+                q.push(key + rng.randint(0, 50), item)
+    assert popped == sorted(popped)
+    assert len(popped) == 1 + 2 * 499
+
+def test_wide_dial_buckets_pop_in_bucket_order():
+    rng = random.Random(1)
+    q = DialQueue(50, width=10)
+    assert q.size == 7
+    q.push(0, "start")
+    popped = []
+    while q:
+        key, _ = q.pop()
+        popped.append(key // 10)
+        if len(popped) < 500:
+            for _ in range(2):
+                q.push(key + rng.randint(10, 50), None)
+    assert popped == sorted(popped)
+
+def test_dial_ring_follows_weight_ratio():
+    # metre precision on 0.5-5 km roads: 12 buckets, not 5002
+    assert dial_bounds(quantize([0.5, 2.0, 5.0])) == (5000, 500)
+    assert dial_queue(*dial_bounds(quantize([0.5, 2.0, 5.0]))).size == 12
+    # a zero-weight arc forces one bucket per unit, which is refused when too long
+    assert dial_queue(*dial_bounds([0, 5])).size == 7
+    with pytest.raises(ValueError):
+        dial_queue(*dial_bounds(quantize([0.0, 5.0])))
+    assert dial_bounds([]) == (0, 1)
+    graph = CSRGraph.from_edges(["a", "b"], ["b", "c"], [0.0, MAX_DIAL_BUCKETS * 0.002])
+    with pytest.raises(ValueError):
+        shortest_path(graph, "a", "c", backend="dial")
+    assert shortest_path(graph, "a", "c", backend="dial", precision=1.0)[0] == ["a", "b", "c"]
+
+def test_quantize():
+    assert quantize([0.0, 1.2345, 2.5]).tolist() == [0, 1234, 2500]
+    assert quantize([1.26], precision=0.1).tolist() == [13]
+    with pytest.raises(ValueError):
+        quantize([-1.0])
+    with pytest.raises(ValueError):
+        quantize([1.0], precision=0)
+
+@pytest.mark.parametrize("backend", ["dial", "radix"])
+def test_backends_match_the_heap(backend):
+    graph = grid_graph(12)
+    for source in (0, 77, 143):
+        expected = shortest_path_tree(graph, source)
+        tree = shortest_path_tree(graph, source, backend=backend)
+        assert np.allclose(tree.dist, expected.dist)
+        assert np.array_equal(tree.pred == -1, expected.pred == -1)
+
+@pytest.mark.parametrize("backend", ["dial", "radix"])
+def test_target_and_cutoff(backend):
+    graph = grid_graph(8)
+    path, cost = shortest_path(graph, "0", "63", backend=backend)
+    assert (path, cost) == pytest.approx(shortest_path(graph, "0", "63"))
+    tree = shortest_path_tree(graph, 0, cutoff=5.0, backend=backend)
+    expected = shortest_path_tree(graph, 0, cutoff=5.0)
+    assert np.array_equal(np.isfinite(tree.dist), np.isfinite(expected.dist))
+    assert shortest_path(graph, "0", "missing", backend=backend) == ([], float("inf"))
+
+def test_error_bound_holds_for_coarse_precision():
+    graph = grid_graph(10, seed=3)
+    precision = 0.5
+    exact = shortest_path_tree(graph, 0)
+    tree = shortest_path_tree(graph, 0, backend="radix", precision=precision)
+    hops = np.array([len(tree.path(v)) - 1 for v in range(graph.num_nodes)])
+    assert (np.abs(tree.dist - exact.dist) <= hops * precision / 2 + 1e-9).all()
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        shortest_path_tree(grid_graph(3), 0, backend="fibonacci")
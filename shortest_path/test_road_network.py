@@ -0,0 +1,39 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from shortest_path import road_network
+
+def test_graph_built_on_first_use():
+    road_network.reset()
+    import shortest_path.dijkstra as dijkstra_module
+    assert "graph" not in road_network._cache
+
+    graph = dijkstra_module.graph
+    assert "graph" in road_network._cache
+    assert dijkstra_module.graph is graph
+    # Lengths are stored as float32, so costs carry its rounding
+    path, cost = dijkstra_module.dijkstra(graph, "1", "5")
+    assert path == ["1", "3", "5"] and cost == pytest.approx(14.6)
+
+def test_modules_share_one_graph():
+    import shortest_path.dijkstra_traffic as traffic_module
+    import shortest_path.astar_emergency as astar_module
+    road_network.warm()
+    assert traffic_module.graph is astar_module.graph is road_network.get_road_graph()
+
+def test_each_period_keeps_its_own_overlay():
+    from shortest_path.overlay import overlay_dijkstra
+    from shortest_path.time_dependent import route
+
+    plain, morning = road_network.get_overlay(), road_network.get_overlay("morning")
+    assert plain is not morning and road_network.get_overlay("morning") is morning
+    assert plain.cell is morning.cell
+    path, cost = overlay_dijkstra(morning, "1", "5")
+    expected_path, expected_cost = route(road_network.get_period_weights(), "1", "5", "morning")
+    assert path == expected_path and abs(cost - expected_cost) < 1e-9
+    path, cost = overlay_dijkstra(plain, "1", "5")
+    assert path == ["1", "3", "5"] and cost == pytest.approx(14.6)
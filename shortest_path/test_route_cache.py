@@ -0,0 +1,88 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import pandas as pd
+from shared import data_loader
+from shortest_path import road_network
+from shortest_path.benchmark import grid_graph
+from shortest_path.bidirectional import bidirectional_dijkstra
+from shortest_path.path_tree import shortest_path, shortest_path_tree
+from shortest_path.route_cache import RouteCache
+
+def make_cache(max_bytes=10_000, on_change=None):
+    version = ["v1"]
+    cache = RouteCache(max_bytes=max_bytes, version=lambda: version[0], check_interval=0, on_change=on_change)
+    return cache, version
+
+def test_lru_eviction_and_hit_rate():
+    cache, _ = make_cache(max_bytes=1000)
+    cache.put("1", "2", None, ["1", "2"], 3.0)
+    cache.put("1", "3", None, ["1", "2", "3"], 5.0)
+    assert cache.get("1", "2") == (["1", "2"], 3.0)
+    for k in range(4, 7):
+        cache.put("1", str(k), None, ["1", str(k)], float(k))
+    # "1"->"2" was used most recently of the first two, so "1"->"3" went first
+    assert cache.get("1", "3") is None
+    assert cache.get("1", "3", "morning") is None
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000 and stats["evictions"] > 0
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+def test_version_change_invalidates():
+    reloads = []
+    cache, version = make_cache(on_change=lambda: reloads.append(1))
+    calls = []
+    compute = lambda: calls.append(1) or (["A", "B"], 1.0)
+    assert cache.route("A", "B", "night", compute) == (["A", "B"], 1.0)
+    assert cache.route("A", "B", "night", compute) == (["A", "B"], 1.0)
+    assert len(calls) == 1
+    assert reloads == []
+    version[0] = "v2"
+    cache.route("A", "B", "night", compute)
+    assert len(calls) == 2 and cache.stats()["invalidations"] == 1
+    # The structures routes are computed on were reset too
+    assert reloads == [1]
+
+def test_oversized_tree_replaces_stored_one():
+    small, large = grid_graph(3), grid_graph(30)
+    cache, _ = make_cache(max_bytes=2000)
+    cache.put_tree(shortest_path_tree(small, small.index["0"]))
+    assert cache.get("0", "8") is not None
+    cache.put_tree(shortest_path_tree(large, large.index["0"]))
+    assert cache.get("0", "8") is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+def test_subpaths_served_from_cached_tree():
+    graph = grid_graph(6)
+    cache, _ = make_cache(max_bytes=10 ** 6)
+    cache.put_tree(shortest_path_tree(graph, graph.index["0"]), "morning")
+    path, cost = cache.get("0", "35", "morning")
+    assert (path, cost) == shortest_path(graph, "0", "35")
+
+    middle = path[len(path) // 2]
+    sub_path, sub_cost = cache.get(middle, "35", "morning")
+    assert sub_path == path[len(path) // 2:]
+    assert math.isclose(sub_cost, shortest_path(graph, middle, "35")[1])
+    assert cache.get("35", "0", "morning") is None
+    assert cache.get("0", "35", "evening") is None
+    assert cache.stats()["tree_hits"] == 2
+
+def test_route_after_version_change_uses_reloaded_graph(monkeypatch):
+    version = ["v1"]
+    roads = {v: pd.DataFrame({"from_id": ["1"], "to_id": ["2"], "distance_km": [d]})
+             for v, d in [("v1", 4.0), ("v2", 1.0)]}
+    monkeypatch.setattr(data_loader, "load_data", lambda name: roads[version[0]])
+    road_network.reset()
+    try:
+        cache = RouteCache(version=lambda: version[0], check_interval=0, on_change=road_network.reload)
+        # As in app.py, the graph is fetched inside the callback
+        compute = lambda: bidirectional_dijkstra(road_network.get_road_graph(), "1", "2")
+        assert cache.route("1", "2", None, compute) == (["1", "2"], 4.0)
+        version[0] = "v2"
+        assert cache.route("1", "2", None, compute) == (["1", "2"], 1.0)
+    finally:
+        road_network.reset()
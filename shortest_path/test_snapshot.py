@@ -0,0 +1,50 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from graph.graph_builder import CSRGraph
+from shared.data_loader import load_data
+from shortest_path.road_network import (
+    PERIOD_COLUMNS, TRAFFIC_PERIODS, build_arc_period_volumes, build_edge_period_volumes, build_road_csr
+)
+from shortest_path.snapshot import build_snapshot, load_snapshot
+
+def test_snapshot_matches_csv_build(tmp_path):
+    path = build_snapshot(tmp_path / "network.snap")
+    snapshot = load_snapshot(path)
+    expected = build_road_csr(load_data("roads"))
+
+    assert snapshot.graph.node_ids == expected.node_ids
+    for name in ["indptr", "indices", "weights", "edge_of_arc", "edge_traffic", "edge_condition"]:
+        assert np.array_equal(getattr(snapshot.graph, name), getattr(expected, name))
+    assert not snapshot.graph.weights.flags.writeable
+    assert snapshot.tag_names[snapshot.tags[expected.index["F9"]]] == "Facility (Medical)"
+    assert snapshot.volumes.shape == (len(expected.indices), len(snapshot.periods))
+
+def test_stale_snapshot_is_rejected(tmp_path):
+    path = build_snapshot(tmp_path / "network.snap")
+    snapshot = load_snapshot(path)
+    assert not snapshot.is_stale()
+
+    roads = snapshot.header["sources"]["roads"]
+    roads.update(mtime_ns=0, sha256="0" * 64)
+    assert snapshot.is_stale()
+
+def test_each_direction_takes_its_own_traffic_record():
+    csr = CSRGraph.from_edges(["7", "15", "1"], ["15", "7", "3"], [1.0, 1.0, 2.0])
+    traffic = pd.DataFrame({"roadid": ["7-15", "15-7", "3-1"]})
+    for k, p in enumerate(TRAFFIC_PERIODS):
+        traffic[PERIOD_COLUMNS[p]] = [100 + k, 200 + k, 300 + k]
+    volumes = build_edge_period_volumes(csr, traffic)
+    assert volumes[:, 0].tolist() == [100, 200, 300]
+
+    volumes = build_arc_period_volumes(csr, traffic)
+    tails = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+    morning = {(csr.node_ids[a], csr.node_ids[b]): float(w)
+               for a, b, w in zip(tails, csr.indices, volumes[:, 0])}
+    assert (morning[("7", "15")], morning[("15", "7")]) == (100, 200)
+    assert morning[("1", "3")] == morning[("3", "1")] == 300
@@ -0,0 +1,76 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from graph.graph_builder import CSRGraph
+from shortest_path import road_network
+from shortest_path.bidirectional import bidirectional_shortest_path
+from shortest_path.dijkstra_traffic import calculate_cost, dijkstra_with_traffic
+from shared.node_index import NodeIndex
+from shortest_path.time_dependent import compile_period_weights, day_sweep, route
+
+def test_compiled_weights_match_calculate_cost():
+    weights = road_network.get_period_weights()
+    csr, traffic = weights.graph, road_network.get_traffic_data()
+    tails = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+    for period in weights.periods:
+        row = weights.row(period)
+        for k, (a, b) in enumerate(zip(tails.tolist(), csr.indices.tolist())):
+            a, b = csr.node_ids[a], csr.node_ids[b]
+            assert row[k] == calculate_cost(a, b, float(csr.weights[k]), traffic, period)
+
+def test_day_sweep_matches_dijkstra_with_traffic():
+    weights = road_network.get_period_weights()
+    graph, traffic = road_network.get_road_graph(), road_network.get_traffic_data()
+    for start, end in [("1", "15"), ("3", "F10"), ("12", "2")]:
+        sweep = day_sweep(weights, start, end)
+        assert list(sweep) == list(road_network.TRAFFIC_PERIODS)
+        for period, (path, cost) in sweep.items():
+            expected_path, expected_cost = dijkstra_with_traffic(graph, traffic, start, end, period)
+            assert math.isclose(cost, expected_cost)
+            assert path[0] == start and path[-1] == end
+
+def test_finer_bins_and_directed_graphs():
+    graph = CSRGraph.from_edges(["A", "B", "A"], ["B", "C", "C"], [1.0, 1.0, 3.0], directed=True)
+    # arcs are grouped by tail: A -> B, A -> C, B -> C
+    volumes = np.array([[0.0, 10000.0, 0.0], [np.nan, np.nan, np.nan], [0.0, 10000.0, 0.0]])
+    weights = compile_period_weights(graph, volumes, ["early", "mid", "late"])
+    assert route(weights, "A", "C", "early") == (["A", "B", "C"], 2.0)
+    assert route(weights, "A", "C", "mid") == (["A", "C"], 3.0)
+    assert route(weights, "A", "C", "late") == (["A", "B", "C"], 2.0)
+    assert bidirectional_shortest_path(graph, "C", "A") == ([], math.inf)
+    with pytest.raises(ValueError):
+        weights.row("night")
+    with pytest.raises(ValueError):
+        compile_period_weights(graph, volumes[:, :2])
+
+def test_each_direction_keeps_its_own_cost():
+    graph = CSRGraph.from_edges(["A", "B", "A"], ["B", "C", "C"], [1.0, 1.0, 2.5])
+    tails = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+    # heavy traffic only on the arcs leaving A
+    volumes = np.where(tails == graph.index["A"], 10000.0, 0.0)[:, None]
+    weights = compile_period_weights(graph, volumes, ["peak"])
+    assert route(weights, "A", "C", "peak") == (["A", "B", "C"], 3.0)
+    assert route(weights, "C", "A", "peak") == (["C", "B", "A"], 2.0)
+
+def test_reverse_traffic_record_matches_dijkstra_with_traffic():
+    roads = pd.DataFrame({"from_id": ["1", "2", "1"], "to_id": ["2", "3", "3"], "distance_km": [1.5, 1.5, 2.5],
+                          "traffic_level": [0, 0, 0], "condition": [5, 5, 5]})
+    traffic = pd.DataFrame({"roadid": ["1-3", "3-1"]})
+    for k, p in enumerate(road_network.TRAFFIC_PERIODS):
+        traffic[road_network.PERIOD_COLUMNS[p]] = [10000 * (k % 2), 10000 * (1 - k % 2)]
+    csr = road_network.build_road_csr(roads, NodeIndex())
+    weights = compile_period_weights(csr, road_network.build_arc_period_volumes(csr, traffic))
+    graph, records = road_network.build_road_graph(roads), road_network.build_traffic_data(traffic)
+    for period in weights.periods:
+        for start, end in [("1", "3"), ("3", "1")]:
+            path, cost = route(weights, start, end, period)
+            expected_path, expected_cost = dijkstra_with_traffic(graph, records, start, end, period)
+            assert path == expected_path
+            assert math.isclose(cost, expected_cost)
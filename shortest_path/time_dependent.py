@@ -0,0 +1,88 @@
+# time_dependent.py
+#
+# Time-dependent routing with precompiled weights. Every traffic period's arc
+# costs are computed once, in the graph's arc order, into one row of a
+# (periods x arcs) array; a query only selects the row for its period. The
+# graph itself never changes, so a whole-day sweep reuses it with each row.
+# Costs are per arc because the two directions of a road carry their own
+# traffic records.
+
+import numpy as np
+
+from shortest_path.bidirectional import bidirectional_shortest_path
+from shortest_path.road_network import TRAFFIC_PERIODS
+
+class PeriodWeights:
+    """
+    arc_weights[k] holds the cost of every arc of `graph` in periods[k]. The
+    plain lists used by the search loops, in the arc order of the graph and of
+    its transpose, are built per period on first use and kept.
+    """
+
+    def __init__(self, graph, periods, arc_weights):
+        arc_weights = np.asarray(arc_weights, dtype=np.float64)
+        num_arcs = len(graph.indices)
+        if arc_weights.shape != (len(periods), num_arcs):
+            raise ValueError(
+                f"expected weights of shape {(len(periods), num_arcs)}, got {arc_weights.shape}"
+            )
+        self.graph = graph
+        self.periods = tuple(periods)
+        self.arc_weights = arc_weights
+        self._arcs = {}
+        self._reverse = {}
+
+    def __contains__(self, period):
+        return period in self.periods
+
+    def row(self, period) -> np.ndarray:
+        """
+        The period's costs in arc order, as an array.
+        """
+        if period not in self.periods:
+            raise ValueError(f"unknown period {period!r}; expected one of {self.periods}")
+        return self.arc_weights[self.periods.index(period)]
+
+    def arc(self, period) -> list:
+        """
+        The period's costs in arc order, as a list ready for the search loops.
+        """
+        if period not in self._arcs:
+            self._arcs[period] = self.row(period).tolist()
+        return self._arcs[period]
+
+    def reverse(self, period) -> list:
+        """
+        The period's costs in the arc order of graph.transpose().
+        """
+        if period not in self._reverse:
+            self._reverse[period] = self.graph.transpose_arc_weights(self.row(period)).tolist()
+        return self._reverse[period]
+
+def compile_period_weights(graph, volumes, periods=TRAFFIC_PERIODS) -> PeriodWeights:
+    """
+    Compile (arcs x bins) vehicles-per-hour volumes into per-bin arc costs
+    with the calculate_cost formula, base * (1 + veh/h / 10000), keeping the
+    base length where a volume is NaN. The bins are the columns of `volumes`
+    and are named by `periods`, so finer bins than the four traffic periods
+    only need a wider volume array.
+    """
+    volumes = np.asarray(volumes, dtype=np.float64)
+    num_arcs = len(graph.indices)
+    if volumes.shape != (num_arcs, len(periods)):
+        raise ValueError(f"expected volumes of shape {(num_arcs, len(periods))}, got {volumes.shape}")
+    base = graph.weights[:, None]
+    weights = np.where(np.isnan(volumes), base, base * (1 + volumes / 10000))
+    return PeriodWeights(graph, periods, weights.T)
+
+def route(weights, start, end, period):
+    """
+    Same (path, cost) contract as dijkstra.dijkstra, costed for one period.
+    """
+    return bidirectional_shortest_path(weights.graph, start, end, weights.arc(period), weights.reverse(period))
+
+def day_sweep(weights, start, end) -> dict:
+    """
+    Route one origin/destination pair in every period: {period: (path, cost)}.
+    """
+    return {period: route(weights, start, end, period) for period in weights.periods}
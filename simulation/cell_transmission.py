@@ -0,0 +1,318 @@
+# cell_transmission.py
+#
+# Mesoscopic traffic flow with the cell transmission model. Every direction of
+# every road is a link cut into cells that a vehicle at free speed crosses in
+# one time step. Each step, cells send min(vehicles ready to move, capacity)
+# and receive min(capacity, room left at backward-wave speed); flow between
+# consecutive cells is the smaller of the two. At junctions the flow leaving a
+# link is split over the next links by turning fractions from a shortest-path
+# assignment of the demand, scaled down where the next links cannot take it
+# all (a non-FIFO node model). Demand enters from origin queues following a
+# daily profile and leaves at its destination.
+#
+# All cells advance together as NumPy array operations; the only Python loop
+# is over time steps. Link inflows are counted per traffic period, giving
+# veh/h per road in the layout of Traffic_Flow_Patterns.
+#
+#   python -m simulation.cell_transmission --step 10
+
+import numpy as np
+
+DEFAULT_STEP_S = 10.0
+FREE_SPEED_KMH = 50.0
+WAVE_SPEED_KMH = 18.0
+JAM_DENSITY = 150.0     # vehicles per km and lane
+LANE_CAPACITY = 1800.0  # vehicles per hour and lane
+DEFAULT_OCCUPANCY = 1.5  # passengers per vehicle
+WARMUP_HOURS = 4.0
+# Cell state is float32 to halve the memory traffic of the per-step updates;
+# per-link totals stay float64
+CELL_DTYPE = np.float32
+
+# Hours of the day covered by each traffic period (night wraps past midnight)
+PERIOD_HOURS = {
+    "morning": (6, 10),
+    "afternoon": (10, 16),
+    "evening": (16, 20),
+    "night": (20, 6),
+}
+
+def _period_of_hour(periods) -> np.ndarray:
+    hours = np.empty(24, dtype=np.int64)
+    for k, period in enumerate(periods):
+        start, end = PERIOD_HOURS[period]
+        span = range(start, end) if start < end else list(range(start, 24)) + list(range(end))
+        hours[list(span)] = k
+    return hours
+
+def period_lengths(periods) -> np.ndarray:
+    """
+    Hours of the day in each period.
+    """
+    return np.bincount(_period_of_hour(periods), minlength=len(periods)).astype(np.float64)
+
+def observed_profile(traffic, periods=None) -> np.ndarray:
+    """
+    Share of the daily demand departing in each hour of the day, following the
+    network-wide observed veh/h of each period in Traffic_Flow_Patterns.
+    """
+    from shortest_path.road_network import PERIOD_COLUMNS, TRAFFIC_PERIODS
+
+    periods = TRAFFIC_PERIODS if periods is None else periods
+    rates = np.array([traffic[PERIOD_COLUMNS[p]].astype(np.float64).sum() for p in periods])
+    hourly = rates[_period_of_hour(periods)]
+    return hourly / hourly.sum()
+
+class CTMResult:
+    """
+    inflow[a, k] is the mean veh/h entering link (arc) a of the graph during
+    period k. Over the whole run (warm-up included) loaded vehicles entered
+    origin queues, arrived reached their destination and unserved were still
+    queued or on the road at the end; unassigned had no route for their OD pair.
+    """
+
+    def __init__(self, network, inflow, periods, loaded, arrived, unserved, unassigned):
+        self.network = network
+        self.inflow = inflow
+        self.periods = tuple(periods)
+        self.loaded = loaded
+        self.arrived = arrived
+        self.unserved = unserved
+        self.unassigned = unassigned
+
+    def edge_volumes(self) -> np.ndarray:
+        """
+        (edges x periods) veh/h per road, both directions together.
+        """
+        graph = self.network.graph
+        volumes = np.zeros((graph.num_edges, len(self.periods)))
+        np.add.at(volumes, graph.edge_of_arc, self.inflow)
+        return volumes
+
+    def road_volumes(self):
+        """
+        Per-road veh/h as a DataFrame with Traffic_Flow_Patterns' columns.
+        """
+        import pandas as pd
+        from shortest_path.road_network import PERIOD_COLUMNS
+
+        graph = self.network.graph
+        labels = graph.node_ids
+        table = {"roadid": [f"{labels[u]}-{labels[v]}" for u, v in zip(graph.edge_u.tolist(), graph.edge_v.tolist())]}
+        volumes = self.edge_volumes()
+        table.update({PERIOD_COLUMNS[p]: volumes[:, k] for k, p in enumerate(self.periods)})
+        return pd.DataFrame(table)
+
+class CellNetwork:
+    """
+    Cells of a CSRGraph whose weights are road lengths in km. capacity holds
+    the veh/h of each edge per direction; the number of lanes follows from it
+    through LANE_CAPACITY and sets the jam storage of the cells.
+    """
+
+    def __init__(self, graph, capacity, step_s=DEFAULT_STEP_S, free_speed_kmh=FREE_SPEED_KMH,
+                 wave_speed_kmh=WAVE_SPEED_KMH):
+        if step_s <= 0:
+            raise ValueError("step_s must be positive")
+        self.graph = graph
+        self.step_h = step_s / 3600.0
+        capacity = np.asarray(capacity, dtype=np.float64)[graph.edge_of_arc]
+        length = np.asarray(graph.weights, dtype=np.float64)
+
+        # Cells at least as long as one step at free speed; very short links
+        # get a single cell that lets everything move in one step
+        reach = free_speed_kmh * self.step_h
+        cells = np.maximum(1, np.floor(length / reach)).astype(np.int64)
+        self.first = np.cumsum(cells) - cells
+        self.last = self.first + cells - 1
+        link = np.repeat(np.arange(len(cells)), cells)
+        cell_length = np.maximum(length / cells, 1e-9)[link]
+        self.num_cells = int(cells.sum())
+
+        self.capacity = (capacity[link] * self.step_h).astype(CELL_DTYPE)
+        self.storage = (JAM_DENSITY * cell_length * np.maximum(capacity[link] / LANE_CAPACITY, 1.0)).astype(CELL_DTYPE)
+        self.move = np.minimum(1.0, reach / cell_length).astype(CELL_DTYPE)
+        self.back = np.minimum(1.0, wave_speed_kmh * self.step_h / cell_length).astype(CELL_DTYPE)
+        # Cells of a link are contiguous, so flow to the next cell is a shifted
+        # slice; inner masks out the pairs that straddle two links
+        self.inner = np.ones(max(self.num_cells - 1, 0), dtype=CELL_DTYPE)
+        self.inner[self.last[self.last < self.num_cells - 1]] = 0.0
+        self.tails = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+
+    def assign(self, origins, destinations, vehicles):
+        """
+        Route daily vehicles per OD pair (node labels) over shortest paths.
+        Returns per-link daily source loads, the turning movements (in link,
+        out link, fraction of the in link's flow), per-link exit fractions and
+        the vehicles of pairs without a route.
+        """
+        from shortest_path.path_tree import shortest_path_tree
+
+        graph = self.graph
+        index = graph.index
+        links = len(self.first)
+        arc_of = {}
+        for a in np.argsort(graph.weights, kind="stable")[::-1].tolist():
+            arc_of[(int(self.tails[a]), int(graph.indices[a]))] = a
+
+        flow = np.zeros(links)
+        source = np.zeros(links)
+        sink = np.zeros(links)
+        moves = {}
+        unassigned = 0.0
+        trees = {}
+        for o, d, amount in zip(origins, destinations, vehicles):
+            o, d = str(o), str(d)
+            if o not in index or d not in index or o == d:
+                unassigned += amount
+                continue
+            if o not in trees:
+                trees[o] = shortest_path_tree(graph, index[o])
+            nodes = trees[o].path(index[d])
+            if not nodes:
+                unassigned += amount
+                continue
+            path = [arc_of[(u, v)] for u, v in zip(nodes, nodes[1:])]
+            source[path[0]] += amount
+            sink[path[-1]] += amount
+            flow[path] += amount
+            for a, b in zip(path, path[1:]):
+                moves[(a, b)] = moves.get((a, b), 0.0) + amount
+
+        pairs = np.array(list(moves), dtype=np.int64).reshape(-1, 2)
+        amounts = np.array(list(moves.values()))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = amounts / flow[pairs[:, 0]] if len(amounts) else amounts
+            exit_fraction = np.where(flow > 0, sink / flow, 1.0)
+        return source, (pairs[:, 0], pairs[:, 1], fraction), exit_fraction, unassigned
+
+    def simulate(self, origins, destinations, vehicles, profile=None, periods=None,
+                 warmup_hours=WARMUP_HOURS) -> CTMResult:
+        """
+        Load daily vehicles per OD pair with an hourly departure profile
+        (uniform by default) and run one day, after warmup_hours of the
+        previous evening so the night starts with traffic on the roads.
+        """
+        from shortest_path.road_network import TRAFFIC_PERIODS
+
+        periods = TRAFFIC_PERIODS if periods is None else tuple(periods)
+        profile = np.full(24, 1 / 24) if profile is None else np.asarray(profile, dtype=np.float64)
+        if profile.shape != (24,):
+            raise ValueError("profile must give 24 hourly shares")
+        source, (m_in, m_out, fraction), exit_fraction, unassigned = self.assign(origins, destinations, vehicles)
+
+        links = len(self.first)
+        first, last, inner = self.first, self.last, self.inner
+        capacity, storage, move, back = self.capacity, self.storage, self.move, self.back
+        hour_period = _period_of_hour(periods)
+        steps_per_hour = int(round(1 / self.step_h))
+        warmup = int(round(warmup_hours * steps_per_hour))
+        day = 24 * steps_per_hour
+
+        total = source.sum()
+        cars = np.zeros(self.num_cells, dtype=CELL_DTYPE)
+        sending = np.empty(self.num_cells, dtype=CELL_DTYPE)
+        receiving = np.empty(self.num_cells, dtype=CELL_DTYPE)
+        along = np.empty(max(self.num_cells - 1, 0), dtype=CELL_DTYPE)
+        queue = np.zeros(links)
+        counts = np.zeros((links, len(periods)))
+        loaded = arrived = 0.0
+        for step in range(-warmup, day):
+            hour = (step // steps_per_hour) % 24
+            load = profile[hour] / steps_per_hour
+            queue += source * load
+            loaded += total * load
+
+            np.multiply(cars, move, out=sending)
+            np.minimum(sending, capacity, out=sending)
+            np.subtract(storage, cars, out=receiving)
+            receiving *= back
+            np.minimum(receiving, capacity, out=receiving)
+            np.minimum(sending[:-1], receiving[1:], out=along)
+            along *= inner
+
+            out_of_link = sending[last]
+            wanted = out_of_link[m_in] * fraction
+            demand = np.bincount(m_out, wanted, minlength=links) + queue
+            room = receiving[first]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scale = np.where(demand > room, room / demand, 1.0)
+            turning = wanted * scale[m_out]
+            entering = queue * scale
+            leaving = out_of_link * exit_fraction
+            into_link = np.bincount(m_out, turning, minlength=links) + entering
+
+            cars[:-1] -= along
+            cars[1:] += along
+            cars[last] -= np.bincount(m_in, turning, minlength=links) + leaving
+            cars[first] += into_link
+            queue -= entering
+            arrived += leaving.sum()
+            if step >= 0:
+                counts[:, hour_period[hour]] += into_link
+
+        inflow = counts / period_lengths(periods)
+        unserved = float(queue.sum() + cars.sum(dtype=np.float64))
+        return CTMResult(self, inflow, periods, loaded, arrived, unserved, unassigned)
+
+def simulate_day(step_s=DEFAULT_STEP_S, occupancy=DEFAULT_OCCUPANCY, free_speed_kmh=FREE_SPEED_KMH,
+                 warmup_hours=WARMUP_HOURS) -> CTMResult:
+    """
+    One day of the Transportation_Demand table (passengers converted to
+    vehicles by occupancy) over Existing_Roads, departing by the observed
+    daily profile. The roads' traffic_level column, on the veh/h scale of the
+    flow counts, is taken as each direction's capacity.
+    """
+    from shared.data_loader import load_data
+    from shortest_path.road_network import get_csr_graph
+
+    graph = get_csr_graph()
+    traffic = load_data("traffic")
+    demand = load_data("demand")
+    network = CellNetwork(graph, graph.edge_traffic, step_s, free_speed_kmh)
+    vehicles = demand["daily_passengers"].to_numpy(dtype=np.float64) / occupancy
+    return network.simulate(demand["fromid"].astype(str), demand["toid"].astype(str), vehicles,
+                            observed_profile(traffic), warmup_hours=warmup_hours)
+
+def compare_with_observed(result, traffic=None):
+    """
+    Simulated against observed veh/h per road and period, for the roads that
+    have a Traffic_Flow_Patterns record.
+    """
+    import pandas as pd
+    from shared.data_loader import load_data
+    from shortest_path.road_network import build_edge_period_volumes
+
+    graph = result.network.graph
+    traffic = load_data("traffic") if traffic is None else traffic
+    observed = build_edge_period_volumes(graph, traffic)
+    simulated = result.edge_volumes()
+    roads = result.road_volumes()["roadid"]
+    rows = []
+    for k, period in enumerate(result.periods):
+        for e in np.flatnonzero(~np.isnan(observed[:, k])).tolist():
+            rows.append((roads[e], period, simulated[e, k], float(observed[e, k])))
+    return pd.DataFrame(rows, columns=["roadid", "period", "simulated", "observed"])
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Simulate a day of demand with the cell transmission model.")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP_S, help="time step in seconds")
+    parser.add_argument("--occupancy", type=float, default=DEFAULT_OCCUPANCY)
+    parser.add_argument("--speed", type=float, default=FREE_SPEED_KMH, help="free-flow speed in km/h")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate_day(args.step, args.occupancy, args.speed)
+    elapsed = time.perf_counter() - start
+    comparison = compare_with_observed(result)
+    print(result.road_volumes().to_string(index=False, float_format="%.0f"))
+    print()
+    for period, rows in comparison.groupby("period", sort=False):
+        corr = np.corrcoef(rows["simulated"], rows["observed"])[0, 1] if rows["simulated"].std() > 0 else float("nan")
+        print(f"{period:<10} simulated {rows['simulated'].mean():8.0f} veh/h  observed {rows['observed'].mean():8.0f} veh/h"
+              f"  correlation {corr:.2f}")
+    print(f"\n{result.network.num_cells} cells, {result.arrived:,.0f} vehicles arrived, "
+          f"{result.unserved:,.0f} still travelling, {result.unassigned:,.0f} without a route; {elapsed:.2f}s")
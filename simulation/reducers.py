@@ -0,0 +1,123 @@
+# reducers.py
+#
+# Online, mergeable summaries of per-scenario results. Each reducer folds in
+# blocks of scenarios as they are produced and can be merged with another
+# reducer of the same shape, so shards computed in separate processes combine
+# into exactly the statistics of one pass, without keeping the scenarios.
+
+import numpy as np
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max per row of (rows x scenarios) blocks,
+    over the finite values only (Chan et al.'s parallel form of Welford's update).
+    """
+
+    def __init__(self, rows):
+        self.count = np.zeros(rows, dtype=np.int64)
+        self.mean = np.zeros(rows)
+        self.m2 = np.zeros(rows)
+        self.min = np.full(rows, np.inf)
+        self.max = np.full(rows, -np.inf)
+
+    def update(self, block):
+        finite = np.isfinite(block)
+        count = finite.sum(axis=1)
+        values = np.where(finite, block, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, values.sum(axis=1) / count, 0.0)
+        m2 = (np.where(finite, block - mean[:, None], 0.0) ** 2).sum(axis=1)
+        self._combine(count, mean, m2)
+        if block.shape[1]:
+            self.min = np.minimum(self.min, np.where(finite, block, np.inf).min(axis=1))
+            self.max = np.maximum(self.max, np.where(finite, block, -np.inf).max(axis=1))
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        safe = np.maximum(total, 1)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / safe
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe
+        self.count = total
+
+    @property
+    def variance(self) -> np.ndarray:
+        """
+        Population variance; nan for rows without values.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.m2 / self.count, np.nan)
+
+class QuantileSketch:
+    """
+    Per-row quantile sketch with relative accuracy: values are counted in
+    logarithmic buckets of ratio gamma = (1 + a) / (1 - a), so any quantile
+    of values within [min_value, max_value] is returned within a relative
+    error a (DDSketch). Zeros get their own bucket; values outside the range
+    are clamped to it; non-finite values are ignored.
+    """
+
+    def __init__(self, rows, relative_accuracy=0.01, min_value=1e-3, max_value=1e6):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.min_key = int(np.ceil(np.log(min_value) / self._log_gamma))
+        max_key = int(np.ceil(np.log(max_value) / self._log_gamma))
+        # column 0 counts zeros
+        self.counts = np.zeros((rows, max_key - self.min_key + 2), dtype=np.int64)
+
+    def update(self, block):
+        rows, columns = np.nonzero(np.isfinite(block) & (block >= 0))
+        values = block[rows, columns]
+        keys = np.zeros(len(values), dtype=np.int64)
+        positive = values > 0
+        keys[positive] = np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64) - self.min_key + 1
+        np.clip(keys, 0, self.counts.shape[1] - 1, out=keys)
+        keys[positive & (keys == 0)] = 1
+        flat = rows * self.counts.shape[1] + keys
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other):
+        if other.counts.shape != self.counts.shape or other.gamma != self.gamma:
+            raise ValueError("sketches differ in shape or accuracy")
+        self.counts += other.counts
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        (rows x len(qs)) estimates for quantiles qs in [0, 1]; nan for empty rows.
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1]
+        out = np.full((len(total), len(qs)), np.nan)
+        keys = np.arange(self.counts.shape[1]) + self.min_key - 1
+        values = np.where(keys >= self.min_key, 2 * self.gamma ** keys / (self.gamma + 1), 0.0)
+        for row in np.flatnonzero(total):
+            ranks = np.floor(qs * (total[row] - 1))
+            out[row] = values[np.searchsorted(cumulative[row], ranks, side="right")]
+        return out
+
+class EdgeCriticality:
+    """
+    How many routes (pair x scenario) ran over each edge, out of all routes
+    considered.
+    """
+
+    def __init__(self, num_edges):
+        self.counts = np.zeros(num_edges, dtype=np.int64)
+        self.routes = 0
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.routes += other.routes
+
+    @property
+    def share(self) -> np.ndarray:
+        return self.counts / self.routes if self.routes else np.zeros(len(self.counts))
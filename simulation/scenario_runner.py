@@ -0,0 +1,167 @@
+# scenario_runner.py
+#
+# Parallel Monte Carlo runs over traffic scenarios. The scenarios are split
+# into fixed-size shards, each seeded from its own child of one SeedSequence,
+# so a run is reproducible from its seed whatever the number of workers.
+# Shards are fanned out over a process pool (the graph is handed to each
+# worker once) and every shard returns only its reducers (moments, quantile
+# sketch and edge-use counts), which are merged in shard order as they stream
+# back. Memory stays bounded by the shard size, not the number of scenarios.
+#
+#   python -m simulation.scenario_runner --scenarios 20000 --workers 4 --seed 1
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation.reducers import EdgeCriticality, QuantileSketch, RunningMoments
+from simulation.scenarios import draw_scenarios, route_costs
+
+DEFAULT_SHARD_SIZE = 512
+
+class ScenarioStats:
+    """
+    Merged reducers of a run for OD `pairs` over a CSRGraph.
+    """
+
+    def __init__(self, graph, pairs, relative_accuracy=0.01):
+        self.graph = graph
+        self.pairs = list(pairs)
+        self.scenarios = 0
+        self.moments = RunningMoments(len(self.pairs))
+        self.sketch = QuantileSketch(len(self.pairs), relative_accuracy)
+        self.criticality = EdgeCriticality(graph.num_edges)
+
+    def merge(self, other):
+        self.scenarios += other.scenarios
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.criticality.merge(other.criticality)
+
+    def summary(self, percentiles=(5, 50, 95)):
+        """
+        Per-pair DataFrame in the layout of scenarios.cost_summary, with the
+        percentiles read from the quantile sketch and exact min and max.
+        """
+        import pandas as pd
+
+        moments = self.moments
+        connected = moments.count > 0
+        table = {
+            "origin": [o for o, _ in self.pairs],
+            "destination": [d for _, d in self.pairs],
+            "reachable": moments.count / self.scenarios if self.scenarios else np.zeros(len(self.pairs)),
+            "mean": np.where(connected, moments.mean, np.nan),
+            "std": np.sqrt(moments.variance),
+            "min": np.where(connected, moments.min, np.nan),
+        }
+        quantiles = self.sketch.quantiles(np.asarray(percentiles) / 100)
+        table.update({f"p{p:g}": quantiles[:, k] for k, p in enumerate(percentiles)})
+        table["max"] = np.where(connected, moments.max, np.nan)
+        return pd.DataFrame(table)
+
+    def critical_edges(self, top=None):
+        """
+        Edges by the share of routes that used them, most used first.
+        """
+        import pandas as pd
+
+        graph = self.graph
+        labels = np.asarray(graph.node_ids, dtype=object)
+        table = pd.DataFrame({
+            "from": labels[graph.edge_u],
+            "to": labels[graph.edge_v],
+            "routes": self.criticality.counts,
+            "share": self.criticality.share,
+        }).sort_values("routes", ascending=False, kind="stable")
+        return table if top is None else table.head(top)
+
+_worker = {}
+
+def _init_worker(graph, pairs, max_traffic_level, relative_accuracy):
+    _worker.update(graph=graph, pairs=pairs, max_traffic_level=max_traffic_level,
+                   relative_accuracy=relative_accuracy)
+
+def _run_shard(task):
+    seed, size = task
+    graph, pairs = _worker["graph"], _worker["pairs"]
+    stats = ScenarioStats(graph, pairs, _worker["relative_accuracy"])
+    scenarios = draw_scenarios(graph, size, _worker["max_traffic_level"], np.random.default_rng(seed))
+    costs = route_costs(scenarios, pairs, edge_use=stats.criticality.counts)
+    stats.scenarios = size
+    stats.moments.update(costs)
+    stats.sketch.update(costs)
+    stats.criticality.routes = int(np.isfinite(costs).sum())
+    return stats
+
+def shard_seeds(count, seed=None, shard_size=DEFAULT_SHARD_SIZE) -> list:
+    """
+    (SeedSequence, size) per shard; the same seed always gives the same shards.
+    """
+    sizes = [min(shard_size, count - lo) for lo in range(0, count, shard_size)]
+    return list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+def iter_shards(graph, pairs, count, seed=None, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                max_traffic_level=10, relative_accuracy=0.01):
+    """
+    Run `count` scenarios for (origin, destination) label pairs and yield
+    each shard's ScenarioStats in shard order as soon as it is available.
+    workers > 1 spreads the shards over a process pool (0 = one per CPU).
+    """
+    pairs = [(str(o), str(d)) for o, d in pairs]
+    tasks = shard_seeds(count, seed, shard_size)
+    workers = workers or os.cpu_count() or 1
+    initargs = (graph, pairs, max_traffic_level, relative_accuracy)
+    if workers == 1 or len(tasks) == 1:
+        _init_worker(*initargs)
+        yield from map(_run_shard, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            yield from pool.map(_run_shard, tasks)
+
+def run_scenarios(graph, pairs, count, seed=None, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                  max_traffic_level=10, relative_accuracy=0.01, progress=None) -> dict:
+    """
+    Merge every shard of iter_shards into one ScenarioStats. Returns the stats
+    with the scenario count, elapsed time and scenarios per second; `progress`
+    is called with the running totals after each shard.
+    """
+    stats = ScenarioStats(graph, [(str(o), str(d)) for o, d in pairs], relative_accuracy)
+    start = time.perf_counter()
+    for shard in iter_shards(graph, pairs, count, seed, workers, shard_size, max_traffic_level, relative_accuracy):
+        stats.merge(shard)
+        if progress is not None:
+            elapsed = time.perf_counter() - start
+            progress(stats.scenarios, elapsed)
+    elapsed = time.perf_counter() - start
+    return {
+        "stats": stats,
+        "scenarios": stats.scenarios,
+        "elapsed_s": elapsed,
+        "scenarios_per_s": stats.scenarios / elapsed if elapsed > 0 else None,
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream route statistics over random traffic scenarios.")
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (0 = one per CPU)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--max-level", type=int, default=10)
+    args = parser.parse_args()
+
+    from shortest_path.road_network import get_csr_graph
+    from simulation.scenarios import demand_pairs
+
+    report = run_scenarios(get_csr_graph(), demand_pairs(), args.scenarios, args.seed, args.workers,
+                           args.shard_size, args.max_level)
+    stats = report["stats"]
+    print(stats.summary().to_string(index=False, float_format="%.2f"))
+    print()
+    print(stats.critical_edges(top=10).to_string(index=False, float_format="%.3f"))
+    print(f"\n{report['scenarios']} scenarios in {report['elapsed_s']:.3f}s "
+          f"({report['scenarios_per_s']:,.0f} scenarios/s)")
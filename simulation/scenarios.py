@@ -0,0 +1,243 @@
+# scenarios.py
+#
+# Monte Carlo traffic scenarios, vectorized. Traffic levels for every edge and
+# scenario are drawn at once from a seeded NumPy generator into an
+# (edges x scenarios) array, the per-level penalty of traffic_simulation is
+# applied to the whole array, and route costs for chosen origin-destination
+# pairs are computed for all scenarios together: a Bellman-Ford relaxation
+# over the arcs that works on (nodes x origins x scenarios) distance arrays,
+# so the Python loop runs once per relaxation round, not per edge or scenario.
+#
+#   python -m simulation.scenarios --scenarios 5000 --seed 1
+
+import numpy as np
+
+from simulation.traffic_simulation import TRAFFIC_PENALTY
+
+# Memory budget for one (arcs x origins x block) float64 temporary in route_costs;
+# the relaxation and predecessor passes hold a few of these at once
+CHUNK_BYTES = 64 * 1024 ** 2
+
+class TrafficScenarios:
+    """
+    levels[e, k] is the traffic level of edge e of a CSRGraph in scenario k;
+    an edge's weight in a scenario is its base weight * (1 + level * penalty).
+    """
+
+    def __init__(self, graph, levels, penalty=TRAFFIC_PENALTY, seed=None):
+        self.graph = graph
+        self.levels = levels
+        self.penalty = penalty
+        self.seed = seed
+
+    @property
+    def count(self) -> int:
+        return self.levels.shape[1]
+
+    def edge_weights(self, edges=slice(None), scenarios=slice(None)) -> np.ndarray:
+        """
+        Penalized (edges x scenarios) weights, for all edges and scenarios or
+        a subset of either.
+        """
+        base = self.graph.edge_weights[edges]
+        return base[:, None] * (1 + self.levels[edges, scenarios] * self.penalty)
+
+    def arc_weights(self, scenarios=slice(None)) -> np.ndarray:
+        """
+        Penalized (arcs x scenarios) weights in the graph's arc order.
+        """
+        return self.edge_weights(self.graph.edge_of_arc, scenarios)
+
+def draw_scenarios(graph, count, max_traffic_level=10, seed=None, penalty=TRAFFIC_PENALTY) -> TrafficScenarios:
+    """
+    `count` scenarios of uniform traffic levels 0..max_traffic_level per edge,
+    as simulate_traffic draws them, reproducible for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    dtype = np.uint8 if max_traffic_level < 256 else np.uint16
+    levels = rng.integers(0, max_traffic_level, size=(graph.num_edges, count), dtype=dtype, endpoint=True)
+    return TrafficScenarios(graph, levels, penalty, seed)
+
+def shortest_distances(graph, arc_weights, origins) -> np.ndarray:
+    """
+    (nodes x origins x scenarios) shortest distances from node indices
+    `origins` under every column of (arcs x scenarios) arc_weights.
+    """
+    n, scenarios = graph.num_nodes, arc_weights.shape[1]
+    origins = np.asarray(origins, dtype=np.int64)
+    dist = np.full((n, len(origins), scenarios), np.inf)
+    dist[origins, np.arange(len(origins))] = 0.0
+    if not len(graph.indices):
+        return dist
+
+    # Arcs grouped by head so each round is one reduceat per head; a round
+    # only relaxes the arcs leaving nodes that improved in the previous one
+    tails = np.repeat(np.arange(n), np.diff(graph.indptr))
+    order = np.argsort(graph.indices, kind="stable")
+    heads, tails = graph.indices[order], tails[order]
+    weights = arc_weights[order][:, None, :]
+    active = np.zeros(n, dtype=bool)
+    active[origins] = True
+    for _ in range(n):
+        arcs = np.flatnonzero(active[tails])
+        if not len(arcs):
+            break
+        starts = np.flatnonzero(np.diff(heads[arcs], prepend=-1))
+        targets = heads[arcs[starts]]
+        best = np.minimum.reduceat(dist[tails[arcs]] + weights[arcs], starts, axis=0)
+        current = dist[targets]
+        improved = best < current
+        dist[targets] = np.where(improved, best, current)
+        active[:] = False
+        active[targets[improved.any(axis=(1, 2))]] = True
+    return dist
+
+def predecessor_arcs(graph, arc_weights, dist) -> np.ndarray:
+    """
+    (nodes x origins x scenarios) index of an arc that ends a shortest path
+    to each node, from the distances of shortest_distances; -1 at the
+    origins and at unreached nodes.
+    """
+    n = graph.num_nodes
+    pred = np.full(dist.shape, -1, dtype=np.int64)
+    if not len(graph.indices):
+        return pred
+    tails = np.repeat(np.arange(n), np.diff(graph.indptr))
+    order = np.argsort(graph.indices, kind="stable")
+    heads = graph.indices[order]
+    starts = np.flatnonzero(np.diff(heads, prepend=-1))
+    # At the fixpoint every reached node has an arc whose relaxation gives
+    # exactly its distance; take the first such arc per head
+    candidate = dist[tails[order]] + arc_weights[order][:, None, :]
+    tight = (candidate == dist[heads]) & np.isfinite(candidate)
+    first = np.where(tight, np.arange(len(order))[:, None, None], len(order))
+    first = np.minimum.reduceat(first, starts, axis=0)
+    pred[heads[starts]] = np.where(first < len(order), order[np.minimum(first, len(order) - 1)], -1)
+    pred[dist == 0] = -1
+    return pred
+
+def _count_edge_use(graph, pred, origin_pos, destinations, edge_use):
+    tails = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+    columns = np.arange(pred.shape[2])
+    for o, d in zip(origin_pos.tolist(), destinations.tolist()):
+        current = np.full(pred.shape[2], d)
+        for _ in range(graph.num_nodes):
+            arcs = pred[current, o, columns]
+            walking = arcs >= 0
+            if not walking.any():
+                break
+            edge_use += np.bincount(graph.edge_of_arc[arcs[walking]], minlength=len(edge_use))
+            current = np.where(walking, tails[arcs], current)
+
+def route_costs(scenarios, pairs, chunk=None, edge_use=None) -> np.ndarray:
+    """
+    (pairs x scenarios) shortest route costs for (origin, destination) node
+    label pairs; inf when a label is unknown or the pair is disconnected.
+    Scenarios are processed in blocks of `chunk` (sized to CHUNK_BYTES by
+    default) to bound memory. When edge_use is an (edges,) integer array, the
+    number of pair-scenario routes running over each edge is added to it.
+    """
+    graph = scenarios.graph
+    index = graph.index
+    known = [k for k, (o, d) in enumerate(pairs) if o in index and d in index]
+    costs = np.full((len(pairs), scenarios.count), np.inf)
+    if not known:
+        return costs
+    origins = list(dict.fromkeys(index[pairs[k][0]] for k in known))
+    column = {o: i for i, o in enumerate(origins)}
+    o_pos = np.array([column[index[pairs[k][0]]] for k in known])
+    d_idx = np.array([index[pairs[k][1]] for k in known])
+    if chunk is None:
+        # The relaxation temporaries are per arc, not per node
+        chunk = max(1, CHUNK_BYTES // (8 * max(len(graph.indices), graph.num_nodes, 1) * len(origins)))
+    for lo in range(0, scenarios.count, chunk):
+        block = slice(lo, min(lo + chunk, scenarios.count))
+        arc_weights = scenarios.arc_weights(block)
+        dist = shortest_distances(graph, arc_weights, origins)
+        costs[known, block] = dist[d_idx, o_pos]
+        if edge_use is not None:
+            _count_edge_use(graph, predecessor_arcs(graph, arc_weights, dist), o_pos, d_idx, edge_use)
+    return costs
+
+def path_costs(scenarios, path) -> np.ndarray:
+    """
+    Cost of one fixed route (node labels) in every scenario; parallel edges
+    resolve to the cheapest one at base weight.
+    """
+    graph = scenarios.graph
+    index = graph.index
+    edges = []
+    for a, b in zip(path, path[1:]):
+        u, v = index[a], index[b]
+        arcs = np.arange(graph.indptr[u], graph.indptr[u + 1])
+        arcs = arcs[graph.indices[arcs] == v]
+        if not len(arcs):
+            raise ValueError(f"no road between {a} and {b}")
+        edges.append(graph.edge_of_arc[arcs[np.argmin(graph.weights[arcs])]])
+    if not edges:
+        return np.zeros(scenarios.count)
+    return scenarios.edge_weights(np.array(edges)).sum(axis=0)
+
+def cost_summary(costs, pairs, percentiles=(5, 50, 95)):
+    """
+    Per-pair distribution of (pairs x scenarios) costs as a DataFrame: mean,
+    standard deviation, min, the requested percentiles and max over the
+    scenarios in which the pair is connected, plus the share of those.
+    """
+    import pandas as pd
+
+    finite = np.isfinite(costs)
+    values = np.where(finite, costs, np.nan)
+    reachable = finite.any(axis=1)
+    table = {
+        "origin": [o for o, _ in pairs],
+        "destination": [d for _, d in pairs],
+        "reachable": finite.mean(axis=1) if costs.shape[1] else np.zeros(len(pairs)),
+    }
+    stats = np.full((len(pairs), 4 + len(percentiles)), np.nan)
+    if reachable.any():
+        rows = values[reachable]
+        stats[reachable, 0] = np.nanmean(rows, axis=1)
+        stats[reachable, 1] = np.nanstd(rows, axis=1)
+        stats[reachable, 2] = np.nanmin(rows, axis=1)
+        stats[reachable, 3:-1] = np.nanpercentile(rows, percentiles, axis=1).T
+        stats[reachable, -1] = np.nanmax(rows, axis=1)
+    columns = ["mean", "std", "min"] + [f"p{p:g}" for p in percentiles] + ["max"]
+    table.update({name: stats[:, k] for k, name in enumerate(columns)})
+    return pd.DataFrame(table)
+
+def demand_pairs(demand=None) -> list:
+    """
+    (fromid, toid) pairs of the Transportation_Demand table.
+    """
+    from shared.data_loader import load_data
+
+    demand = load_data("demand") if demand is None else demand
+    return list(zip(demand["fromid"].astype(str), demand["toid"].astype(str)))
+
+def robustness(count=1000, pairs=None, seed=None, max_traffic_level=10, percentiles=(5, 50, 95)):
+    """
+    Route-cost distributions over the road network for `pairs` (the demand
+    table's by default) under `count` random traffic scenarios.
+    """
+    from shortest_path.road_network import get_csr_graph
+
+    pairs = demand_pairs() if pairs is None else [(str(o), str(d)) for o, d in pairs]
+    scenarios = draw_scenarios(get_csr_graph(), count, max_traffic_level, seed)
+    return cost_summary(route_costs(scenarios, pairs), pairs, percentiles)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Route-cost distributions under random traffic scenarios.")
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-level", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = robustness(args.scenarios, seed=args.seed, max_traffic_level=args.max_level)
+    elapsed = time.perf_counter() - start
+    print(report.to_string(index=False, float_format="%.2f"))
+    print(f"{args.scenarios} scenarios in {elapsed:.3f}s ({args.scenarios / elapsed:,.0f} scenarios/s)")
@@ -0,0 +1,79 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from graph.graph_builder import CSRGraph
+from shortest_path.road_network import PERIOD_COLUMNS, TRAFFIC_PERIODS
+from simulation.cell_transmission import CellNetwork, observed_profile, period_lengths
+
+def _network(capacity=1800.0, step_s=10.0):
+    edges = [("A", "B", 2.0), ("B", "C", 3.0), ("B", "D", 1.5), ("D", "E", 0.05)]
+    u, v, w = zip(*edges)
+    graph = CSRGraph.from_edges(u, v, w)
+    return CellNetwork(graph, np.full(graph.num_edges, capacity), step_s=step_s)
+
+def test_cells_follow_free_speed():
+    network = _network()
+    # 50 km/h for 10 s covers 0.139 km
+    cells = network.last - network.first + 1
+    lengths = network.graph.weights
+    assert cells.tolist() == np.maximum(1, np.floor(lengths / (50 / 360))).astype(int).tolist()
+    assert network.num_cells == cells.sum()
+    with pytest.raises(ValueError):
+        _network(step_s=0)
+
+def test_vehicles_are_conserved_and_delivered():
+    network = _network()
+    # Nobody departs late enough to still be on the road at midnight
+    profile = np.r_[np.full(22, 1 / 22), 0, 0]
+    result = network.simulate(["A", "A", "C", "E", "A"], ["C", "E", "D", "A", "X"], [500, 300, 200, 100, 50],
+                              profile, warmup_hours=0)
+    assert result.unassigned == 50
+    assert result.loaded == pytest.approx(1100)
+    assert result.arrived + result.unserved == pytest.approx(result.loaded, rel=1e-5)
+    assert result.unserved < 1
+
+    # Vehicles entering each road over the day match the assignment
+    daily = result.edge_volumes() @ period_lengths(TRAFFIC_PERIODS)
+    expected = {("A", "B"): 800 + 100, ("B", "C"): 500 + 200, ("B", "D"): 300 + 200 + 100, ("D", "E"): 300 + 100}
+    labels = network.graph.node_ids
+    for e, (u, v) in enumerate(zip(network.graph.edge_u, network.graph.edge_v)):
+        assert daily[e] == pytest.approx(expected[(labels[u], labels[v])], rel=1e-3)
+
+def test_capacity_limits_flow():
+    network = _network(capacity=600.0)
+    profile = np.zeros(24)
+    profile[7] = 1.0
+    result = network.simulate(["A"], ["C"], [3000], profile, warmup_hours=0)
+    morning = TRAFFIC_PERIODS.index("morning")
+    hours = period_lengths(TRAFFIC_PERIODS)[morning]
+    assert result.edge_volumes()[:, morning].max() <= 600 * (1 + 1e-6)
+    # 3000 vehicles at 600 veh/h need five hours, spilling past the morning
+    assert result.edge_volumes()[0, morning] * hours == pytest.approx(600 * 3, rel=1e-3)
+    with pytest.raises(ValueError):
+        network.simulate(["A"], ["C"], [10], np.ones(12))
+
+def test_periods_and_layout():
+    assert period_lengths(TRAFFIC_PERIODS).sum() == 24
+    traffic = pd.DataFrame({PERIOD_COLUMNS[p]: [100.0 * (k + 1)] for k, p in enumerate(TRAFFIC_PERIODS)})
+    profile = observed_profile(traffic)
+    assert profile.sum() == pytest.approx(1.0)
+    assert profile[7] / profile[12] == pytest.approx(100 / 200)
+
+    result = _network().simulate(["A"], ["E"], [240], warmup_hours=0)
+    table = result.road_volumes()
+    assert list(table.columns) == ["roadid"] + [PERIOD_COLUMNS[p] for p in TRAFFIC_PERIODS]
+    assert table["roadid"].tolist() == ["A-B", "B-C", "B-D", "D-E"]
+    assert table.loc[0, PERIOD_COLUMNS["afternoon"]] == pytest.approx(10, rel=1e-3)
+
+def test_empty_network():
+    network = CellNetwork(CSRGraph([], [], [], []), np.zeros(0))
+    assert network.num_cells == 0 and len(network.first) == 0
+    result = network.simulate(["A"], ["B"], [10], warmup_hours=0)
+    assert result.unassigned == 10 and result.loaded == 0
+    assert result.edge_volumes().shape == (0, len(TRAFFIC_PERIODS))
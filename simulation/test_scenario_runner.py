@@ -0,0 +1,81 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from graph.graph_builder import CSRGraph
+from simulation.reducers import EdgeCriticality, QuantileSketch, RunningMoments
+from simulation.scenario_runner import run_scenarios, shard_seeds
+from simulation.scenarios import cost_summary, draw_scenarios, route_costs
+
+PAIRS = [("A", "E"), ("C", "A"), ("A", "F")]
+
+def _graph():
+    edges = [("A", "B", 5), ("B", "C", 3), ("A", "C", 7), ("C", "D", 2), ("D", "E", 4), ("B", "E", 9)]
+    u, v, w = zip(*edges)
+    return CSRGraph.from_edges(u, v, w, node_ids=["A", "B", "C", "D", "E", "F"])
+
+def test_reducers_merge_to_exact_statistics():
+    rng = np.random.default_rng(0)
+    values = rng.gamma(2.0, 5.0, (2, 4000))
+    values[1, :100] = np.inf
+    moments, sketch = RunningMoments(2), QuantileSketch(2, relative_accuracy=0.01)
+    for block in np.array_split(values, 7, axis=1):
+        part_moments, part_sketch = RunningMoments(2), QuantileSketch(2, relative_accuracy=0.01)
+        part_moments.update(block)
+        part_sketch.update(block)
+        moments.merge(part_moments)
+        sketch.merge(part_sketch)
+
+    finite = np.where(np.isfinite(values), values, np.nan)
+    assert moments.count.tolist() == [4000, 3900]
+    assert np.allclose(moments.mean, np.nanmean(finite, axis=1))
+    assert np.allclose(moments.variance, np.nanvar(finite, axis=1))
+    assert np.array_equal(moments.min, np.nanmin(finite, axis=1))
+    assert np.array_equal(moments.max, np.nanmax(finite, axis=1))
+    exact = np.nanquantile(finite, [0.1, 0.5, 0.9], axis=1).T
+    assert np.allclose(sketch.quantiles([0.1, 0.5, 0.9]), exact, rtol=0.021)
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(2, relative_accuracy=0.05))
+
+def test_run_matches_direct_computation():
+    graph = _graph()
+    report = run_scenarios(graph, PAIRS, 700, seed=11, shard_size=300)
+    stats = report["stats"]
+    assert report["scenarios"] == 700 and report["scenarios_per_s"] > 0
+
+    costs, use = [], np.zeros(graph.num_edges, dtype=np.int64)
+    for seed, size in shard_seeds(700, 11, 300):
+        costs.append(route_costs(draw_scenarios(graph, size, seed=np.random.default_rng(seed)), PAIRS, edge_use=use))
+    costs = np.hstack(costs)
+    assert np.allclose(stats.moments.mean[:2], costs[:2].mean(axis=1))
+    assert stats.criticality.counts.tolist() == use.tolist()
+
+    summary = stats.summary((50,))
+    assert list(summary.columns) == list(cost_summary(costs, PAIRS, (50,)).columns)
+    assert np.allclose(summary["min"][:2], costs[:2].min(axis=1))
+    assert np.allclose(summary["max"][:2], costs[:2].max(axis=1))
+    assert np.isnan(summary.loc[2, "max"])
+    assert summary["reachable"].tolist() == [1.0, 1.0, 0.0]
+    assert np.allclose(summary["p50"][:2], np.median(costs[:2], axis=1), rtol=0.021)
+    assert np.isnan(summary.loc[2, "mean"])
+    top = stats.critical_edges(top=1)
+    assert top["routes"].iloc[0] == use.max()
+
+def test_results_do_not_depend_on_worker_count():
+    graph = _graph()
+    one = run_scenarios(graph, PAIRS, 600, seed=3, shard_size=200)["stats"]
+    two = run_scenarios(graph, PAIRS, 600, seed=3, workers=2, shard_size=200)["stats"]
+    assert np.array_equal(one.sketch.counts, two.sketch.counts)
+    assert np.array_equal(one.criticality.counts, two.criticality.counts)
+    assert np.allclose(one.moments.mean, two.moments.mean)
+
+def test_edge_criticality_share():
+    criticality = EdgeCriticality(3)
+    assert criticality.share.tolist() == [0, 0, 0]
+    criticality.counts[:] = [2, 0, 1]
+    criticality.routes = 4
+    assert criticality.share.tolist() == [0.5, 0.0, 0.25]
@@ -0,0 +1,61 @@
+import os
+import sys
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from graph.graph_builder import CSRGraph
+from shortest_path.path_tree import shortest_path
+from simulation.scenarios import cost_summary, draw_scenarios, path_costs, route_costs
+
+def _graph():
+    edges = [("A", "B", 5), ("B", "C", 3), ("A", "C", 7), ("C", "D", 2), ("D", "E", 4), ("B", "E", 9)]
+    u, v, w = zip(*edges)
+    return CSRGraph.from_edges(u, v, w, node_ids=["A", "B", "C", "D", "E", "F"])
+
+def test_draws_are_seeded_and_in_range():
+    graph = _graph()
+    a = draw_scenarios(graph, 200, seed=7)
+    b = draw_scenarios(graph, 200, seed=7)
+    assert a.levels.shape == (graph.num_edges, 200)
+    assert np.array_equal(a.levels, b.levels)
+    assert a.levels.min() == 0 and a.levels.max() == 10
+    assert not np.array_equal(a.levels, draw_scenarios(graph, 200, seed=8).levels)
+
+def test_penalties_match_apply_traffic_penalty():
+    graph = _graph()
+    scenarios = draw_scenarios(graph, 50, seed=1)
+    expected = graph.edge_weights[:, None] * (1 + scenarios.levels * 0.1)
+    assert np.allclose(scenarios.edge_weights(), expected)
+    assert np.allclose(scenarios.arc_weights(slice(3, 5)), expected[graph.edge_of_arc, 3:5])
+
+def test_route_costs_match_per_scenario_search():
+    graph = _graph()
+    scenarios = draw_scenarios(graph, 40, seed=2)
+    pairs = [("A", "E"), ("E", "A"), ("C", "B"), ("A", "F"), ("A", "X")]
+    costs = route_costs(scenarios, pairs, chunk=7)
+    assert costs.shape == (5, 40)
+    for k in range(40):
+        arc_weights = scenarios.arc_weights(slice(k, k + 1))[:, 0]
+        for i, (o, d) in enumerate(pairs[:3]):
+            assert costs[i, k] == pytest.approx(shortest_path(graph, o, d, arc_weights)[1])
+    assert np.isinf(costs[3:]).all()
+
+def test_path_costs_and_summary():
+    graph = _graph()
+    scenarios = draw_scenarios(graph, 500, seed=3)
+    fixed = path_costs(scenarios, ["A", "C", "D", "E"])
+    best = route_costs(scenarios, [("A", "E")])[0]
+    assert (best <= fixed + 1e-9).all()
+    with pytest.raises(ValueError):
+        path_costs(scenarios, ["A", "D"])
+
+    pairs = [("A", "E"), ("A", "F")]
+    table = cost_summary(np.vstack([best, route_costs(scenarios, [("A", "F")])[0]]), pairs, (50, 90))
+    assert list(table.columns) == ["origin", "destination", "reachable", "mean", "std", "min", "p50", "p90", "max"]
+    assert table.loc[0, "reachable"] == 1.0
+    assert table.loc[0, "p50"] == pytest.approx(np.percentile(best, 50))
+    assert table.loc[0, "min"] <= table.loc[0, "p90"] <= table.loc[0, "max"]
+    assert table.loc[1, "reachable"] == 0.0 and np.isnan(table.loc[1, "mean"])
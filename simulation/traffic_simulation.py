@@ -2,6 +2,9 @@
 
 import random
 
+# Weight increase per traffic level
+TRAFFIC_PENALTY = 0.1
+
 def simulate_traffic(graph, max_traffic_level=10):
     """
     Randomly assign traffic levels to edges to simulate different scenarios.
@@ -18,7 +21,7 @@ def apply_traffic_penalty(graph):
     """
     new_edges = []
     for weight, u, v, traffic_level in graph.get_edges():
-        penalty = traffic_level * 0.1  # Increase 10% per traffic level
+        penalty = traffic_level * TRAFFIC_PENALTY  # Increase 10% per traffic level
         new_weight = weight * (1 + penalty)
         new_edges.append((new_weight, u, v, traffic_level))
     graph.edges = new_edges
\ No newline at end of file
@@ -0,0 +1,45 @@
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from clean_all_data import clean_dataset, iter_clean_events
+
+REPORT_KEYS = {"dataset", "path", "input_bytes", "rows", "columns", "wall_time_s", "rows_per_s",
+               "peak_memory_bytes", "error"}
+
+def write_sources(tmp_path, count):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    paths = {}
+    for k in range(count):
+        source = data_dir / f"Roads{k}.csv"
+        source.write_text("FromID,ToID,Distance(km)\n" + "1,3,8.5\n" * (k + 1) + "2,4,1.5\n")
+        paths[f"roads{k}"] = str(source)
+    return paths
+
+def test_clean_dataset_report(tmp_path):
+    path = write_sources(tmp_path, 1)["roads0"]
+    for chunksize in (None, 1):
+        report = clean_dataset("roads0", path, chunksize, use_cache=False)
+        assert set(report) == REPORT_KEYS
+        assert report["error"] is None
+        assert (report["rows"], report["columns"]) == (2, 3)
+        assert report["input_bytes"] == os.path.getsize(path)
+        assert report["rows_per_s"] > 0 and report["peak_memory_bytes"] > 0
+
+def test_serial_events_keep_order_and_report_errors(tmp_path):
+    paths = write_sources(tmp_path, 2)
+    paths["missing"] = str(tmp_path / "data" / "Missing.csv")
+    paths["roads9"] = paths.pop("roads1")
+    reports = list(iter_clean_events(paths=paths))
+    assert [r["dataset"] for r in reports] == ["roads0", "missing", "roads9"]
+    assert [r["error"] is None for r in reports] == [True, False, True]
+    assert set(reports[1]) == REPORT_KEYS and reports[1]["rows"] is None
+
+def test_parallel_events_cover_every_dataset(tmp_path):
+    paths = write_sources(tmp_path, 3)
+    reports = list(iter_clean_events(workers=2, paths=paths))
+    assert sorted(r["dataset"] for r in reports) == sorted(paths)
+    assert all(r["error"] is None for r in reports)